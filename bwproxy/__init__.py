@@ -1,3 +1,17 @@
+from . import api
+from . import assetRegistry
+from . import canvasPool
+from . import deckPlan
+from . import decklist
 from . import drawUtil
+from . import journal
+from . import pageManifest
+from . import pipeline
 from . import projectConstants
-from . import projectTypes
\ No newline at end of file
+from . import projectTypes
+from . import renderCache
+from . import renderPool
+from . import service
+from . import shards
+from . import spool
+from . import svgCanvas
@@ -0,0 +1,182 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from . import projectConstants as C
+from . import drawUtil
+from . import renderPool
+from .canvasPool import CanvasPool
+from .decklist import cardFaces, resolveLines, threadEventLoop
+from .renderCache import RenderCache
+from .svgCanvas import SvgCanvas
+from .projectTypes import Card, Flavor
+
+# A decklist as text, or the cards themselves: Card objects use their
+# official flavor names, (card, flavor names) pairs are drawn as they are
+DeckInput = Union[str, Iterable[Union[Card, Tuple[Card, Flavor]]]]
+
+
+def resolveDecklist(
+    decklist: str,
+    cardCache: Optional[Dict[str, Card]] = None,
+    tokenCache: Optional[Dict[str, Card]] = None,
+    ignoreBasicLands: bool = False,
+    alternativeFrames: bool = False,
+) -> List[Tuple[Card, Flavor]]:
+    """
+    Resolves the text of a decklist, returning the cards to draw
+    with their flavor names. Cards not in the given caches are searched online,
+    and added to them. Without caches, every card is searched online:
+    pass the same dictionaries to every call to search every card only once
+    (or the ones loaded by decklist.loadCardCaches, to use the caches of makeProxies).
+    Nothing is read or written on disk.
+    """
+    with threadEventLoop():
+        return list(
+            resolveLines(
+                decklist.splitlines(),
+                cardCache=cardCache if cardCache is not None else {},
+                tokenCache=tokenCache if tokenCache is not None else {},
+                ignoreBasicLands=ignoreBasicLands,
+                alternativeFrames=alternativeFrames,
+            )
+        )
+
+
+def deckCards(
+    deck: DeckInput,
+    cardCache: Optional[Dict[str, Card]] = None,
+    tokenCache: Optional[Dict[str, Card]] = None,
+    ignoreBasicLands: bool = False,
+    alternativeFrames: bool = False,
+) -> List[Tuple[Card, Flavor]]:
+    if isinstance(deck, str):
+        return resolveDecklist(
+            deck,
+            cardCache=cardCache,
+            tokenCache=tokenCache,
+            ignoreBasicLands=ignoreBasicLands,
+            alternativeFrames=alternativeFrames,
+        )
+    cards: List[Tuple[Card, Flavor]] = []
+    for item in deck:
+        if isinstance(item, Card):
+            if ignoreBasicLands and item.name in C.BASIC_LANDS:
+                continue
+            flavorNames = {item.name: item.flavor_name} if item.hasFlavorName() else {}
+            cards.extend(cardFaces(item, flavorNames, alternativeFrames=alternativeFrames))
+        else:
+            cards.append(item)
+    return cards
+
+
+def renderCards(
+    deck: DeckInput,
+    setIconPath: Optional[str] = None,
+    isColored: bool = False,
+    useTextSymbols: bool = True,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    ignoreBasicLands: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
+    vector: bool = False,
+    jobs: int = 1,
+    workers: Optional[renderPool.WorkerPool] = None,
+    cache: Optional[RenderCache] = None,
+    cardCache: Optional[Dict[str, Card]] = None,
+    tokenCache: Optional[Dict[str, Card]] = None,
+) -> List[drawUtil.Canvas]:
+    """
+    Draws the cards of a deck (see DeckInput) as images, in order.
+    The options are the ones of makeProxies. Drawn cards are looked up in
+    and added to the given cache: a RenderCache uses the disk,
+    a MemoryRenderCache only the memory. Without a cache every card is drawn.
+    """
+    images = renderPool.streamCards(
+        deckCards(
+            deck,
+            cardCache=cardCache,
+            tokenCache=tokenCache,
+            ignoreBasicLands=ignoreBasicLands,
+            alternativeFrames=alternativeFrames,
+        ),
+        setIconPath=setIconPath,
+        isColored=isColored,
+        useTextSymbols=useTextSymbols,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=dpi,
+        draft=draft,
+        vector=vector,
+        jobs=jobs,
+        workers=workers,
+        cache=cache,
+    )
+    return list(images)  # type: ignore
+
+
+def renderPages(
+    deck: DeckInput,
+    setIconPath: Optional[str] = None,
+    isColored: bool = False,
+    useTextSymbols: bool = True,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    ignoreBasicLands: bool = False,
+    small: bool = False,
+    pageFormat: C.PageFormat = C.A4_FORMAT,
+    noCardSpace: bool = False,
+    dpi: int = C.DPI,
+    vector: bool = False,
+    jobs: int = 1,
+    workers: Optional[renderPool.WorkerPool] = None,
+    cache: Optional[RenderCache] = None,
+    cardCache: Optional[Dict[str, Card]] = None,
+    tokenCache: Optional[Dict[str, Card]] = None,
+) -> List[drawUtil.Canvas]:
+    """
+    Draws the cards of a deck (see renderCards) and returns the printable pages,
+    the same that makeProxies would save in pages/<deckName>/.
+    Cards are paginated as they are drawn, so only the cards
+    of the current page are kept in memory, with the pages
+    """
+    pool = CanvasPool()
+    images = renderPool.streamCards(
+        deckCards(
+            deck,
+            cardCache=cardCache,
+            tokenCache=tokenCache,
+            ignoreBasicLands=ignoreBasicLands,
+            alternativeFrames=alternativeFrames,
+        ),
+        setIconPath=setIconPath,
+        isColored=isColored,
+        useTextSymbols=useTextSymbols,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=drawUtil.getCardDpi(dpi=dpi, small=small),
+        vector=vector,
+        pool=pool,
+        jobs=jobs,
+        workers=workers,
+        cache=cache,
+    )
+    # Raster pages are reused by paginate, so every page is copied
+    return [
+        page if isinstance(page, SvgCanvas) else page.copy()
+        for (_, page) in drawUtil.paginate(
+            images,
+            small=small,
+            pageFormat=pageFormat,
+            noCardSpace=noCardSpace,
+            dpi=dpi,
+            pool=pool,
+        )
+    ]
+
+
+def encodeImages(images: Iterable[drawUtil.Canvas], dpi: int = C.DPI) -> List[bytes]:
+    """
+    Encodes cards or pages as the files makeProxies would save:
+    PNG images, or SVG documents for vector images
+    """
+    return [drawUtil.encodeImage(image, dpi=dpi) for image in images]
@@ -0,0 +1,90 @@
+from typing import Dict, List, Tuple
+from PIL import Image
+import os
+
+from . import projectConstants as C
+
+
+def resizeSetIcon(setIcon: Image.Image, iconSize: int = C.SET_ICON_SIZE) -> Image.Image:
+    """
+    Resizes the set icon so that it fits in a iconSize x iconSize square,
+    keeping its proportions
+    """
+    size = setIcon.size
+    scaleFactor = max(size[0] / iconSize, size[1] / iconSize)
+    setIcon = setIcon.resize(
+        size=(int(size[0] / scaleFactor), int(size[1] / scaleFactor))
+    )
+    return setIcon
+
+
+class AssetRegistry:
+    """
+    Loads the images used while drawing cards (illustration symbols and set icons)
+    only once, and keeps them already converted and scaled for every resolution.
+    The returned images are shared between all the cards,
+    so they must be treated as read only.
+    """
+
+    def __init__(self, symbolsLoc: str = C.BACK_CARD_SYMBOLS_LOC):
+        self.symbolsLoc = symbolsLoc
+        self._sources: Dict[str, Image.Image] = {}
+        self._symbols: Dict[Tuple[str, int], Image.Image] = {}
+        self._setIcons: Dict[Tuple[str, int], Image.Image] = {}
+
+    def _loadSource(self, path: str) -> Image.Image:
+        if path not in self._sources:
+            with Image.open(path) as source:
+                self._sources[path] = source.convert("RGBA")
+        return self._sources[path]
+
+    def symbolNames(self) -> List[str]:
+        return sorted(
+            os.path.splitext(fileName)[0]
+            for fileName in os.listdir(self.symbolsLoc)
+            if fileName.endswith(".png")
+        )
+
+    def getSymbol(self, name: str, dpi: int = C.DPI) -> Image.Image:
+        """
+        Returns the illustration symbol (basic land mana symbol or emblem symbol)
+        with the given name, scaled for the given resolution
+        """
+        key = (name, dpi)
+        if key not in self._symbols:
+            symbol = self._loadSource(f"{self.symbolsLoc}/{name}.png")
+            size = C.getResolution(dpi).ILLUSTRATION_SIZE
+            if symbol.size != (size, size):
+                symbol = symbol.resize((size, size), resample=Image.LANCZOS)
+            self._symbols[key] = symbol
+        return self._symbols[key]
+
+    def getSetIcon(self, path: str, dpi: int = C.DPI) -> Image.Image:
+        """
+        Returns the set icon at the given path, resized for the given resolution
+        """
+        key = (path, dpi)
+        if key not in self._setIcons:
+            self._setIcons[key] = resizeSetIcon(
+                self._loadSource(path), iconSize=C.getResolution(dpi).SET_ICON_SIZE
+            )
+        return self._setIcons[key]
+
+    def forget(self, path: str) -> None:
+        """
+        Drops the images loaded from the given file, so that they are loaded again
+        (e.g. once the file is changed)
+        """
+        self._sources.pop(path, None)
+        for key in [key for key in self._setIcons if key[0] == path]:
+            del self._setIcons[key]
+
+    def preload(self, dpi: int = C.DPI) -> None:
+        """
+        Loads all the illustration symbols for the given resolution
+        """
+        for name in self.symbolNames():
+            self.getSymbol(name, dpi=dpi)
+
+
+ASSETS = AssetRegistry()
@@ -0,0 +1,57 @@
+from typing import Dict, List, Tuple
+from PIL import Image
+import threading
+
+from . import projectConstants as C
+
+PoolKey = Tuple[str, Tuple[int, int]]
+
+# Maximum number of free images kept for every (mode, size)
+CANVAS_POOL_SIZE = 64
+
+
+class CanvasPool:
+    """
+    Keeps the card and page images that are no longer needed,
+    so that they can be reused instead of allocating new ones.
+    Acquired images have undefined content: they must be completely
+    overwritten (e.g. by pasting a template) or cleared before use.
+    Images can be acquired and released from different threads.
+    """
+
+    def __init__(self, maxFree: int = CANVAS_POOL_SIZE):
+        self.maxFree = maxFree
+        self._free: Dict[PoolKey, List[Image.Image]] = {}
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self, mode: str, size: Tuple[int, int]) -> Image.Image:
+        with self._lock:
+            free = self._free.get((mode, tuple(size)))
+            if free:
+                self.reused += 1
+                return free.pop()
+        self.allocated += 1
+        return Image.new(mode, size=tuple(size), color=C.WHITE)
+
+    def acquireBlank(self, mode: str, size: Tuple[int, int]) -> Image.Image:
+        """
+        Like acquire, but the image is cleared to white
+        """
+        image = self.acquire(mode, size)
+        image.paste(C.WHITE, box=(0, 0, image.width, image.height))
+        return image
+
+    def release(self, image: Image.Image) -> None:
+        """
+        Returns an image to the pool. The caller must not use it anymore
+        """
+        with self._lock:
+            free = self._free.setdefault((image.mode, image.size), [])
+            if len(free) < self.maxFree and all(image is not other for other in free):
+                free.append(image)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._free.clear()
@@ -0,0 +1,135 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import projectConstants as C
+from . import drawUtil
+from .decklist import DeckLine, parseLine, parseToken, resolveLines
+from .renderCache import RenderCache
+from .renderPool import COST_MODEL, FACE_COST, cardFlavorNames, cardIdentity
+from .projectTypes import Card, Flavor
+
+# Time to paginate and save a page at 300 dpi, for every color channel, in seconds
+PAGE_COST = 0.17
+# Time to search a card online, in seconds (Scryfall allows about 10 searches per second)
+LOOKUP_COST = 0.1
+
+
+def planDeck(
+    lines: Iterable[str],
+    cardCache: Dict[str, Card],
+    tokenCache: Dict[str, Card],
+    setIconPath: Optional[str] = None,
+    isColored: bool = False,
+    useTextSymbols: bool = True,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    ignoreBasicLands: bool = False,
+    small: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
+    vector: bool = False,
+    jobs: int = 1,
+    cache: Optional[RenderCache] = None,
+) -> Dict[str, Any]:
+    """
+    Finds what making the deck would take, without drawing anything
+    and without searching online: the number of cards and pages,
+    the cards to search online (not in the caches), the cards already drawn
+    (in the render cache), an estimate of the time in seconds,
+    and the lines that cannot be read
+    """
+    errors: List[str] = []
+    validLines: List[str] = []
+    for (number, line) in enumerate(lines, start=1):
+        try:
+            deckLine = parseLine(line)
+            if deckLine is not None and deckLine[3] is not None and ";" in deckLine[1]:
+                parseToken(text=deckLine[1], name=deckLine[2])
+        except Exception as err:
+            errors.append(f"Line {number} ({line.strip()}): {err}")
+            continue
+        validLines.append(line)
+
+    missing: List[DeckLine] = []
+    cards = list(
+        resolveLines(
+            validLines,
+            cardCache=cardCache,
+            tokenCache=tokenCache,
+            ignoreBasicLands=ignoreBasicLands,
+            alternativeFrames=alternativeFrames,
+            missing=missing,
+        )
+    )
+
+    options: Dict[str, Any] = dict(
+        isColored=isColored,
+        useTextSymbols=useTextSymbols,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=C.DRAFT_DPI if draft else drawUtil.getCardDpi(dpi=dpi, small=small),
+        draft=draft,
+    )
+    distinct: Dict[str, Tuple[Card, Flavor]] = {}
+    for (card, flavorNames) in cards:
+        distinct.setdefault(cardIdentity(card, flavorNames), (card, flavorNames))
+    drawn = 0
+    costs: List[float] = []
+    for (card, flavorNames) in distinct.values():
+        if cache is not None and not vector:
+            key = cache.cardKey(
+                card,
+                flavorNames=cardFlavorNames(card, flavorNames),
+                setIconPath=setIconPath,
+                options=options,
+            )
+            if cache.contains(key):
+                drawn += 1
+                continue
+        costs.append(COST_MODEL.estimate(card, options))
+
+    # Cards not in the caches are counted as single faced cards of average cost
+    lookups: Set[Tuple[str, bool]] = set()
+    missingCards = 0
+    for (cardCount, cardName, _, tokenType) in missing:
+        lookups.add((cardName, tokenType is not None))
+        missingCards += cardCount
+    averageCost = sum(costs) / len(costs) if len(costs) > 0 else FACE_COST
+    costs.extend([averageCost] * len(lookups))
+
+    totalCards = len(cards) + missingCards
+    (batchH, batchV) = drawUtil.getBatchSize(small)
+    if draft:
+        pages = 1 if totalCards > 0 else 0
+    else:
+        pages = (totalCards + batchH * batchV - 1) // (batchH * batchV)
+
+    # Estimated costs are roughly in milliseconds for cards drawn at 300 dpi,
+    # and drawing time grows with the number of pixels
+    scale = (options["dpi"] / C.DPI) ** 2
+    drawSeconds = sum(costs) / 1000 * scale
+    if jobs > 1 and not vector:
+        drawSeconds /= jobs
+    pageSeconds = pages * PAGE_COST * (3 if isColored else 1) * (dpi / C.DPI) ** 2
+    if draft:
+        pageSeconds *= (C.DRAFT_DPI / dpi) ** 2
+
+    return {
+        "totalCards": totalCards,
+        "distinctCards": len(distinct) + len(lookups),
+        "pages": pages,
+        "lookups": sorted(name for (name, _) in lookups),
+        "drawnCards": drawn,
+        "estimatedSeconds": drawSeconds + pageSeconds + len(lookups) * LOOKUP_COST,
+        "errors": errors,
+    }
+
+
+def formatPlan(deckName: str, plan: Dict[str, Any]) -> str:
+    text = [
+        f"{deckName}: {plan['totalCards']} cards ({plan['distinctCards']} distinct) on {plan['pages']} pages",
+        f"  {len(plan['lookups'])} cards to search online, {plan['drawnCards']} cards already drawn",
+        f"  about {plan['estimatedSeconds']:.1f} seconds",
+    ]
+    text.extend(f"  to search: {name}" for name in plan["lookups"])
+    text.extend(f"  error: {error}" for error in plan["errors"])
+    return "\n".join(text)
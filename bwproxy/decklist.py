@@ -0,0 +1,364 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from contextlib import contextmanager
+from scrython import Named, Search, ScryfallError
+import asyncio
+import pickle
+import re
+import os
+import threading
+import time
+
+from . import projectConstants as C
+from . import renderPool
+from .journal import Journal
+from .projectTypes import Card, Flavor
+
+
+def disambiguateTokenResults(query: str, results: List[Card]) -> List[Card]:
+    singleFaced: List[Card] = []
+    disambiguated: Dict[str, Card] = {}
+    for card in results:
+        try:
+            singleFaced.extend(card.card_faces)
+        except:
+            singleFaced.append(card)
+    for card in singleFaced:
+        if (
+            query.lower().replace(",", "") in card.name.lower().replace(",", "")
+            and card.type_line != "Token"
+            and card.type_line != ""
+        ):
+            index = f"{card.name}\n{card.type_line}\n{sorted(card.colors)}\n{card.oracle_text}"
+            if card.hasPT():
+                index += f"\n{card.power}/{card.toughness}"
+            disambiguated[index] = card
+
+    return list(disambiguated.values())
+
+
+def searchToken(tokenName: str, tokenType: str = C.TOKEN) -> List[Card]:
+    if tokenType == C.EMBLEM:
+        exactName = f"{tokenName} Emblem"
+    else:
+        exactName = tokenName
+    try:
+        cardQuery = Search(q=f"type:{tokenType} !'{exactName}")
+        results = [Card(cardData) for cardData in cardQuery.data()]  # type: ignore
+    except ScryfallError:
+        try:
+            cardQuery = Search(q=f"type:{tokenType} {tokenName}")
+            results = [Card(cardData) for cardData in cardQuery.data()]  # type: ignore
+        except ScryfallError:
+            results: List[Card] = []
+    return disambiguateTokenResults(query=tokenName, results=results)
+
+
+def parseToken(text: str, name: Optional[str] = None) -> Card:
+    data = [line.strip() for line in text.split(";")]
+
+    if data[0].lower() == "legendary":
+        supertype = "Legendary "
+        data.pop(0)
+    else:
+        supertype = ""
+
+    if "/" in data[0].lower():
+        pt = data[0].split("/")
+        power = pt[0]
+        toughness = pt[1]
+        data.pop(0)
+    else:
+        power = None
+        toughness = None
+
+    colors = [color for color in data.pop(0) if color != "C"]
+    subtypesString = data.pop(0)
+
+    possibleTypes = [word.strip().title() for word in data[0].split()]
+    if set(possibleTypes) <= set(C.CARD_TYPES):
+        # There are subtypes
+        types = f"{supertype}{' '.join(possibleTypes)}"
+        data.pop(0)
+        subtypes = " ".join([t.strip().title() for t in subtypesString.split()])
+        name = name if name else subtypes
+        type_line = f"Token {types} — {subtypes}"
+    else:
+        # No subtypes
+        typesString = subtypesString
+        possibleTypes = [word.strip().title() for word in typesString.split()]
+        type_line = f"Token {supertype}{' '.join(possibleTypes)}"
+
+    if name is None:
+        raise Exception(f"Missing name for token without subtypes: {text}")
+        
+    jsonData = {
+        "type_line": type_line,
+        "name": name,
+        "colors": colors,
+        "layout": C.TOKEN,
+        "mana_cost": "",
+    }
+
+    if "Creature" in jsonData["type_line"] or "Vehicle" in jsonData["type_line"]:
+        try:
+            assert power is not None
+            assert toughness is not None
+            jsonData["power"] = power
+            jsonData["toughness"] = toughness
+        except:
+            raise Exception(f"Power/Toughness missing for token: {name}")
+    
+    text_lines = [line for line in data if line]
+    jsonData["oracle_text"] = "\n".join(text_lines)
+    return Card(jsonData)
+
+
+def loadCardCaches() -> Tuple[Dict[str, Card], Dict[str, Card]]:
+    cardCache: Dict[str, Card]
+    tokenCache: Dict[str, Card]
+
+    if os.path.exists(C.CACHE_LOC):
+        with open(C.CACHE_LOC, "rb") as p:
+            cardCache = pickle.load(p)
+    else:
+        cardCache = {}
+
+    if os.path.exists(C.TOKEN_CACHE_LOC):
+        with open(C.TOKEN_CACHE_LOC, "rb") as p:
+            tokenCache = pickle.load(p)
+    else:
+        tokenCache = {}
+
+    return (cardCache, tokenCache)
+
+
+def saveCardCaches(cardCache: Dict[str, Card], tokenCache: Dict[str, Card]) -> None:
+    os.makedirs(os.path.dirname(C.CACHE_LOC), exist_ok=True)
+    with open(C.CACHE_LOC, "wb") as p:
+        pickle.dump(cardCache, p)
+
+    os.makedirs(os.path.dirname(C.TOKEN_CACHE_LOC), exist_ok=True)
+    with open(C.TOKEN_CACHE_LOC, "wb") as p:
+        pickle.dump(tokenCache, p)
+
+
+@contextmanager
+def threadEventLoop() -> Iterator[None]:
+    """
+    scrython searches cards on the event loop of the current thread,
+    and only the main thread has one by default:
+    other threads get their own while resolving decklists
+    """
+    if threading.current_thread() is threading.main_thread():
+        yield
+        return
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        yield
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+# (card count, card name, flavor name or token name in brackets, "token"/"emblem" or None)
+DeckLine = Tuple[int, str, Optional[str], Optional[str]]
+
+tokenEmblemRegex = re.compile(r"^(?:\d+x )?\((token|emblem)\)", flags=re.I)
+doubleSpacesRegex = re.compile(r" {2,}")
+removeCommentsRegex = re.compile(r"^//.*$|#.*$")
+cardCountRegex = re.compile(r"^([0-9]+)x?")
+flavorNameRegex = re.compile(r"\[(.*?)\]")
+cardNameRegex = re.compile(
+    r"^(?:\d+x? )?(?:\((?:token|emblem)\) )?(.*?)(?: \[.*?\])?$", flags=re.I
+)
+
+
+def parseLine(line: str) -> Optional[DeckLine]:
+    """
+    Parses a decklist line, returning None for empty lines and comments
+    """
+    line = removeCommentsRegex.sub("", line)
+    line = doubleSpacesRegex.sub(" ", line.strip())
+
+    if line == "":
+        return None
+
+    cardCountMatch = cardCountRegex.search(line)
+    cardCount = int(cardCountMatch.groups()[0]) if cardCountMatch else 1
+
+    flavorNameMatch = flavorNameRegex.search(line)
+    cardNameMatch = cardNameRegex.search(line)
+    tokenMatch = tokenEmblemRegex.search(line)
+
+    if cardNameMatch:
+        cardName = cardNameMatch.groups()[0]
+    else:
+        raise Exception(f"No card name found in line {line}")
+
+    return (
+        cardCount,
+        cardName,
+        flavorNameMatch.groups()[0] if flavorNameMatch else None,
+        tokenMatch.groups()[0].lower() if tokenMatch else None,
+    )
+
+
+def countCards(lines: Iterable[str]) -> int:
+    """
+    Counts the cards listed by a decklist, without searching them
+    (double faced cards are counted once)
+    """
+    return sum(deckLine[0] for deckLine in map(parseLine, lines) if deckLine is not None)
+
+
+def cardFaces(
+    card: Card, flavorNames: Flavor, alternativeFrames: bool = False
+) -> List[Tuple[Card, Flavor]]:
+    """
+    Returns what is drawn for a card of the deck, with the flavor names used:
+    double faced cards (and flip cards with alternative frames)
+    are drawn one face at a time
+    """
+    if card.layout in C.DFC_LAYOUTS or (card.layout == C.FLIP and alternativeFrames):
+        return [
+            (face, renderPool.cardFlavorNames(face, flavorNames))
+            for face in card.card_faces
+        ]
+    return [(card, renderPool.cardFlavorNames(card, flavorNames))]
+
+
+def resolveLines(
+    lines: Iterable[str],
+    cardCache: Dict[str, Card],
+    tokenCache: Dict[str, Card],
+    ignoreBasicLands: bool = False,
+    alternativeFrames: bool = False,
+    journal: Optional[Journal] = None,
+    missing: Optional[List[DeckLine]] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[Tuple[Card, Flavor]]:
+    """
+    Resolves the lines of a decklist, returning every card as soon as it is found
+    (searching online the ones not in the caches), with the flavor names it uses.
+    The caches are updated with the cards found online.
+    If a missing list is given, nothing is searched online:
+    the lines of the cards not in the caches are added to it instead.
+    With a deadline (as given by time.monotonic), no card is searched
+    after it: TimeoutError is raised instead
+    """
+    deckLines = [deckLine for deckLine in map(parseLine, lines) if deckLine is not None]
+
+    def checkDeadline() -> None:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("The cards took too long to search")
+
+    # Card of every line, once found (None if it cannot be found)
+    foundCards: Dict[int, Optional[Card]] = {}
+
+    def findCard(index: int) -> Optional[Card]:
+        if index in foundCards:
+            return foundCards[index]
+        cardName = deckLines[index][1]
+        cardData: Optional[Card] = None
+        if cardName in cardCache:
+            cardData = cardCache[cardName]
+        elif missing is None:
+            checkDeadline()
+            print(f"{cardName} not in cache. searching...")
+            try:
+                cardData = Card(Named(fuzzy=cardName))
+            except ScryfallError as err:
+                print(f"Skipping {cardName}. {err}")
+            else:
+                print(f"Card found! {cardData.name}")
+                cardCache[cardName] = cardData
+                if journal is not None:
+                    journal.recordCard(cardName, cardData)
+        foundCards[index] = cardData
+        return cardData
+
+    def setFlavorName(index: int, cardData: Card) -> None:
+        """
+        The last line listing the card decides its flavor name (for all its copies):
+        its custom flavor name, or else the official one, or else an earlier custom one.
+        Lines are compared by the card they list, not by how they spell it,
+        so the later lines that could change the flavor name are searched now
+        """
+        customFlavorNames: List[Optional[str]] = []
+        for laterIndex in range(index, len(deckLines)):
+            (_, cardName, bracketName, tokenType) = deckLines[laterIndex]
+            if tokenType is not None or (ignoreBasicLands and cardName in C.BASIC_LANDS):
+                continue
+            # Without an official flavor name, only custom flavor names count
+            if bracketName is None and not cardData.hasFlavorName():
+                continue
+            laterCard = findCard(laterIndex)
+            if laterCard is not None and laterCard.name == cardData.name:
+                customFlavorNames.append(bracketName)
+
+        if len(customFlavorNames) > 0 and customFlavorNames[-1] is not None:
+            flavorNames[cardData.name] = customFlavorNames[-1]
+        elif cardData.hasFlavorName():
+            flavorNames[cardData.name] = cardData.flavor_name
+
+    flavorNames: Flavor = {}
+    flavoredCards: Set[str] = set()
+    for (index, (cardCount, cardName, bracketName, tokenType)) in enumerate(deckLines):
+        if ignoreBasicLands and cardName in C.BASIC_LANDS:
+            print(
+                f"You have requested to ignore basic lands. {cardName} will not be printed."
+            )
+            continue
+
+        if tokenType is not None:
+            if ";" in cardName:
+                tokenData = parseToken(text=cardName, name=bracketName)
+            elif cardName in tokenCache:
+                tokenData = tokenCache[cardName]
+            elif missing is not None:
+                missing.append((cardCount, cardName, bracketName, tokenType))
+                continue
+            else:
+                checkDeadline()
+                print(f"{cardName} not in cache. searching...")
+                tokenList = searchToken(tokenName=cardName, tokenType=tokenType)
+
+                if len(tokenList) == 0:
+                    print(f"Skipping {cardName}. No corresponding tokens found")
+                    continue
+                if len(tokenList) > 1:
+                    print(
+                        f"Skipping {cardName}. Too many tokens found. Consider specifying the token info in the input file"
+                    )
+                    continue
+                tokenData = tokenList[0]
+                if journal is not None:
+                    journal.recordCard(cardName, tokenData, isToken=True)
+
+            tokenCache[cardName] = tokenData
+            tokenFlavorNames = renderPool.cardFlavorNames(tokenData, flavorNames)
+            for _ in range(cardCount):
+                yield (tokenData, tokenFlavorNames)
+            continue
+
+        if cardName not in cardCache and missing is not None:
+            missing.append((cardCount, cardName, bracketName, tokenType))
+            continue
+        cardData = findCard(index)
+        if cardData is None:
+            continue
+
+        if ignoreBasicLands and cardData.name in C.BASIC_LANDS:
+            print(
+                f"You have requested to ignore basic lands. {cardName} will not be printed."
+            )
+            continue
+
+        if cardData.name not in flavoredCards:
+            flavoredCards.add(cardData.name)
+            setFlavorName(index, cardData)
+
+        faces = cardFaces(cardData, flavorNames, alternativeFrames=alternativeFrames)
+        for _ in range(cardCount):
+            yield from faces
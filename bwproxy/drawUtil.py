@@ -1,17 +1,46 @@
-from typing import Tuple, List, Match, Union, Optional, TypeVar
-from PIL import Image, ImageDraw, ImageFont, ImageColor
+from typing import Any, Callable, Tuple, List, Match, Union, Optional, TypeVar, Iterable, Iterator, Sized
+from PIL import Image, ImageDraw, ImageFont, ImageColor, ImageChops
+from collections import OrderedDict
+from functools import lru_cache
 from tqdm import tqdm
+import io
 import os
 import re
+import threading
 
 from . import projectConstants as C
+from .assetRegistry import ASSETS, resizeSetIcon  # type: ignore
+from .canvasPool import CanvasPool  # type: ignore
 from .projectTypes import Card, Deck, Flavor, XY, Box, Layout  # type: ignore
+from .svgCanvas import SvgCanvas, SvgPen  # type: ignore
 
 RgbColor = Union[Tuple[int, int, int], Tuple[int, int, int, int]]
+# Cards can be drawn as raster images, or as vector images (see svgCanvas)
+Canvas = Union[Image.Image, SvgCanvas]
 
 DEF_BORDER_COLOR = C.FRAME_COLORS["default"]
 DEF_BORDER_RGB = ImageColor.getrgb(DEF_BORDER_COLOR)
 
+def getPen(image: Canvas) -> Union[ImageDraw.ImageDraw, SvgPen]:
+    """
+    Returns the object used to draw on a raster or vector card
+    """
+    if isinstance(image, SvgCanvas):
+        return image.getPen()
+    return ImageDraw.Draw(image)
+
+
+def newCanvas(
+    mode: str, size: Tuple[int, int], dpi: int = C.DPI, vector: bool = False
+) -> Canvas:
+    """
+    Creates a white raster or vector card or page
+    """
+    if vector:
+        return SvgCanvas(size, dpi=dpi, mode=mode)
+    return Image.new(mode, size=size, color=C.WHITE)
+
+
 # Text formatting
 
 specialTextRegex = re.compile(r"\{.+?\}")
@@ -42,40 +71,82 @@ def printSymbols(text: S) -> S:
     return specialTextRegex.sub(replFunction, text).replace("−", "-")
 
 
-def fitOneLine(fontPath: str, text: str, maxWidth: int, fontSize: int):
+@lru_cache(maxsize=None)
+def getFont(fontPath: str, fontSize: int) -> ImageFont.FreeTypeFont:
+    """
+    Loads a font only once for every size
+    """
+    return ImageFont.truetype(fontPath, fontSize)
+
+
+@lru_cache(maxsize=None)
+def charWidth(fontPath: str, fontSize: int, char: str) -> float:
+    return getFont(fontPath, fontSize).getlength(char)
+
+
+def approximateWidth(fontPath: str, fontSize: int, text: str) -> float:
+    """
+    Estimates the text width as the sum of the widths of its characters.
+    Kerning is ignored, so it is only used for draft rendering
+    """
+    return sum(charWidth(fontPath, fontSize, c) for c in text)
+
+
+def fitOneLine(
+    fontPath: str, text: str, maxWidth: int, fontSize: int, approximate: bool = False
+):
     """
     Function that tries to fit one line of text in the specified width.
     It starts with the specified font size, and if the text is too long
     it reduces the font size by one and tries again.
+    If approximate is True, the font size is instead reduced
+    proportionally to the estimated overflow.
     """
-    font = ImageFont.truetype(fontPath, fontSize)
+    if approximate:
+        width = approximateWidth(fontPath, fontSize, text)
+        if width > maxWidth:
+            fontSize = max(1, int(fontSize * maxWidth / width))
+        return getFont(fontPath, fontSize)
+
+    font = getFont(fontPath, fontSize)
     while font.getsize(text)[0] > maxWidth:
         fontSize -= 1
-        font = ImageFont.truetype(fontPath, fontSize)
+        font = getFont(fontPath, fontSize)
     return font
 
 
 def fitMultiLine(
-    fontPath: str, cardText: str, maxWidth: int, maxHeight: int, fontSize: int
+    fontPath: str,
+    cardText: str,
+    maxWidth: int,
+    maxHeight: int,
+    fontSize: int,
+    approximate: bool = False,
 ) -> Tuple[str, ImageFont.FreeTypeFont]:
     """
     Recursive function that tries to fit multiple lines of text in the specified box.
     It starts with the specified font size, chops the text based on the max width,
     and if the text overflows vertically it reduces the font size by one and tries again.
+    If approximate is True, the line widths are estimated (see approximateWidth)
+    and the font size is reduced proportionally to the overflow.
     """
     # the terminology here gets weird so to simplify:
     # a rule is a single line of oracle text.
     #       ex: Smuggler's Copter has 3 rules.
     # line means a printed line. a rule may have multiple lines.
 
-    font = ImageFont.truetype(fontPath, fontSize)
+    font = getFont(fontPath, fontSize)
     fmtRules = []
 
     for rule in cardText.split("\n"):
         ruleLines = []
         curLine = ""
         for word in rule.split(" "):
-            if font.getsize(curLine + " " + word)[0] > maxWidth:
+            if approximate:
+                lineWidth = approximateWidth(fontPath, fontSize, curLine + " " + word)
+            else:
+                lineWidth = font.getsize(curLine + " " + word)[0]
+            if lineWidth > maxWidth:
                 ruleLines.append(curLine)
                 curLine = word + " "
             else:
@@ -85,12 +156,90 @@ def fitMultiLine(
 
     fmtText = "\n\n".join(fmtRules)
 
-    if font.getsize(fmtText)[1] * len(fmtText.split("\n")) > maxHeight:
+    lineCount = len(fmtText.split("\n"))
+    if approximate:
+        textHeight = sum(font.getmetrics()) * lineCount
+        if textHeight > maxHeight and fontSize > 1:
+            # Text area grows with the square of the font size
+            newSize = int(fontSize * (maxHeight / textHeight) ** 0.5)
+            return fitMultiLine(
+                fontPath,
+                cardText,
+                maxWidth,
+                maxHeight,
+                max(1, min(newSize, fontSize - 1)),
+                approximate=True,
+            )
+        return (fmtText, font)
+
+    if font.getsize(fmtText)[1] * lineCount > maxHeight:
         return fitMultiLine(fontPath, cardText, maxWidth, maxHeight, fontSize - 1)
     else:
         return (fmtText, font)
 
 
+# Glyph atlas
+
+# Mana costs and face symbols are a small set of strings drawn on many cards,
+# so they are rasterized once per font and size, and then blitted.
+# Whole runs are cached instead of single glyphs,
+# because placing single glyphs can move them by a pixel (kerning, rounding).
+GLYPH_ATLAS_SIZE = 1024
+glyphAtlas: "OrderedDict[Tuple[str, int, str, str, str], Tuple[Any, Tuple[int, int]]]" = OrderedDict()
+# Cards can be drawn by many threads (e.g. the pipeline and the service)
+glyphAtlasLock = threading.Lock()
+
+
+def getGlyphRun(
+    font: ImageFont.FreeTypeFont, text: str, anchor: str, fontMode: str
+) -> Tuple[Any, Tuple[int, int]]:
+    """
+    Returns the (cached) rasterized text and its offset from the anchor,
+    as returned by FreeTypeFont.getmask2
+    """
+    key = (font.path, font.size, text, anchor, fontMode)
+    with glyphAtlasLock:
+        if key in glyphAtlas:
+            glyphAtlas.move_to_end(key)
+            return glyphAtlas[key]
+    # Rasterized outside the lock: at worst two threads rasterize the same run
+    glyphRun = font.getmask2(text, fontMode, anchor=anchor)
+    with glyphAtlasLock:
+        glyphAtlas[key] = glyphRun
+        if len(glyphAtlas) > GLYPH_ATLAS_SIZE:
+            glyphAtlas.popitem(last=False)
+    return glyphRun
+
+
+def drawSymbols(
+    pen: Union[ImageDraw.ImageDraw, SvgPen],
+    xy: Tuple[int, int],
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    fill: str,
+    anchor: str,
+) -> None:
+    """
+    Same as pen.text, but the text is taken from the glyph atlas.
+    Vector cards keep the text as text
+    """
+    # Blitting uses Pillow internals (as of Pillow 9.1, see requirements.txt):
+    # if they change, the text is drawn as usual
+    if (
+        isinstance(pen, SvgPen)
+        or not hasattr(pen, "_getink")
+        or not hasattr(pen.draw, "draw_bitmap")
+    ):
+        pen.text(xy, text=text, font=font, fill=fill, anchor=anchor)
+        return
+    (mask, offset) = getGlyphRun(
+        font=font, text=text, anchor=anchor, fontMode=pen.fontmode
+    )
+    # Same steps as ImageDraw.text, without rasterizing the text again
+    (ink, _) = pen._getink(fill)  # type: ignore
+    pen.draw.draw_bitmap((xy[0] + offset[0], xy[1] + offset[1]), mask, ink)  # type: ignore
+
+
 def calcTopValue(
     font: ImageFont.FreeTypeFont, text: str, upperBorder: int, spaceSize: int
 ) -> int:
@@ -113,7 +262,7 @@ def calcTopValue(
 
 
 def getLayoutInfoAndRotation(
-    card: Card, alternativeFrames: bool = False
+    card: Card, alternativeFrames: bool = False, dpi: int = C.DPI
 ) -> Tuple[str, Layout, bool, bool]:
     """
     Given a card face, return the correct layout for the face,
@@ -137,7 +286,7 @@ def getLayoutInfoAndRotation(
         elif layoutName == C.AFTER:
             layoutName = C.SPLIT
 
-    layoutInfoList = C.LAYOUTS[layoutName]
+    layoutInfoList = C.getResolution(dpi).LAYOUTS[layoutName]
 
     if layoutName in C.TWO_PARTS_LAYOUTS:
         layoutInfo = layoutInfoList[card.face_num]
@@ -153,99 +302,164 @@ def getLayoutInfoAndRotation(
     return (layoutName, layoutInfo, rotate, flip)
 
 
+# Face orientation
+
+Orientation = Tuple[bool, bool]
+
+
+def getFaces(card: Card) -> List[Card]:
+    """
+    Returns the faces of a card (the card itself if it has only one face)
+    """
+    if card.isTwoParts():
+        return card.card_faces
+    return [card]
+
+
+def groupFacesByOrientation(
+    card: Card, alternativeFrames: bool = False
+) -> List[Tuple[Orientation, List[Card]]]:
+    """
+    Splits the card faces in groups of consecutive faces
+    with the same orientation (rotate, flip).
+    Every group can then be drawn with a single transform of the card,
+    instead of transposing the card for every element of every face.
+    """
+    groups: List[Tuple[Orientation, List[Card]]] = []
+    for face in getFaces(card):
+        (_, _, rotate, flip) = getLayoutInfoAndRotation(
+            card=face, alternativeFrames=alternativeFrames
+        )
+        if len(groups) > 0 and groups[-1][0] == (rotate, flip):
+            groups[-1][1].append(face)
+        else:
+            groups.append(((rotate, flip), [face]))
+    return groups
+
+
+def orientCard(image: Image.Image, rotate: bool, flip: bool) -> Image.Image:
+    """
+    Transposes the card so that a rotated or flipped face
+    can be drawn using its own layout coordinates.
+    Use restoreCard to go back to the card orientation.
+    """
+    if rotate:
+        return image.transpose(Image.ROTATE_90)
+    elif flip:
+        return image.transpose(Image.ROTATE_180)
+    return image
+
+
+def restoreCard(image: Image.Image, rotate: bool, flip: bool) -> Image.Image:
+    """
+    Inverse of orientCard
+    """
+    if rotate:
+        return image.transpose(Image.ROTATE_270)
+    elif flip:
+        return image.transpose(Image.ROTATE_180)
+    return image
+
+
 # Black frame
 
 
-def makeFrame(
-    card: Card, image: Image.Image, alternativeFrames: bool = False
+def drawFaceFrame(
+    face: Card, image: Image.Image, alternativeFrames: bool = False, dpi: int = C.DPI
 ) -> Image.Image:
     """
-    Creates a frame on which we can draw the card,
-    and draws the basic card parts on it (black only)
-    Color, if needed, will be added later
+    Draws the frame of a single face (black only).
+    The image must already be oriented for the face (see orientCard)
     """
+    (_, layoutInfo, _, _) = getLayoutInfoAndRotation(
+        card=face, alternativeFrames=alternativeFrames, dpi=dpi
+    )
+    R = C.getResolution(dpi)
+    arcTop = layoutInfo.BORDER.ILLUSTRATION - R.TOKEN_ARC_OFFSET
 
-    try:
-        faces = card.card_faces
-    except:
-        faces = [card]
+    pen = getPen(image)
 
-    for face in faces:
-        (_, layoutInfo, rotate, flip) = getLayoutInfoAndRotation(
-            card=face, alternativeFrames=alternativeFrames
+    for cardSection in [
+        "ILLUSTRATION",
+        "TYPE_LINE",
+        "RULES_BOX",
+        "OTHER",
+        "BOTTOM",
+    ]:
+        pen.rectangle(
+            (
+                (layoutInfo.BORDER.LEFT, layoutInfo.BORDER.TITLE),
+                (layoutInfo.BORDER.RIGHT, layoutInfo.BORDER[cardSection]),
+            ),
+            outline=DEF_BORDER_COLOR,
+            width=R.LINE_WIDTH,
         )
 
-        if rotate:
-            image = image.transpose(Image.ROTATE_90)
-        elif flip:
-            image = image.transpose(Image.ROTATE_180)
-
-        pen = ImageDraw.Draw(image)
-
-        for cardSection in [
-            "ILLUSTRATION",
-            "TYPE_LINE",
-            "RULES_BOX",
-            "OTHER",
-            "BOTTOM",
-        ]:
-            pen.rectangle(
-                (
-                    (layoutInfo.BORDER.LEFT, layoutInfo.BORDER.TITLE),
-                    (layoutInfo.BORDER.RIGHT, layoutInfo.BORDER[cardSection]),
-                ),
-                outline=DEF_BORDER_COLOR,
-                width=5,
-            )
+    if face.hasPTL():
+        pen.rectangle(
+            (
+                layoutInfo.BORDER.PTL_BOX_LEFT,
+                layoutInfo.BORDER.PTL_BOX_TOP,
+                layoutInfo.BORDER.PTL_BOX_RIGHT,
+                layoutInfo.BORDER.PTL_BOX_BOTTOM,
+            ),
+            outline=DEF_BORDER_COLOR,
+            fill=C.WHITE,
+            width=R.LINE_WIDTH,
+        )
 
-        if face.hasPTL():
-            pen.rectangle(
-                (
-                    layoutInfo.BORDER.PTL_BOX_LEFT,
-                    layoutInfo.BORDER.PTL_BOX_TOP,
-                    layoutInfo.BORDER.PTL_BOX_RIGHT,
-                    layoutInfo.BORDER.PTL_BOX_BOTTOM,
-                ),
-                outline=DEF_BORDER_COLOR,
-                fill=C.WHITE,
-                width=5,
-            )
+    if face.face_type == C.FUSE:
+        # Using 0 and CARD_V, unfortunately
+        pen.rectangle(
+            ((0, layoutInfo.BORDER.FUSE), (R.CARD_V, layoutInfo.BORDER.OTHER)),
+            outline=DEF_BORDER_COLOR,
+            fill=C.WHITE,
+            width=R.LINE_WIDTH,
+        )
 
-        if face.face_type == C.FUSE:
-            # Using 0 and CARD_V, unfortunately
-            pen.rectangle(
-                ((0, layoutInfo.BORDER.FUSE), (C.CARD_V, layoutInfo.BORDER.OTHER)),
-                outline=DEF_BORDER_COLOR,
-                fill=C.WHITE,
-                width=5,
-            )
+    if face.isTokenOrEmblem():
+        pen.arc(
+            (
+                (0, arcTop),
+                (R.TOKEN_ARC_WIDTH, arcTop + R.TOKEN_ARC_WIDTH)
+            ),
+            start=180,
+            end=270,
+            fill=DEF_BORDER_COLOR,
+            width=R.LINE_WIDTH,
+        )
+        pen.arc(
+            (
+                (layoutInfo.BORDER.RIGHT - R.TOKEN_ARC_WIDTH, arcTop),
+                (layoutInfo.BORDER.RIGHT, arcTop + R.TOKEN_ARC_WIDTH)
+            ),
+            start=270,
+            end=360,
+            fill=DEF_BORDER_COLOR,
+            width=R.LINE_WIDTH,
+        )
 
-        if face.isTokenOrEmblem():
-            pen.arc(
-                (
-                    (0, layoutInfo.BORDER.ILLUSTRATION - 4),
-                    (C.TOKEN_ARC_WIDTH, layoutInfo.BORDER.ILLUSTRATION + C.TOKEN_ARC_WIDTH - 4)
-                ),
-                start=180,
-                end=270,
-                fill=DEF_BORDER_COLOR,
-                width=5,
-            )
-            pen.arc(
-                (
-                    (layoutInfo.BORDER.RIGHT - C.TOKEN_ARC_WIDTH, layoutInfo.BORDER.ILLUSTRATION - 4),
-                    (layoutInfo.BORDER.RIGHT, layoutInfo.BORDER.ILLUSTRATION + C.TOKEN_ARC_WIDTH - 4)
-                ),
-                start=270,
-                end=360,
-                fill=DEF_BORDER_COLOR,
-                width=5,
-            )
+    return image
 
-        if rotate:
-            image = image.transpose(Image.ROTATE_270)
-        elif flip:
-            image = image.transpose(Image.ROTATE_180)
+
+def makeFrame(
+    card: Card, image: Image.Image, alternativeFrames: bool = False, dpi: int = C.DPI
+) -> Image.Image:
+    """
+    Creates a frame on which we can draw the card,
+    and draws the basic card parts on it (black only)
+    Color, if needed, will be added later
+    """
+
+    for ((rotate, flip), faces) in groupFacesByOrientation(
+        card=card, alternativeFrames=alternativeFrames
+    ):
+        image = orientCard(image=image, rotate=rotate, flip=flip)
+        for face in faces:
+            image = drawFaceFrame(
+                face=face, image=image, alternativeFrames=alternativeFrames, dpi=dpi
+            )
+        image = restoreCard(image=image, rotate=rotate, flip=flip)
 
     return image
 
@@ -257,137 +471,221 @@ def interpolateColor(color1: RgbColor, color2: RgbColor, weight: float) -> RgbCo
     return tuple(int(a + (weight * (b - a))) for a, b in zip(color1, color2))
 
 
-def coloredTemplateSimple(card: Card, size: XY) -> Image.Image:
+def getFrameColors(colors: Tuple[C.MTG_COLORS, ...]) -> List[RgbColor]:
     """
-    Create a new image of specified size that is completely colored.
-    If monocolor, colorless or pentacolor the color is uniform,
-    otherwise there's a gradient effect for all the card colors
+    Returns the list of colors used for the frame gradient.
+    If monocolor, colorless or pentacolor the list has only one color,
+    otherwise it has one color for each card color
     """
-    coloredTemplate = Image.new("RGB", size=size, color=C.WHITE)
-    colors = card.colors
-
-    pen = ImageDraw.Draw(coloredTemplate)
-
-    imgColors = []
     if len(colors) == 0:
-        multicolor = False
-        imgColor = ImageColor.getrgb(C.FRAME_COLORS["C"])
+        return [ImageColor.getrgb(C.FRAME_COLORS["C"])]
     elif len(colors) == 1:
-        multicolor = False
-        imgColor = ImageColor.getrgb(C.FRAME_COLORS[colors[0]])
+        return [ImageColor.getrgb(C.FRAME_COLORS[colors[0]])]
     elif len(colors) == 5:
-        multicolor = False
-        imgColor = ImageColor.getrgb(C.FRAME_COLORS["M"])
-    else:
-        multicolor = True
-        imgColor = ImageColor.getrgb(C.FRAME_COLORS["M"])
-        imgColors = [ImageColor.getrgb(C.FRAME_COLORS[c]) for c in colors]
-
-    if not multicolor:
-        for idx in range(size[0]):
-            pen.line(
-                [(idx, 0), (idx, size[1])],
-                imgColor,
-                width=1,
-            )
-        return coloredTemplate
+        return [ImageColor.getrgb(C.FRAME_COLORS["M"])]
+    return [ImageColor.getrgb(C.FRAME_COLORS[c]) for c in colors]
+
+
+@lru_cache(maxsize=None)
+def gradientTemplate(colors: Tuple[C.MTG_COLORS, ...], size: Tuple[int, int]) -> Image.Image:
+    """
+    Create a new image of specified size that is completely colored,
+    with a horizontal gradient between the frame colors.
+    The gradient is computed once as a single row of pixels,
+    which is then stretched vertically.
+    Results are cached, so the returned image is shared and must not be modified.
+    """
+    imgColors = getFrameColors(colors)
+
+    if len(imgColors) == 1:
+        return Image.new("RGB", size=size, color=imgColors[0])
 
     n = len(imgColors) - 1
     segmentLength = size[0] // n
-    # imgColors.append(imgColors[-1]) # Necessary line in order not to crash
+    # The last pixels (if the width is not divisible by n) keep the last color
+    imgColors.append(imgColors[-1])
 
+    row: List[RgbColor] = []
     for idx in range(size[0]):
-        i = idx // segmentLength
-        pen.line(
-            [(idx, 0), (idx, size[1])],
+        i = min(idx // segmentLength, n)
+        row.append(
             interpolateColor(
                 imgColors[i], imgColors[i + 1], (idx % segmentLength) / segmentLength
-            ),
-            width=1,
+            )
         )
 
-    return coloredTemplate
+    gradientRow = Image.new("RGB", size=(size[0], 1))
+    gradientRow.putdata(row)
+    return gradientRow.resize(size, resample=Image.NEAREST)
+
+
+def coloredTemplateSimple(card: Card, size: XY) -> Image.Image:
+    """
+    Create a new image of specified size that is completely colored.
+    If monocolor, colorless or pentacolor the color is uniform,
+    otherwise there's a gradient effect for all the card colors.
+    The returned image is shared between cards with the same colors.
+    """
+    return gradientTemplate(colors=tuple(card.colors), size=tuple(size))
 
 
 def colorHalf(
-    card: Card, image: Image.Image, layout: Layout, rotate: bool = False
+    colors: Tuple[C.MTG_COLORS, ...],
+    image: Image.Image,
+    position: XY,
+    size: XY,
+    rotate: bool = False,
 ) -> Image.Image:
-    if rotate:
-        image = image.transpose(Image.ROTATE_90)
-    size = XY(layout.SIZE.H, layout.SIZE.V)
-    halfImage = coloredTemplateSimple(card=card, size=size)
-    image.paste(halfImage, box=(layout.BORDER.LEFT, layout.BORDER.TITLE))
-    if rotate:
-        image = image.transpose(Image.ROTATE_270)
-    return image
+    image = orientCard(image=image, rotate=rotate, flip=False)
+    halfImage = gradientTemplate(colors=colors, size=tuple(size))
+    image.paste(halfImage, box=tuple(position))
+    return restoreCard(image=image, rotate=rotate, flip=False)
+
+
+ColorPart = Tuple[Tuple[C.MTG_COLORS, ...], XY, XY, bool]
 
 
-def coloredBlank(card: Card) -> Image.Image:
+def coloredBlankParts(
+    layoutName: str,
+    facesColors: Tuple[Tuple[C.MTG_COLORS, ...], ...],
+    dpi: int = C.DPI,
+) -> List[ColorPart]:
     """
-    Creates a template for two-colored card frames,
-    with a color shift from the first color to the second
-    This template is then used to set the colors in the real frame
+    Returns the colored sections of the template for a given layout and face colors,
+    as (colors, position, size, rotate). If rotate is True, position and size
+    refer to the card rotated like split cards (see orientCard)
     """
-    coloredTemplate = Image.new("RGB", size=C.CARD_SIZE, color=C.WHITE)
-
-    if card.layout in [C.SPLIT, C.FUSE]:
-        # breakpoint()
-        faces = card.card_faces
-        coloredTemplate = colorHalf(
-            card=faces[0],
-            image=coloredTemplate,
-            layout=C.SPLIT_LAYOUT_LEFT,
-            rotate=True,
-        )
-        coloredTemplate = colorHalf(
-            card=faces[1],
-            image=coloredTemplate,
-            layout=C.SPLIT_LAYOUT_RIGHT,
-            rotate=True,
-        )
-        return coloredTemplate
-    elif card.layout == C.AFTER:
-        faces = card.card_faces
-        coloredTemplate = colorHalf(
-            card=faces[0], image=coloredTemplate, layout=C.AFTERMATH_LAYOUT
+    R = C.getResolution(dpi)
+
+    def facePart(
+        colors: Tuple[C.MTG_COLORS, ...], layout: Layout, rotate: bool = False
+    ) -> ColorPart:
+        return (
+            colors,
+            XY(layout.BORDER.LEFT, layout.BORDER.TITLE),
+            XY(layout.SIZE.H, layout.SIZE.V),
+            rotate,
         )
+
+    if layoutName in [C.SPLIT, C.FUSE]:
+        return [
+            facePart(facesColors[0], R.SPLIT_LAYOUT_LEFT, rotate=True),
+            facePart(facesColors[1], R.SPLIT_LAYOUT_RIGHT, rotate=True),
+        ]
+    elif layoutName == C.AFTER:
+        return [
+            facePart(facesColors[0], R.AFTERMATH_LAYOUT),
+            facePart(facesColors[1], R.SPLIT_LAYOUT_RIGHT, rotate=True),
+        ]
+    # Flip does not have multicolored cards, so I'm ignoring it
+    # Adventure for now is monocolored or both parts are the same color
+    else:
+        return [(facesColors[0], XY(0, 0), R.CARD_SIZE, False)]
+
+
+@lru_cache(maxsize=None)
+def coloredBlankTemplate(
+    layoutName: str,
+    facesColors: Tuple[Tuple[C.MTG_COLORS, ...], ...],
+    dpi: int = C.DPI,
+) -> Image.Image:
+    """
+    Creates the colored template for a given layout and face colors.
+    Results are cached, so the returned image is shared and must not be modified.
+    """
+    R = C.getResolution(dpi)
+    parts = coloredBlankParts(
+        layoutName=layoutName, facesColors=facesColors, dpi=dpi
+    )
+    if len(parts) == 1:
+        (colors, _, size, _) = parts[0]
+        return gradientTemplate(colors=colors, size=tuple(size))
+
+    coloredTemplate = Image.new("RGB", size=R.CARD_SIZE, color=C.WHITE)
+    for (colors, position, size, rotate) in parts:
         coloredTemplate = colorHalf(
-            card=faces[1],
+            colors=colors,
             image=coloredTemplate,
-            layout=C.SPLIT_LAYOUT_RIGHT,
-            rotate=True,
+            position=position,
+            size=size,
+            rotate=rotate,
         )
-        return coloredTemplate
-    # Flip does not have multicolored cards, so I'm ignoring it
-    # Adventure for now is monocolored or both parts are the same color
+    return coloredTemplate
+
+
+def coloredBlank(card: Card, dpi: int = C.DPI) -> Image.Image:
+    """
+    Creates a template for two-colored card frames,
+    with a color shift from the first color to the second
+    This template is then used to set the colors in the real frame.
+    There are only a few color and layout combinations,
+    so templates are shared between cards and must not be modified.
+    """
+    (layoutName, facesColors) = coloredBlankKey(card=card)
+    return coloredBlankTemplate(
+        layoutName=layoutName, facesColors=facesColors, dpi=dpi
+    )
+
+
+def coloredBlankKey(
+    card: Card,
+) -> Tuple[str, Tuple[Tuple[C.MTG_COLORS, ...], ...]]:
+    """
+    Returns the (layout, face colors) pair identifying the colored template of a card
+    """
+    if card.layout in [C.SPLIT, C.FUSE, C.AFTER]:
+        layoutName = C.SPLIT if card.layout == C.FUSE else card.layout
+        facesColors = tuple(tuple(face.colors) for face in card.card_faces)
     else:
-        return coloredTemplateSimple(card=card, size=C.CARD_SIZE)
+        layoutName = C.STD
+        facesColors = (tuple(card.colors),)
+    return (layoutName, facesColors)
+
 
+def borderMask(image: Image.Image) -> Image.Image:
+    """
+    Returns a mask that is white where the image has the default border color,
+    and black everywhere else.
+    """
+    bandMasks = [
+        band.point(lambda v, c=c: 255 if v == c else 0)  # type: ignore
+        for band, c in zip(image.split(), DEF_BORDER_RGB)
+    ]
+    mask = bandMasks[0]
+    for bandMask in bandMasks[1:]:
+        mask = ImageChops.multiply(mask, bandMask)
+    return mask
+
+
+def colorBorders(card: Card, image: Canvas, dpi: int = C.DPI) -> Canvas:
+    if isinstance(image, SvgCanvas):
+        # Vector frames are colored with gradients instead of a template image
+        (layoutName, facesColors) = coloredBlankKey(card=card)
+        image.colorBorders(
+            borderColor=DEF_BORDER_COLOR,
+            parts=[
+                (getFrameColors(colors), position, size, rotate)
+                for (colors, position, size, rotate) in coloredBlankParts(
+                    layoutName=layoutName, facesColors=facesColors, dpi=dpi
+                )
+            ],
+        )
+        return image
 
-def colorBorders(card: Card, image: Image.Image) -> Image.Image:
-    coloredTemplate = coloredBlank(card=card)
-    for idx in range(C.CARD_H):
-        for idy in range(C.CARD_V):
-            if image.getpixel((idx, idy)) == DEF_BORDER_RGB:
-                image.putpixel((idx, idy), coloredTemplate.getpixel((idx, idy)))  # type: ignore
+    coloredTemplate = coloredBlank(card=card, dpi=dpi)
+    image.paste(coloredTemplate, mask=borderMask(image))
     return image
 
 
 # Symbol
 
 
-def resizeSetIcon(setIcon: Image.Image) -> Image.Image:
-    iconSize = setIcon.size
-    scaleFactor = max(iconSize[0] / C.SET_ICON_SIZE, iconSize[1] / C.SET_ICON_SIZE)
-    setIcon = setIcon.resize(
-        size=(int(iconSize[0] / scaleFactor), int(iconSize[1] / scaleFactor))
-    )
-    return setIcon
-
-
-def correctSetIconPosition(setIcon: Image.Image, position: XY) -> XY:
+def correctSetIconPosition(
+    setIcon: Image.Image, position: XY, dpi: int = C.DPI
+) -> XY:
     iconSize: XY = XY(setIcon.size)
-    setIconSizeXY: XY = XY(C.SET_ICON_SIZE, C.SET_ICON_SIZE)
+    setIconSize = C.getResolution(dpi).SET_ICON_SIZE
+    setIconSizeXY: XY = XY(setIconSize, setIconSize)
     return position + (setIconSizeXY - iconSize).scale(0.5)
 
 
@@ -396,55 +694,58 @@ def pasteSetIcon(
     image: Image.Image,
     setIcon: Image.Image,
     alternativeFrames: bool = False,
+    dpi: int = C.DPI,
 ) -> Image.Image:
+    """
+    Pastes the set icon on the type line of a card face.
+    The image must already be oriented for the face (see orientCard)
+    """
 
-    try:
-        faces = card.card_faces
-    except:
-        faces = [card]
-
-    for face in faces:
-        (layoutName, _, rotate, flip) = getLayoutInfoAndRotation(
-            card=face, alternativeFrames=alternativeFrames
-        )
-
-        if layoutName in C.TWO_PARTS_LAYOUTS:
-            position = C.SET_ICON_POSITIONS[layoutName][face.face_num]
-        else:
-            position = C.SET_ICON_POSITIONS[layoutName][0]
-
-        if rotate:
-            image = image.transpose(Image.ROTATE_90)
-        elif flip:
-            image = image.transpose(Image.ROTATE_180)
+    (layoutName, _, _, _) = getLayoutInfoAndRotation(
+        card=card, alternativeFrames=alternativeFrames, dpi=dpi
+    )
 
-        image.paste(
-            im=setIcon,
-            box=correctSetIconPosition(setIcon=setIcon, position=position).tuple(),
-        )
+    setIconPositions = C.getResolution(dpi).SET_ICON_POSITIONS[layoutName]
+    if layoutName in C.TWO_PARTS_LAYOUTS:
+        position = setIconPositions[card.face_num]
+    else:
+        position = setIconPositions[0]
 
-        if rotate:
-            image = image.transpose(Image.ROTATE_270)
-        elif flip:
-            image = image.transpose(Image.ROTATE_180)
+    image.paste(
+        im=setIcon,
+        box=correctSetIconPosition(
+            setIcon=setIcon, position=position, dpi=dpi
+        ).tuple(),
+    )
 
     return image
 
 
-def drawIllustrationSymbol(card: Card, image: Image.Image) -> Image.Image:
-
+def getIllustrationSymbolName(card: Card) -> Optional[str]:
+    """
+    Returns the name of the symbol drawn in the illustration
+    (mana symbol for basic lands, planeswalker symbol for emblems), if any
+    """
     if card.isBasicLand():
-        illustrationSymbolName = card.name.split()[-1]
-        position = C.LAND_MANA_SYMBOL_POSITION.tuple()
+        return card.name.split()[-1]
     elif card.isEmblem():
-        illustrationSymbolName = "Emblem"
-        position = C.EMBLEM_SYMBOL_POSITION.tuple()
-    else:
+        return "Emblem"
+    return None
+
+
+def drawIllustrationSymbol(
+    card: Card, image: Image.Image, dpi: int = C.DPI
+) -> Image.Image:
+
+    illustrationSymbolName = getIllustrationSymbolName(card=card)
+    if illustrationSymbolName is None:
         return image
+    elif card.isBasicLand():
+        position = C.getResolution(dpi).LAND_MANA_SYMBOL_POSITION.tuple()
+    else:
+        position = C.getResolution(dpi).EMBLEM_SYMBOL_POSITION.tuple()
 
-    illustrationSymbol = Image.open(
-        f"{C.BACK_CARD_SYMBOLS_LOC}/{illustrationSymbolName}.png"
-    )
+    illustrationSymbol = ASSETS.getSymbol(illustrationSymbolName, dpi=dpi)
     image.paste(
         illustrationSymbol,
         box=position,
@@ -461,43 +762,63 @@ def drawText(
     image: Image.Image,
     flavorNames: Flavor = {},
     useTextSymbols: bool = True,
-    fullArtLands: bool = False,
     hasSetIcon: bool = True,
     alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
 ) -> Image.Image:
+    """
+    Draws the text for all the card faces.
+    Faces with the same orientation are drawn together,
+    so the card is transposed only once for each group of faces.
+    Parts that are the same for every card with the same frame
+    (set icon, illustration symbol, credits) are in the frame template
+    """
 
-    if card.isTwoParts():
-        faces = card.card_faces
-    else:
-        faces = [card]
-
-    for face in faces:
-        if face.face_type == C.ADV and face.face_num == 1:
-            hasSetIcon = False
-        image = drawTitleLine(
-            card=face,
-            image=image,
-            flavorNames=flavorNames,
-            alternativeFrames=alternativeFrames,
-        )
-        if not fullArtLands:
-            image = drawIllustrationSymbol(card=card, image=image)
-        image = drawTypeLine(
-            card=face,
-            image=image,
-            hasSetIcon=hasSetIcon,
-            alternativeFrames=alternativeFrames,
-        )
-        image = drawTextBox(
-            card=face,
-            image=image,
-            useTextSymbols=useTextSymbols,
-            alternativeFrames=alternativeFrames,
-        )
-        image = drawPTL(card=face, image=image, alternativeFrames=alternativeFrames)
-        image = drawOther(card=face, image=image, alternativeFrames=alternativeFrames)
+    for ((rotate, flip), faces) in groupFacesByOrientation(
+        card=card, alternativeFrames=alternativeFrames
+    ):
+        image = orientCard(image=image, rotate=rotate, flip=flip)
+
+        for face in faces:
+            image = drawTitleLine(
+                card=face,
+                image=image,
+                flavorNames=flavorNames,
+                alternativeFrames=alternativeFrames,
+                dpi=dpi,
+                draft=draft,
+            )
+            image = drawTypeLine(
+                card=face,
+                image=image,
+                hasSetIcon=hasSetIcon
+                and not (face.face_type == C.ADV and face.face_num == 1),
+                alternativeFrames=alternativeFrames,
+                dpi=dpi,
+                draft=draft,
+            )
+            image = drawTextBox(
+                card=face,
+                image=image,
+                useTextSymbols=useTextSymbols,
+                alternativeFrames=alternativeFrames,
+                dpi=dpi,
+                draft=draft,
+            )
+            image = drawPTL(
+                card=face,
+                image=image,
+                alternativeFrames=alternativeFrames,
+                dpi=dpi,
+                draft=draft,
+            )
+
+        if rotate:
+            # Fuse text spans both (rotated) halves of the card
+            image = drawFuseText(card=card, image=image, dpi=dpi, draft=draft)
 
-    image = drawFuseText(card=card, image=image)
+        image = restoreCard(image=image, rotate=rotate, flip=flip)
 
     return image
 
@@ -507,33 +828,31 @@ def drawTitleLine(
     image: Image.Image,
     flavorNames: Flavor = {},
     alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
 ) -> Image.Image:
     """
     Draw mana cost. name and flavor name (if present) for a card
     """
-    (_, layoutInfo, rotate, flip) = getLayoutInfoAndRotation(
-        card, alternativeFrames=alternativeFrames
+    (_, layoutInfo, _, _) = getLayoutInfoAndRotation(
+        card, alternativeFrames=alternativeFrames, dpi=dpi
     )
+    R = C.getResolution(dpi)
 
-    manaCornerRight = layoutInfo.BORDER.RIGHT - C.BORDER
-    alignNameLeft = layoutInfo.BORDER.LEFT + C.BORDER
+    manaCornerRight = layoutInfo.BORDER.RIGHT - R.BORDER
+    alignNameLeft = layoutInfo.BORDER.LEFT + R.BORDER
     alignNameAnchor = "lt"
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_90)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
-    pen = ImageDraw.Draw(image)
+    pen = getPen(image)
 
     if card.isTokenOrEmblem():
         # Token and Emblems have no mana cost, and have a centered title
         alignNameLeft = layoutInfo.BORDER.LEFT + layoutInfo.SIZE.H // 2
         alignNameAnchor = "mt"
-        maxNameWidth = layoutInfo.SIZE.H - 2 * C.BORDER
+        maxNameWidth = layoutInfo.SIZE.H - 2 * R.BORDER
     else:
         manaCost = printSymbols(card.mana_cost)
-        maxManaWidth = max(layoutInfo.SIZE.H // 2, C.CARD_H // 16 * len(manaCost))
+        maxManaWidth = max(layoutInfo.SIZE.H // 2, R.CARD_H // 16 * len(manaCost))
 
         # This fitOneLine was born for Oakhame Ranger // Bring Back, which has
         # 4 hybrid mana symbols on the adventure part, making the title unreadable
@@ -548,10 +867,12 @@ def drawTitleLine(
             fontPath=C.SERIF_FONT,
             text=manaCost,
             maxWidth=maxManaWidth,
-            fontSize=C.TITLE_FONT_SIZE,
+            fontSize=R.TITLE_FONT_SIZE,
+            approximate=draft,
         )
         # Test for easier mana writing
-        pen.text(
+        drawSymbols(
+            pen,
             (
                 manaCornerRight,
                 calcTopValue(
@@ -574,16 +895,17 @@ def drawTitleLine(
         #         (xPos, manaCornerAscendant), text=c, font=manaFont, fill="black", anchor="ra"
         #     )
         #     xPos -= manaFont.getsize(c)[0]
-        maxNameWidth = xPos - alignNameLeft - C.BORDER
+        maxNameWidth = xPos - alignNameLeft - R.BORDER
 
     displayName = flavorNames[card.name] if card.name in flavorNames else card.name
 
     # Section for card indicator at left of the name (dfc and flip)
     # It is separated from title because we want it always at max size
     if card.face_type in C.DFC_LAYOUTS or card.face_type == C.FLIP:
-        faceSymbolFont = ImageFont.truetype(C.SERIF_FONT, size=C.TITLE_FONT_SIZE)
+        faceSymbolFont = getFont(C.SERIF_FONT, R.TITLE_FONT_SIZE)
         faceSymbol = f"{C.FONT_CODE_POINT[card.face_symbol]} "
-        pen.text(
+        drawSymbols(
+            pen,
             (
                 alignNameLeft,
                 calcTopValue(
@@ -606,7 +928,8 @@ def drawTitleLine(
         fontPath=C.SERIF_FONT,
         text=displayName,
         maxWidth=maxNameWidth,
-        fontSize=C.TITLE_FONT_SIZE,
+        fontSize=R.TITLE_FONT_SIZE,
+        approximate=draft,
     )
     pen.text(
         (
@@ -632,11 +955,11 @@ def drawTitleLine(
         C.AFTER,
         C.FLIP,
     ]:
-        trueNameFont = ImageFont.truetype(font=C.SERIF_FONT, size=C.TEXT_FONT_SIZE)
+        trueNameFont = ImageFont.truetype(font=C.SERIF_FONT, size=R.TEXT_FONT_SIZE)
         pen.text(
             (
                 (layoutInfo.BORDER.LEFT + layoutInfo.BORDER.RIGHT) // 2,
-                layoutInfo.BORDER.ILLUSTRATION + C.BORDER,
+                layoutInfo.BORDER.ILLUSTRATION + R.BORDER,
             ),
             card.name,
             font=trueNameFont,
@@ -644,11 +967,6 @@ def drawTitleLine(
             anchor="mt",
         )
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_270)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
     return image
 
 
@@ -657,31 +975,30 @@ def drawTypeLine(
     image: Image.Image,
     hasSetIcon: bool = True,
     alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
 ) -> Image.Image:
     """
     Draws the type line, leaving space for set icon (if present)
     """
 
-    (_, layoutInfo, rotate, flip) = getLayoutInfoAndRotation(
-        card, alternativeFrames=alternativeFrames
+    (_, layoutInfo, _, _) = getLayoutInfoAndRotation(
+        card, alternativeFrames=alternativeFrames, dpi=dpi
     )
+    R = C.getResolution(dpi)
 
-    alignTypeLeft = layoutInfo.BORDER.LEFT + C.BORDER
-    setIconMargin = (C.BORDER + C.SET_ICON_SIZE) if hasSetIcon else 0
-    maxWidth = layoutInfo.SIZE.H - 2 * C.BORDER - setIconMargin
+    alignTypeLeft = layoutInfo.BORDER.LEFT + R.BORDER
+    setIconMargin = (R.BORDER + R.SET_ICON_SIZE) if hasSetIcon else 0
+    maxWidth = layoutInfo.SIZE.H - 2 * R.BORDER - setIconMargin
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_90)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
-    pen = ImageDraw.Draw(image)
+    pen = getPen(image)
 
     typeFont = fitOneLine(
         fontPath=C.SERIF_FONT,
         text=card.type_line,
         maxWidth=maxWidth,
-        fontSize=C.TYPE_FONT_SIZE,
+        fontSize=R.TYPE_FONT_SIZE,
+        approximate=draft,
     )
     pen.text(
         (
@@ -699,11 +1016,6 @@ def drawTypeLine(
         anchor="lt",
     )
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_270)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
     return image
 
 
@@ -712,6 +1024,8 @@ def drawTextBox(
     image: Image.Image,
     useTextSymbols: bool = True,
     alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
 ) -> Image.Image:
     """
     Draw rules text box.
@@ -721,43 +1035,40 @@ def drawTextBox(
     if card.isBasicLand():
         return image
 
-    (_, layoutInfo, rotate, flip) = getLayoutInfoAndRotation(
-        card, alternativeFrames=alternativeFrames
+    (_, layoutInfo, _, _) = getLayoutInfoAndRotation(
+        card, alternativeFrames=alternativeFrames, dpi=dpi
     )
+    R = C.getResolution(dpi)
 
     cardText = f"{card.color_indicator_reminder_text}{card.oracle_text}".strip()
     if useTextSymbols:
         cardText = printSymbols(cardText)
 
-    alignRulesTextLeft = layoutInfo.BORDER.LEFT + C.BORDER
-    maxWidth = layoutInfo.SIZE.H - 2 * C.BORDER
+    alignRulesTextLeft = layoutInfo.BORDER.LEFT + R.BORDER
+    maxWidth = layoutInfo.SIZE.H - 2 * R.BORDER
 
     # Adventure main face only has half the space for rules text
     # I feel so dirty doing this here, but I see no choice
     if card.face_type == C.ADV and card.face_num == 0:
-        alignRulesTextLeft = layoutInfo.BORDER.LEFT + layoutInfo.SIZE.H // 2 + C.BORDER
-        maxWidth = layoutInfo.SIZE.H // 2 - 2 * C.BORDER
+        alignRulesTextLeft = layoutInfo.BORDER.LEFT + layoutInfo.SIZE.H // 2 + R.BORDER
+        maxWidth = layoutInfo.SIZE.H // 2 - 2 * R.BORDER
 
-    alignRulesTextAscendant = layoutInfo.BORDER.RULES_BOX + C.BORDER
+    alignRulesTextAscendant = layoutInfo.BORDER.RULES_BOX + R.BORDER
 
     if card.face_type == C.FUSE:
-        maxHeight = layoutInfo.SIZE.RULES_BOX_FUSE - 2 * C.BORDER
+        maxHeight = layoutInfo.SIZE.RULES_BOX_FUSE - 2 * R.BORDER
     else:
-        maxHeight = layoutInfo.SIZE.RULES_BOX - 2 * C.BORDER
+        maxHeight = layoutInfo.SIZE.RULES_BOX - 2 * R.BORDER
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_90)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
-    pen = ImageDraw.Draw(image)
+    pen = getPen(image)
 
     (fmtText, textFont) = fitMultiLine(
         fontPath=C.MONOSPACE_FONT,
         cardText=cardText,
         maxWidth=maxWidth,
         maxHeight=maxHeight,
-        fontSize=C.TEXT_FONT_SIZE,
+        fontSize=R.TEXT_FONT_SIZE,
+        approximate=draft,
     )
     pen.text(
         (alignRulesTextLeft, alignRulesTextAscendant),
@@ -767,36 +1078,39 @@ def drawTextBox(
         anchor="la",
     )
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_270)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
     return image
 
 
-def drawFuseText(card: Card, image: Image.Image) -> Image.Image:
+def drawFuseText(
+    card: Card, image: Image.Image, dpi: int = C.DPI, draft: bool = False
+) -> Image.Image:
+    """
+    Draws the fuse text along the bottom of both halves.
+    The image must already be rotated like the split faces (see orientCard)
+    """
     if not card.layout == C.FUSE:
         return image
 
-    image = image.transpose(Image.ROTATE_90)
-    pen = ImageDraw.Draw(image)
+    R = C.getResolution(dpi)
+
+    pen = getPen(image)
 
     fuseTextFont = fitOneLine(
         fontPath=C.MONOSPACE_FONT,
         text=card.fuse_text,
-        maxWidth=C.CARD_V - 2 * C.BORDER,
-        fontSize=C.TEXT_FONT_SIZE,
+        maxWidth=R.CARD_V - 2 * R.BORDER,
+        fontSize=R.TEXT_FONT_SIZE,
+        approximate=draft,
     )
     # Using SPLIT_LAYOUT_LEFT because it's indistinguishable from SPLIT_LAYOUT_RIGHT
     pen.text(
         (
-            C.BORDER,
+            R.BORDER,
             calcTopValue(
                 font=fuseTextFont,
                 text=card.fuse_text,
-                upperBorder=C.SPLIT_LAYOUT_LEFT.BORDER.FUSE,
-                spaceSize=C.SPLIT_LAYOUT_LEFT.SIZE.FUSE,
+                upperBorder=R.SPLIT_LAYOUT_LEFT.BORDER.FUSE,
+                spaceSize=R.SPLIT_LAYOUT_LEFT.SIZE.FUSE,
             ),
         ),
         text=card.fuse_text,
@@ -805,21 +1119,24 @@ def drawFuseText(card: Card, image: Image.Image) -> Image.Image:
         anchor="lt",
     )
 
-    image = image.transpose(Image.ROTATE_270)
-
     return image
 
 
 def drawPTL(
-    card: Card, image: Image.Image, alternativeFrames: bool = False
+    card: Card,
+    image: Image.Image,
+    alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
 ) -> Image.Image:
     """
     Draws Power / Toughness or Loyalty (if present) on the PTL box
     """
 
-    (_, layoutInfo, rotate, flip) = getLayoutInfoAndRotation(
-        card, alternativeFrames=alternativeFrames
+    (_, layoutInfo, _, _) = getLayoutInfoAndRotation(
+        card, alternativeFrames=alternativeFrames, dpi=dpi
     )
+    R = C.getResolution(dpi)
 
     if card.hasPT():
         ptl = f"{card.power}/{card.toughness}"
@@ -828,18 +1145,14 @@ def drawPTL(
     else:
         return image
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_90)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
-    pen = ImageDraw.Draw(image)
+    pen = getPen(image)
 
     ptlFont = fitOneLine(
         fontPath=C.MONOSPACE_FONT,
         text=ptl,
-        maxWidth=layoutInfo.SIZE.PTL_BOX_H - 2 * C.BORDER,
-        fontSize=C.TITLE_FONT_SIZE,
+        maxWidth=layoutInfo.SIZE.PTL_BOX_H - 2 * R.BORDER,
+        fontSize=R.TITLE_FONT_SIZE,
+        approximate=draft,
     )
 
     pen.text(
@@ -850,38 +1163,29 @@ def drawPTL(
         anchor="mm",
     )
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_270)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
     return image
 
 
 def drawOther(
-    card: Card, image: Image.Image, alternativeFrames: bool = False
+    card: Card, image: Image.Image, alternativeFrames: bool = False, dpi: int = C.DPI
 ) -> Image.Image:
     """
     Draws other information in the bottom section (site and version)
     """
 
-    (_, layoutInfo, rotate, flip) = getLayoutInfoAndRotation(
-        card, alternativeFrames=alternativeFrames
+    (_, layoutInfo, _, _) = getLayoutInfoAndRotation(
+        card, alternativeFrames=alternativeFrames, dpi=dpi
     )
+    R = C.getResolution(dpi)
 
-    alignOtherLeft = layoutInfo.BORDER.LEFT + C.BORDER
+    alignOtherLeft = layoutInfo.BORDER.LEFT + R.BORDER
 
     if card.face_type == C.ADV and card.face_num == 1:
         return image
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_90)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
-
-    pen = ImageDraw.Draw(image)
+    pen = getPen(image)
 
-    credFont = ImageFont.truetype(C.MONOSPACE_FONT, size=C.OTHER_FONT_SIZE)
+    credFont = ImageFont.truetype(C.MONOSPACE_FONT, size=R.OTHER_FONT_SIZE)
     pen.text(
         (
             alignOtherLeft,
@@ -899,7 +1203,7 @@ def drawOther(
     )
     credLength = pen.textlength(text=C.CREDITS + "   ", font=credFont)
 
-    proxyFont = ImageFont.truetype(C.SERIF_FONT, size=C.OTHER_FONT_SIZE * 4 // 3)
+    proxyFont = ImageFont.truetype(C.SERIF_FONT, size=R.OTHER_FONT_SIZE * 4 // 3)
     pen.text(
         (
             alignOtherLeft + credLength,
@@ -916,14 +1220,165 @@ def drawOther(
         anchor="lt",
     )
 
-    if rotate:
-        image = image.transpose(Image.ROTATE_270)
-    elif flip:
-        image = image.transpose(Image.ROTATE_180)
+    return image
+
+
+# Frame templates
+
+
+def getImageMode(isColored: bool = False) -> str:
+    """
+    Colored cards are drawn in RGB, black and white cards in grayscale
+    """
+    return C.COLOR_MODE if isColored else C.GRAYSCALE_MODE
+
+
+# Frames only depend on a few card properties, so each frame variant is drawn once
+# and then copied for every card. The set icon is part of the key by identity,
+# and the cached template keeps a reference to it, so its id cannot be reused.
+FRAME_TEMPLATE_CACHE_SIZE = 256
+frameTemplateCache: "OrderedDict[Tuple[Any, ...], Tuple[Canvas, Optional[Image.Image]]]" = OrderedDict()
+# Cards can be drawn by many threads at once (e.g. in the render service)
+frameTemplateLock = threading.Lock()
+
+
+def frameTemplateKey(
+    card: Card,
+    isColored: bool = False,
+    setIcon: Optional[Image.Image] = None,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    vector: bool = False,
+) -> Tuple[Any, ...]:
+    """
+    Returns the key identifying the frame template of a card:
+    two cards with the same key have exactly the same frame,
+    set icon, illustration symbol and credits
+    """
+    facesKey = []
+    for face in getFaces(card):
+        (layoutName, _, _, _) = getLayoutInfoAndRotation(
+            card=face, alternativeFrames=alternativeFrames, dpi=dpi
+        )
+        faceNum = face.face_num if layoutName in C.TWO_PARTS_LAYOUTS else 0
+        facesKey.append(
+            (
+                layoutName,
+                face.face_type,
+                faceNum,
+                face.hasPTL(),
+                face.isTokenOrEmblem(),
+            )
+        )
+
+    return (
+        tuple(facesKey),
+        coloredBlankKey(card=card) if isColored else None,
+        id(setIcon) if setIcon is not None else None,
+        None if fullArtLands else getIllustrationSymbolName(card=card),
+        alternativeFrames,
+        dpi,
+        vector,
+    )
+
+
+def makeFrameTemplate(
+    card: Card,
+    isColored: bool = False,
+    setIcon: Optional[Image.Image] = None,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    vector: bool = False,
+) -> Canvas:
+    """
+    Draws everything that does not depend on the card text:
+    border, frame (colored if needed), set icon, illustration symbol and credits
+    """
+    R = C.getResolution(dpi)
+    image = newCanvas(
+        getImageMode(isColored), size=R.CARD_SIZE, dpi=dpi, vector=vector
+    )
+    pen = getPen(image)
+    # Card border
+    pen.rectangle(((0, 0), R.CARD_SIZE), outline=DEF_BORDER_COLOR, width=R.LINE_WIDTH)
+
+    image = makeFrame(
+        card=card, image=image, alternativeFrames=alternativeFrames, dpi=dpi
+    )
+    if isColored:
+        image = colorBorders(card=card, image=image, dpi=dpi)
+    if not fullArtLands:
+        image = drawIllustrationSymbol(card=card, image=image, dpi=dpi)
+
+    for ((rotate, flip), faces) in groupFacesByOrientation(
+        card=card, alternativeFrames=alternativeFrames
+    ):
+        image = orientCard(image=image, rotate=rotate, flip=flip)
+        for face in faces:
+            if setIcon is not None:
+                image = pasteSetIcon(
+                    card=face,
+                    image=image,
+                    setIcon=setIcon,
+                    alternativeFrames=alternativeFrames,
+                    dpi=dpi,
+                )
+            image = drawOther(
+                card=face,
+                image=image,
+                alternativeFrames=alternativeFrames,
+                dpi=dpi,
+            )
+        image = restoreCard(image=image, rotate=rotate, flip=flip)
 
     return image
 
 
+def getFrameTemplate(
+    card: Card,
+    isColored: bool = False,
+    setIcon: Optional[Image.Image] = None,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    vector: bool = False,
+) -> Canvas:
+    """
+    Returns the (cached) frame template for the card.
+    The template is shared, so it must be copied before drawing on it
+    """
+    key = frameTemplateKey(
+        card=card,
+        isColored=isColored,
+        setIcon=setIcon,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=dpi,
+        vector=vector,
+    )
+    with frameTemplateLock:
+        if key in frameTemplateCache:
+            frameTemplateCache.move_to_end(key)
+            return frameTemplateCache[key][0]
+
+    template = makeFrameTemplate(
+        card=card,
+        isColored=isColored,
+        setIcon=setIcon,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=dpi,
+        vector=vector,
+    )
+    with frameTemplateLock:
+        frameTemplateCache[key] = (template, setIcon)
+        if len(frameTemplateCache) > FRAME_TEMPLATE_CACHE_SIZE:
+            frameTemplateCache.popitem(last=False)
+    return template
+
+
 # Draw card from beginning to end
 
 
@@ -935,29 +1390,45 @@ def drawCard(
     useTextSymbols: bool = True,
     fullArtLands: bool = False,
     alternativeFrames: bool = False,
-) -> Image.Image:
+    dpi: int = C.DPI,
+    draft: bool = False,
+    vector: bool = False,
+    pool: Optional[CanvasPool] = None,
+) -> Canvas:
     """
     Takes card info and external parameters, producing a complete image.
+    The image starts as a copy of the frame template for the card,
+    and only the card text is drawn for every card.
+    In draft mode the text is fitted approximately (see fitMultiLine).
+    If vector is True, the card is drawn as an SvgCanvas instead of an Image.
+    If a pool is given, the raster image is taken from it instead of allocated
+    (see savePages to give it back).
     """
 
-    image = Image.new("RGB", size=C.CARD_SIZE, color=C.WHITE)
-    pen = ImageDraw.Draw(image)
-    # Card border
-    pen.rectangle(((0, 0), C.CARD_SIZE), outline=DEF_BORDER_COLOR, width=5)
+    template = getFrameTemplate(
+        card=card,
+        isColored=isColored,
+        setIcon=setIcon,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=dpi,
+        vector=vector,
+    )
+    if pool is not None and not vector:
+        image = pool.acquire(template.mode, template.size)
+        image.paste(template)
+    else:
+        image = template.copy()
 
-    image = makeFrame(card=card, image=image, alternativeFrames=alternativeFrames)
-    if isColored:
-        image = colorBorders(card=card, image=image)
-    if setIcon is not None:
-        image = pasteSetIcon(card=card, image=image, setIcon=setIcon, alternativeFrames=alternativeFrames)
     image = drawText(
         card=card,
         image=image,
         flavorNames=flavorNames,
         useTextSymbols=useTextSymbols,
-        fullArtLands=fullArtLands,
         hasSetIcon=setIcon is not None,
         alternativeFrames=alternativeFrames,
+        dpi=dpi,
+        draft=draft,
     )
 
     return image
@@ -972,10 +1443,11 @@ def batchSpacing(
     pageSize: XY,
     cardSize: XY,
     noCardSpace: bool = False,
+    dpi: int = C.DPI,
 ):
     CARD_H = cardSize[0]
     CARD_V = cardSize[1]
-    CARD_DISTANCE = 1 if noCardSpace else C.CARD_DISTANCE
+    CARD_DISTANCE = 1 if noCardSpace else C.getResolution(dpi).CARD_DISTANCE
     maxH = pageSize[0] - (CARD_DISTANCE + (CARD_H + CARD_DISTANCE) * batchSize[0])
     maxV = pageSize[1] - (CARD_DISTANCE + (CARD_V + CARD_DISTANCE) * batchSize[1])
     return (
@@ -984,54 +1456,224 @@ def batchSpacing(
     )
 
 
-def savePages(
-    images: List[Image.Image],
-    deckName: str,
-    small: bool = False,
-    pageFormat: C.PageFormat = C.A4_FORMAT,
-    noCardSpace: bool = False,
-):
-    os.makedirs(os.path.dirname(f"pages/{deckName}/"), exist_ok=True)
-    pageHoriz = False
-    cardSize = C.CARD_SIZE
+def getCardDpi(dpi: int = C.DPI, small: bool = False) -> int:
+    """
+    Resolution at which cards should be drawn, so that they don't need
+    to be resized when paginated on pages at the given resolution
+    """
+    return C.smallCardDpi(dpi) if small else dpi
+
+
+def getBatchSize(small: bool = False) -> Tuple[int, int]:
+    """
+    Number of cards on every page, horizontally and vertically
+    """
     if not small:
-        batchSize = (3, 3)
-    else:
-        batchSize = (4, 4)
+        return (3, 3)
+    return (4, 4)
 
-    batchNum = batchSize[0] * batchSize[1]
 
+def getPageSize(pageFormat: C.PageFormat = C.A4_FORMAT, dpi: int = C.DPI) -> XY:
+    R = C.getResolution(dpi)
     if pageFormat == C.A4_FORMAT:
-        pageSize = C.A4_PAPER
+        return R.A4_PAPER
     elif pageFormat == C.LETTER_FORMAT:
-        pageSize = C.LETTER_PAPER
+        return R.LETTER_PAPER
     else:
         raise Exception(f"Unknown parameter: {pageFormat}")
 
-    if small:
-        cardSize = C.SMALL_CARD_SIZE
-        images = [image.resize(cardSize) for image in images]
+
+def paginate(
+    images: Iterable[Optional[Canvas]],
+    small: bool = False,
+    pageFormat: C.PageFormat = C.A4_FORMAT,
+    noCardSpace: bool = False,
+    dpi: int = C.DPI,
+    pool: Optional[CanvasPool] = None,
+) -> Iterator[Tuple[int, Canvas]]:
+    """
+    Paginates the cards on pages at the given resolution, returning
+    every page (with its index, from 0) as soon as its cards arrive.
+    Cards should be drawn at getCardDpi(dpi, small):
+    cards of any other size are resized to fit.
+    Vector cards are pasted on SVG pages.
+    Pages whose cards are all None are skipped.
+    Every page is only valid until the next one is requested:
+    the same page image is cleared and reused for every page.
+    If a pool is given, the cards are released to it once their page is used,
+    so they must not be used afterwards.
+    """
+    pageHoriz = False
+    cardSize = C.getResolution(getCardDpi(dpi=dpi, small=small)).CARD_SIZE
+    batchSize = getBatchSize(small)
+    batchNum = batchSize[0] * batchSize[1]
+    pageSize = getPageSize(pageFormat, dpi=dpi)
 
     if pageHoriz:
         pageSize = pageSize.transpose()
 
-    for i in tqdm(
-        range(0, len(images), batchNum),
-        desc="Pagination progress: ",
-        unit="page",
-    ):
-        batch = images[i : i + batchNum]
-        page = Image.new("RGB", size=pageSize, color="white")
+    pagePool = pool if pool is not None else CanvasPool()
+
+    def batches() -> Iterator[List[Optional[Canvas]]]:
+        batch: List[Optional[Canvas]] = []
+        for card in images:
+            batch.append(card)
+            if len(batch) == batchNum:
+                yield batch
+                batch = []
+        if len(batch) > 0:
+            yield batch
+
+    for i, batch in enumerate(batches()):
+        if all(card is None for card in batch):
+            continue
+        # Pages have the same mode as the cards (grayscale unless the cards are colored)
+        pageMode = batch[0].mode
+        vector = isinstance(batch[0], SvgCanvas)
+        if vector:
+            page = newCanvas(pageMode, size=pageSize, dpi=dpi, vector=True)
+        else:
+            page = pagePool.acquireBlank(pageMode, pageSize)
         for n in range(len(batch)):
+            card = batch[n]
+            if card.size != cardSize:
+                card = card.resize(cardSize)
             page.paste(
-                batch[n],
+                card,
                 batchSpacing(
                     n,
                     batchSize=batchSize,
                     pageSize=pageSize,
                     cardSize=cardSize,
                     noCardSpace=noCardSpace,
+                    dpi=dpi,
                 ),
             )
 
-        page.save(f"pages/{deckName}/{i // batchNum + 1:02}.png", "PNG")
+        yield (i, page)
+
+        if not vector:
+            pagePool.release(page)
+            if pool is not None:
+                for card in batch:
+                    pool.release(card)
+
+
+def encodeImage(image: Canvas, dpi: int = C.DPI) -> bytes:
+    """
+    Encodes a card or a page as it would be saved in a file:
+    SVG for vector images, PNG otherwise
+    """
+    if isinstance(image, SvgCanvas):
+        return image.toSvg().encode("utf-8")
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", dpi=(dpi, dpi))
+    return buffer.getvalue()
+
+
+def savePages(
+    images: Iterable[Optional[Canvas]],
+    deckName: str,
+    small: bool = False,
+    pageFormat: C.PageFormat = C.A4_FORMAT,
+    noCardSpace: bool = False,
+    dpi: int = C.DPI,
+    pool: Optional[CanvasPool] = None,
+    firstPage: int = 1,
+    pageSaved: Optional[Callable[[int, str], None]] = None,
+    pageCount: Optional[int] = None,
+) -> List[str]:
+    """
+    Paginates the cards (see paginate) and saves every page
+    in pages/<deckName>/ as soon as its cards arrive.
+    Cards can come from a stream (for example a pipeline).
+    If a pool is given, the cards are released to it once paginated,
+    so they must not be used after this call.
+    Pages are numbered from firstPage. Returns the paths of the saved pages.
+    Pages whose cards are all None are skipped, leaving the page file
+    of an earlier run untouched (see pageManifest).
+    pageSaved is called with the number and path of every page, once saved.
+    pageCount is the expected number of pages, shown by the progress bar
+    when images is a stream; it is corrected once the stream ends.
+    """
+    os.makedirs(os.path.dirname(f"pages/{deckName}/"), exist_ok=True)
+
+    pagePaths: List[str] = []
+    (batchH, batchV) = getBatchSize(small)
+    if isinstance(images, Sized):
+        pageCount = (len(images) + batchH * batchV - 1) // (batchH * batchV)
+    cardCount = 0
+
+    def countCards() -> Iterator[Optional[Canvas]]:
+        nonlocal cardCount
+        for image in images:
+            cardCount += 1
+            yield image
+
+    with tqdm(total=pageCount, desc="Pagination progress: ", unit="page") as progressBar:
+        pages = paginate(
+            countCards(),
+            small=small,
+            pageFormat=pageFormat,
+            noCardSpace=noCardSpace,
+            dpi=dpi,
+            pool=pool,
+        )
+        for (i, page) in pages:
+            # Skipped pages count as done too
+            progressBar.update(i + 1 - progressBar.n)
+            pageName = f"pages/{deckName}/{i + firstPage:02}"
+            if isinstance(page, SvgCanvas):
+                pagePaths.append(f"{pageName}.svg")
+                page.save(pagePaths[-1])
+            else:
+                pagePaths.append(f"{pageName}.png")
+                page.save(pagePaths[-1], "PNG", dpi=(dpi, dpi))
+            if pageSaved is not None:
+                pageSaved(i + firstPage, pagePaths[-1])
+        # Pages skipped at the end of the deck were never returned
+        pageCount = (cardCount + batchH * batchV - 1) // (batchH * batchV)
+        progressBar.total = pageCount
+        progressBar.update(pageCount - progressBar.n)
+
+    return pagePaths
+
+
+def saveContactSheet(
+    images: List[Image.Image],
+    deckName: str,
+    columns: int = C.CONTACT_SHEET_COLUMNS,
+) -> str:
+    """
+    Saves all the cards on a single uncompressed image, for quick previews.
+    Returns the path of the saved image
+    """
+    os.makedirs(os.path.dirname(f"pages/{deckName}/"), exist_ok=True)
+    sheetPath = f"pages/{deckName}/{C.CONTACT_SHEET_NAME}.png"
+    sheetMode = images[0].mode if len(images) > 0 else C.GRAYSCALE_MODE
+    cardSize = images[0].size if len(images) > 0 else (0, 0)
+    columns = max(1, min(columns, len(images)))
+    rows = (len(images) + columns - 1) // columns
+    sheet = Image.new(
+        sheetMode,
+        size=(
+            C.CONTACT_SHEET_SPACE + (cardSize[0] + C.CONTACT_SHEET_SPACE) * columns,
+            C.CONTACT_SHEET_SPACE + (cardSize[1] + C.CONTACT_SHEET_SPACE) * rows,
+        ),
+        color=C.WHITE,
+    )
+    for n, card in enumerate(images):
+        if card.size != cardSize:
+            card = card.resize(cardSize)
+        sheet.paste(
+            card,
+            (
+                C.CONTACT_SHEET_SPACE
+                + (cardSize[0] + C.CONTACT_SHEET_SPACE) * (n % columns),
+                C.CONTACT_SHEET_SPACE
+                + (cardSize[1] + C.CONTACT_SHEET_SPACE) * (n // columns),
+            ),
+        )
+    # Compression takes most of the time for a preview, and the file is temporary
+    sheet.save(sheetPath, "PNG", compress_level=0)
+    return sheetPath
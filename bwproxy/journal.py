@@ -0,0 +1,69 @@
+from typing import Any, Dict, List
+import json
+import os
+import threading
+
+from . import projectConstants as C
+from .projectTypes import Card
+
+
+class Journal:
+    """
+    Records the progress of a run in pages/<deckName>/, as it happens:
+    the cards found online and the saved pages. Drawn cards are already saved
+    as they are drawn, by the render cache.
+    A resumed run starts from what the journal recorded,
+    so that a stopped run can continue without doing anything twice.
+    The journal is deleted when the run finishes.
+    """
+
+    def __init__(self, deckName: str, resume: bool = False):
+        self.journalPath = f"pages/{deckName}/{C.JOURNAL_NAME}"
+        self.entries: List[Dict[str, Any]] = []
+        if resume and os.path.exists(self.journalPath):
+            with open(self.journalPath) as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                    except ValueError:
+                        # The last line may be incomplete, if the run was killed while writing it
+                        break
+        os.makedirs(os.path.dirname(self.journalPath), exist_ok=True)
+        self._file = open(self.journalPath, "a" if resume else "w")
+        self._lock = threading.Lock()
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def recordCard(self, cardName: str, card: Card, isToken: bool = False) -> None:
+        self.record({"token" if isToken else "card": cardName, "data": card.data})
+
+    def recordPage(self, page: Dict[str, Any]) -> None:
+        self.record({"page": page})
+
+    def cards(self, isToken: bool = False) -> Dict[str, Card]:
+        """
+        Cards (or tokens) found online by the recorded runs, by searched name
+        """
+        key = "token" if isToken else "card"
+        return {
+            entry[key]: Card(entry["data"]) for entry in self.entries if key in entry
+        }
+
+    def pages(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Pages saved by the recorded runs, as manifest entries, by page number
+        """
+        return {
+            entry["page"]["page"]: entry["page"]
+            for entry in self.entries
+            if "page" in entry
+        }
+
+    def close(self, finished: bool = False) -> None:
+        with self._lock:
+            self._file.close()
+        if finished:
+            os.remove(self.journalPath)
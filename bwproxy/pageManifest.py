@@ -0,0 +1,157 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from hashlib import sha256
+import json
+import os
+
+from . import projectConstants as C
+from .drawUtil import getBatchSize
+from .journal import Journal
+from .projectTypes import Card, Flavor
+from .renderCache import RENDERER_VERSION, fileHash
+from .renderPool import cardIdentity
+
+
+def loadManifest(deckName: str) -> Optional[Dict[str, Any]]:
+    manifestPath = f"pages/{deckName}/{C.DECK_MANIFEST_NAME}"
+    if not os.path.exists(manifestPath):
+        return None
+    try:
+        with open(manifestPath) as f:
+            return json.load(f)
+    except ValueError:
+        # A damaged manifest only means that every page is saved again
+        return None
+
+
+class PagePlanner:
+    """
+    Finds the pages of a deck that need to be saved again, by comparing
+    the cards on every page with the ones in the manifest of the last run.
+    Cards on unchanged pages are replaced by None, so they are neither drawn
+    nor paginated, and their page files are left untouched.
+    options should contain everything, apart from the cards,
+    that changes the content of the pages.
+    With a journal, the pages saved by a stopped run are also reused,
+    and every page is recorded as soon as it is saved.
+    """
+
+    def __init__(
+        self,
+        deckName: str,
+        options: Dict[str, Any],
+        small: bool = False,
+        vector: bool = False,
+        journal: Optional[Journal] = None,
+    ):
+        self.deckName = deckName
+        self.options = dict(options, version=RENDERER_VERSION)
+        (batchH, batchV) = getBatchSize(small)
+        self.batchNum = batchH * batchV
+        self.extension = "svg" if vector else "png"
+        oldManifest = loadManifest(deckName)
+        self.oldPages: Dict[int, Dict[str, Any]] = {}
+        if oldManifest is not None:
+            self.oldPages = {page["page"]: page for page in oldManifest["pages"]}
+        self.journal = journal
+        if journal is not None:
+            self.oldPages.update(journal.pages())
+        self.pages: List[Dict[str, Any]] = []
+        self.kept = 0
+
+    def pagePath(self, page: Dict[str, Any]) -> str:
+        return f"pages/{self.deckName}/{page['file']}"
+
+    def plan(
+        self, cards: Iterable[Tuple[Card, Flavor]]
+    ) -> Iterator[Optional[Tuple[Card, Flavor]]]:
+        batch: List[Tuple[Card, Flavor]] = []
+        for card in cards:
+            batch.append(card)
+            if len(batch) == self.batchNum:
+                yield from self.planPage(batch)
+                batch = []
+        if len(batch) > 0:
+            yield from self.planPage(batch)
+
+    def describePage(
+        self, batch: List[Tuple[Card, Flavor]], pageNumber: int
+    ) -> Dict[str, Any]:
+        """
+        Returns the manifest entry of a page (without the hash of its file).
+        Shards describe their pages the same way, so that merged shards
+        can be rebuilt incrementally
+        """
+        cardHashes = [
+            sha256(cardIdentity(card, flavorNames).encode("utf-8")).hexdigest()
+            for (card, flavorNames) in batch
+        ]
+        return {
+            "page": pageNumber,
+            "file": f"{pageNumber:02}.{self.extension}",
+            "pageHash": sha256(
+                json.dumps(
+                    [self.options, cardHashes], sort_keys=True, default=str
+                ).encode("utf-8")
+            ).hexdigest(),
+            "cards": [card.name for (card, _) in batch],
+            "cardHashes": cardHashes,
+        }
+
+    def planPage(
+        self, batch: List[Tuple[Card, Flavor]]
+    ) -> List[Optional[Tuple[Card, Flavor]]]:
+        pageNumber = len(self.pages) + 1
+        page = self.describePage(batch, pageNumber)
+        self.pages.append(page)
+
+        oldPage = self.oldPages.get(pageNumber)
+        if (
+            oldPage is not None
+            and oldPage.get("pageHash") == page["pageHash"]
+            and oldPage["file"] == page["file"]
+            and os.path.exists(self.pagePath(oldPage))
+            and fileHash(self.pagePath(oldPage)) == oldPage["sha256"]
+        ):
+            page["sha256"] = oldPage["sha256"]
+            self.kept += 1
+            return [None] * len(batch)
+        return list(batch)
+
+    def pageSaved(self, pageNumber: int, pagePath: str) -> None:
+        page = self.pages[pageNumber - 1]
+        page["sha256"] = fileHash(pagePath)
+        if self.journal is not None:
+            self.journal.recordPage(page)
+
+    def save(self) -> str:
+        """
+        Saves the manifest of the new pages, once they are all saved,
+        and deletes the pages of the last run that are no longer in the deck.
+        Returns the path of the manifest
+        """
+        for page in self.pages:
+            if "sha256" not in page:
+                page["sha256"] = fileHash(self.pagePath(page))
+
+        files = {page["file"] for page in self.pages}
+        for oldPage in self.oldPages.values():
+            oldPath = self.pagePath(oldPage)
+            if oldPage["file"] not in files and os.path.exists(oldPath):
+                os.remove(oldPath)
+
+        manifest = {
+            "version": C.VERSION,
+            "deck": self.deckName,
+            "pageCount": len(self.pages),
+            "pages": self.pages,
+        }
+        manifestPath = f"pages/{self.deckName}/{C.DECK_MANIFEST_NAME}"
+        manifestText = json.dumps(manifest, indent=2)
+        # An unchanged manifest is not written again, like unchanged pages
+        if os.path.exists(manifestPath):
+            with open(manifestPath) as f:
+                if f.read() == manifestText:
+                    return manifestPath
+        with open(manifestPath, "w") as f:
+            f.write(manifestText)
+        return manifestPath
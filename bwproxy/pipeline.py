@@ -0,0 +1,87 @@
+from typing import Any, Callable, Iterable, Iterator, Optional
+import queue
+import threading
+
+# Maximum number of items waiting between two stages:
+# a fast stage can only get this far ahead of a slow one
+PIPELINE_QUEUE_SIZE = 16
+# How often a blocked stage checks whether the pipeline was stopped, in seconds
+PIPELINE_POLL_TIME = 0.1
+
+Stage = Callable[[Iterator[Any]], Iterator[Any]]
+
+
+class StageEnd:
+    """
+    Sent by a stage after its last item, with the error that stopped it (if any)
+    """
+
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+def putItem(output: "queue.Queue[Any]", item: Any, stopped: threading.Event) -> bool:
+    while not stopped.is_set():
+        try:
+            output.put(item, timeout=PIPELINE_POLL_TIME)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def queueItems(source: "queue.Queue[Any]", stopped: threading.Event) -> Iterator[Any]:
+    while not stopped.is_set():
+        try:
+            item = source.get(timeout=PIPELINE_POLL_TIME)
+        except queue.Empty:
+            continue
+        if isinstance(item, StageEnd):
+            if item.error is not None:
+                raise item.error
+            return
+        yield item
+
+
+def runStage(
+    items: Iterator[Any], output: "queue.Queue[Any]", stopped: threading.Event
+) -> None:
+    try:
+        for item in items:
+            if not putItem(output, item, stopped):
+                break
+    except BaseException as error:
+        putItem(output, StageEnd(error), stopped)
+    else:
+        putItem(output, StageEnd(), stopped)
+    finally:
+        # Lets generators run their cleanup (e.g. saving caches) when stopped early
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
+
+
+def runPipeline(
+    source: Iterable[Any], *stages: Stage, queueSize: int = PIPELINE_QUEUE_SIZE
+) -> Iterator[Any]:
+    """
+    Runs the source and every stage in its own thread, connected by bounded queues,
+    so that a stage works on an item while the previous one prepares the next.
+    Returns the output of the last stage, in order.
+    Errors are raised by the returned iterator; if it is not consumed
+    completely, all the stages are stopped when it is closed.
+    """
+    stopped = threading.Event()
+    items: Iterator[Any] = iter(source)
+    for stage in (lambda items: items, *stages):
+        output: "queue.Queue[Any]" = queue.Queue(maxsize=queueSize)
+        threading.Thread(
+            target=runStage,
+            args=(stage(items), output, stopped),
+            daemon=True,
+        ).start()
+        items = queueItems(output, stopped)
+    try:
+        yield from items
+    finally:
+        stopped.set()
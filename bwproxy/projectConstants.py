@@ -100,6 +100,9 @@ Layout = Map[Map[int]]
 # Notable example: Blood token and Flesh // Blood
 CACHE_LOC = "cardcache/cardcache.p"
 TOKEN_CACHE_LOC = "cardcache/tokencache.p"
+RENDER_CACHE_LOC = "cardcache/renders"
+# About 4000 black and white cards at 300 dpi
+RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
 BACK_CARD_SYMBOLS_LOC = "symbols"
 
 SERIF_FONT = "fonts/matrixb.ttf"
@@ -214,20 +217,51 @@ A4_FORMAT: PageFormat = "a4paper"
 LETTER_FORMAT: PageFormat = "letter"
 PAGE_FORMAT: List[PageFormat] = ["a4paper", "letter"]
 
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
+# Named colors, so that they work for every image mode
+WHITE = "white"
+BLACK = "black"
+# Black and white cards are drawn in grayscale, which uses a third of the memory
+# (and of the time needed to paste and encode them) compared to RGB
+GRAYSCALE_MODE = "L"
+COLOR_MODE = "RGB"
+# All the sizes below are in pixels at the standard resolution (DPI).
+# Cards can be drawn at any resolution: see getResolution,
+# which scales every size and layout to a given dpi.
 DPI = 300
-A4_PAPER = XY(int(8.25 * DPI), int(11.75 * DPI))
-LETTER_PAPER = XY(int(8.5 * DPI), int(11 * DPI))
-CARD_H = int(2.5 * DPI)
-CARD_V = int(3.5 * DPI)
+# Resolutions accepted for the pages: lower ones are unreadable,
+# higher ones take too long and too much memory to draw
+MIN_DPI = 50
+MAX_DPI = 600
+A4_PAPER_INCHES = (8.25, 11.75)
+LETTER_PAPER_INCHES = (8.5, 11)
+CARD_INCHES = (2.5, 3.5)
+A4_PAPER = XY(int(A4_PAPER_INCHES[0] * DPI), int(A4_PAPER_INCHES[1] * DPI))
+LETTER_PAPER = XY(int(LETTER_PAPER_INCHES[0] * DPI), int(LETTER_PAPER_INCHES[1] * DPI))
+CARD_H = int(CARD_INCHES[0] * DPI)
+CARD_V = int(CARD_INCHES[1] * DPI)
 CARD_SIZE = XY(CARD_H, CARD_V)
 CARD_BOX: Box = (XY(0, 0), CARD_SIZE)
-SMALL_CARD_SIZE = CARD_SIZE.scale(factor=0.75)
+SMALL_CARD_SCALE = 0.75
+SMALL_CARD_SIZE = CARD_SIZE.scale(factor=SMALL_CARD_SCALE)
+# Draft previews: low resolution cards, all on a single contact sheet
+DRAFT_DPI = 75
+CONTACT_SHEET_NAME = "draft"
+CONTACT_SHEET_COLUMNS = 10
+CONTACT_SHEET_SPACE = 4
+# Manifests saved with the pages: one for the whole deck,
+# or one for every shard when a deck is split in shards
+SHARD_MANIFEST_NAME = "shard-{shard}-of-{shards}.json"
+DECK_MANIFEST_NAME = "manifest.json"
+# Progress of an unfinished run, to resume it
+JOURNAL_NAME = "journal.jsonl"
+# How often watched decklists and set icons are checked for changes, in seconds
+WATCH_POLL_TIME = 0.25
 # Distance between cards when paginated, in pixels
 CARD_DISTANCE = 20
 # Desired distance in pixels between elements inside the card, e.g. between card border and title
 BORDER = 15
+# Width of the frame lines
+LINE_WIDTH = 5
 
 TITLE_FONT_SIZE = 70
 TYPE_FONT_SIZE = 50
@@ -241,6 +275,36 @@ ILLUSTRATION_SIZE = 600
 PTL_BOX_DIM = XY(175, 70)
 PTL_BOX_MARGIN = XY(25, 5)
 
+# Rules box size for the different layouts
+STD_RULES_BOX_SIZE = 500
+SPLIT_RULES_BOX_SIZE = 360
+AFTERMATH_RULES_BOX_SIZE = 175
+FLIP_RULES_BOX_SIZE = 200
+TOKEN_RULES_BOX_SIZE = 100
+EMBLEM_RULES_BOX_SIZE = 250
+TOKEN_ARC_WIDTH = 600
+
+
+def scaleToDpi(value: int, dpi: int = DPI) -> int:
+    """
+    Converts a size in pixels at the standard resolution to the given resolution
+    """
+    if dpi == DPI:
+        return value
+    return round(value * dpi / DPI)
+
+
+def scaleXYToDpi(value: XY, dpi: int = DPI) -> XY:
+    return XY(scaleToDpi(value[0], dpi), scaleToDpi(value[1], dpi))
+
+
+def smallCardDpi(dpi: int = DPI) -> int:
+    """
+    Resolution at which small (75%) cards are drawn, for pages at the given resolution
+    """
+    return round(dpi * SMALL_CARD_SCALE)
+
+
 # Info about the card layout (how the lines are positioned to make the frame and various card sections)
 # Every layout has a NAME_LAYOUT Map[Map[int]] with info about
 # - the upper borders (BORDER) for different card sections (title, illustration, type line, rules box, other)
@@ -257,6 +321,8 @@ def calcLayoutData(
     left: int = 0,
     right: int = CARD_H,
     rulesBoxSize: int = 0,
+    dpi: int = DPI,
+    stdLayout: Optional[Layout] = None,
 ):
     """
     Defines the layouts for all card types.
@@ -274,24 +340,32 @@ def calcLayoutData(
     between the two halves of the card
     - Fuse cards have another section (the fuse box),
     which is specified at the end.
+    bottom, left, right and rulesBoxSize are in pixels at the given resolution,
+    while the fixed section sizes are scaled from the standard resolution.
+    Adventure frames need the standard layout at the same resolution (stdLayout)
     """
+    ptlBoxDim = scaleXYToDpi(PTL_BOX_DIM, dpi)
+    ptlBoxMargin = scaleXYToDpi(PTL_BOX_MARGIN, dpi)
+
     layout = Map[Map[int]](
         BORDER=Map[int](TITLE=0, BOTTOM=bottom, LEFT=left, RIGHT=right),
         SIZE=Map[int](
-            TITLE=90,
-            TYPE_LINE=50,
+            TITLE=scaleToDpi(90, dpi),
+            TYPE_LINE=scaleToDpi(50, dpi),
             RULES_BOX=rulesBoxSize,
-            OTHER=40,
-            PTL_BOX_H=PTL_BOX_DIM[0],
-            PTL_BOX_V=PTL_BOX_DIM[1],
+            OTHER=scaleToDpi(40, dpi),
+            PTL_BOX_H=ptlBoxDim[0],
+            PTL_BOX_V=ptlBoxDim[1],
         ),
         FONT_MIDDLE=Map[int](),
     )
 
     if layoutType == ADV:
-        layout.BORDER.TITLE = STD_LAYOUT.BORDER.RULES_BOX
+        if stdLayout is None:
+            stdLayout = STD_LAYOUT
+        layout.BORDER.TITLE = stdLayout.BORDER.RULES_BOX
         layout.SIZE.RULES_BOX = (
-            STD_LAYOUT.SIZE.RULES_BOX - layout.SIZE.TITLE - layout.SIZE.TYPE_LINE
+            stdLayout.SIZE.RULES_BOX - layout.SIZE.TITLE - layout.SIZE.TYPE_LINE
         )
         layout.BORDER.BOTTOM = layout.BORDER.BOTTOM - layout.SIZE.OTHER
         layout.SIZE.OTHER = 0
@@ -304,7 +378,7 @@ def calcLayoutData(
 
         layout.SIZE.ILLUSTRATION = layout.BORDER.BOTTOM - 2 * layout.BORDER.ILLUSTRATION
 
-        layout.BORDER.PTL_BOX_BOTTOM = layout.BORDER.ILLUSTRATION - PTL_BOX_MARGIN[1]
+        layout.BORDER.PTL_BOX_BOTTOM = layout.BORDER.ILLUSTRATION - ptlBoxMargin[1]
 
     else:
         layout.BORDER.ILLUSTRATION = layout.BORDER.TITLE + layout.SIZE.TITLE
@@ -314,9 +388,9 @@ def calcLayoutData(
 
         layout.SIZE.ILLUSTRATION = layout.BORDER.TYPE_LINE - layout.BORDER.ILLUSTRATION
 
-        layout.BORDER.PTL_BOX_BOTTOM = layout.BORDER.BOTTOM - PTL_BOX_MARGIN[1]
+        layout.BORDER.PTL_BOX_BOTTOM = layout.BORDER.BOTTOM - ptlBoxMargin[1]
 
-    layout.BORDER.PTL_BOX_RIGHT = layout.BORDER.RIGHT - PTL_BOX_MARGIN[0]
+    layout.BORDER.PTL_BOX_RIGHT = layout.BORDER.RIGHT - ptlBoxMargin[0]
     layout.BORDER.PTL_BOX_LEFT = layout.BORDER.PTL_BOX_RIGHT - layout.SIZE.PTL_BOX_H
     layout.BORDER.PTL_BOX_TOP = layout.BORDER.PTL_BOX_BOTTOM - layout.SIZE.PTL_BOX_V
 
@@ -327,7 +401,7 @@ def calcLayoutData(
     layout.FONT_MIDDLE.PTL_V = layout.BORDER.PTL_BOX_TOP + layout.SIZE.PTL_BOX_V // 2
 
     if layoutType == SPLIT:
-        layout.SIZE.FUSE = 50
+        layout.SIZE.FUSE = scaleToDpi(50, dpi)
         layout.BORDER.FUSE = layout.BORDER.OTHER - layout.SIZE.FUSE
         layout.SIZE.RULES_BOX_FUSE = layout.SIZE.RULES_BOX - layout.SIZE.FUSE
         layout.FONT_MIDDLE.FUSE = layout.BORDER.FUSE + layout.SIZE.FUSE // 2
@@ -335,24 +409,26 @@ def calcLayoutData(
     return layout
 
 
-def calcIconPosition(layout: Layout) -> XY:
+def calcIconPosition(layout: Layout, dpi: int = DPI) -> XY:
     """
     Returns the set icon position, given the layout and the right border of the card
     """
+    setIconSize = scaleToDpi(SET_ICON_SIZE, dpi)
     return XY(
-        layout.BORDER.RIGHT - BORDER - SET_ICON_SIZE,
-        layout.BORDER.TYPE_LINE + (layout.SIZE.TYPE_LINE - SET_ICON_SIZE) // 2,
+        layout.BORDER.RIGHT - scaleToDpi(BORDER, dpi) - setIconSize,
+        layout.BORDER.TYPE_LINE + (layout.SIZE.TYPE_LINE - setIconSize) // 2,
     )
 
 
-def calcIllustrationPosition(layout: Layout) -> XY:
+def calcIllustrationPosition(layout: Layout, dpi: int = DPI) -> XY:
     """
     Returns the illustration position for basic lands and emblems
     """
+    illustrationSize = scaleToDpi(ILLUSTRATION_SIZE, dpi)
     return XY(
-        (layout.BORDER.RIGHT - ILLUSTRATION_SIZE) // 2,
+        (layout.BORDER.RIGHT - illustrationSize) // 2,
         layout.BORDER.ILLUSTRATION
-        + (layout.SIZE.ILLUSTRATION - ILLUSTRATION_SIZE) // 2,
+        + (layout.SIZE.ILLUSTRATION - illustrationSize) // 2,
     )
 
 
@@ -360,91 +436,208 @@ def ptlTextPosition(box: Box) -> XY:
     return (box[0] + box[1]).scale(0.5)
 
 
-# Standard layout (normal cards)
-STD_LAYOUT = calcLayoutData(layoutType=STD, rulesBoxSize=500)
-STD_SET_ICON_POSITION = calcIconPosition(layout=STD_LAYOUT)
+Resolution = Map[Any]
 
 
-# Split layout (for split, fuse, and right half of aftermath)
-SPLIT_LAYOUT_LEFT = calcLayoutData(
-    layoutType=SPLIT, bottom=CARD_H, left=0, right=CARD_V // 2, rulesBoxSize=360
-)
-SPLIT_LAYOUT_RIGHT = calcLayoutData(
-    layoutType=SPLIT, bottom=CARD_H, left=CARD_V // 2, right=CARD_V, rulesBoxSize=360
-)
-SPLIT_SET_ICON_POSITION: List[XY] = [
-    calcIconPosition(layout=SPLIT_LAYOUT_LEFT),
-    calcIconPosition(layout=SPLIT_LAYOUT_RIGHT),
-]
+def calcResolution(dpi: int = DPI) -> Resolution:
+    """
+    Computes all the card sizes, font sizes and layouts for the given resolution.
+    Names are the same as the module constants, which are the values at DPI.
+    """
+    res = Resolution(DPI=dpi)
+    res.CARD_H = int(CARD_INCHES[0] * dpi)
+    res.CARD_V = int(CARD_INCHES[1] * dpi)
+    res.CARD_SIZE = XY(res.CARD_H, res.CARD_V)
+    res.CARD_BOX = (XY(0, 0), res.CARD_SIZE)
+    res.A4_PAPER = XY(int(A4_PAPER_INCHES[0] * dpi), int(A4_PAPER_INCHES[1] * dpi))
+    res.LETTER_PAPER = XY(
+        int(LETTER_PAPER_INCHES[0] * dpi), int(LETTER_PAPER_INCHES[1] * dpi)
+    )
+    res.CARD_DISTANCE = scaleToDpi(CARD_DISTANCE, dpi)
+    res.BORDER = scaleToDpi(BORDER, dpi)
+    res.LINE_WIDTH = max(1, scaleToDpi(LINE_WIDTH, dpi))
+
+    res.TITLE_FONT_SIZE = scaleToDpi(TITLE_FONT_SIZE, dpi)
+    res.TYPE_FONT_SIZE = scaleToDpi(TYPE_FONT_SIZE, dpi)
+    res.TEXT_FONT_SIZE = scaleToDpi(TEXT_FONT_SIZE, dpi)
+    res.OTHER_FONT_SIZE = scaleToDpi(OTHER_FONT_SIZE, dpi)
+    res.SET_ICON_SIZE = scaleToDpi(SET_ICON_SIZE, dpi)
+    res.ILLUSTRATION_SIZE = scaleToDpi(ILLUSTRATION_SIZE, dpi)
+    res.PTL_BOX_DIM = scaleXYToDpi(PTL_BOX_DIM, dpi)
+    res.PTL_BOX_MARGIN = scaleXYToDpi(PTL_BOX_MARGIN, dpi)
+    res.TOKEN_ARC_WIDTH = scaleToDpi(TOKEN_ARC_WIDTH, dpi)
+    # Token arcs start slightly over the illustration border
+    res.TOKEN_ARC_OFFSET = scaleToDpi(4, dpi)
+
+    # Standard layout (normal cards)
+    res.STD_LAYOUT = calcLayoutData(
+        layoutType=STD,
+        bottom=res.CARD_V,
+        right=res.CARD_H,
+        rulesBoxSize=scaleToDpi(STD_RULES_BOX_SIZE, dpi),
+        dpi=dpi,
+    )
+    res.STD_SET_ICON_POSITION = calcIconPosition(layout=res.STD_LAYOUT, dpi=dpi)
+
+    # Split layout (for split, fuse, and right half of aftermath)
+    splitRulesBoxSize = scaleToDpi(SPLIT_RULES_BOX_SIZE, dpi)
+    res.SPLIT_LAYOUT_LEFT = calcLayoutData(
+        layoutType=SPLIT,
+        bottom=res.CARD_H,
+        left=0,
+        right=res.CARD_V // 2,
+        rulesBoxSize=splitRulesBoxSize,
+        dpi=dpi,
+    )
+    res.SPLIT_LAYOUT_RIGHT = calcLayoutData(
+        layoutType=SPLIT,
+        bottom=res.CARD_H,
+        left=res.CARD_V // 2,
+        right=res.CARD_V,
+        rulesBoxSize=splitRulesBoxSize,
+        dpi=dpi,
+    )
+    res.SPLIT_SET_ICON_POSITION = [
+        calcIconPosition(layout=res.SPLIT_LAYOUT_LEFT, dpi=dpi),
+        calcIconPosition(layout=res.SPLIT_LAYOUT_RIGHT, dpi=dpi),
+    ]
+
+    # Adventure layout (for the Adventure part of the card, the other one uses the standard layout)
+    res.ADVENTURE_LAYOUT = calcLayoutData(
+        layoutType=ADV,
+        bottom=res.CARD_V,
+        left=0,
+        right=res.CARD_H // 2,
+        dpi=dpi,
+        stdLayout=res.STD_LAYOUT,
+    )
 
+    # Aftermath layout (for the upper half of aftermath)
+    res.AFTERMATH_LAYOUT = calcLayoutData(
+        layoutType=AFTER,
+        bottom=res.CARD_V // 2,
+        right=res.CARD_H,
+        rulesBoxSize=scaleToDpi(AFTERMATH_RULES_BOX_SIZE, dpi),
+        dpi=dpi,
+    )
+    res.AFTERMATH_SET_ICON_POSITION = calcIconPosition(
+        layout=res.AFTERMATH_LAYOUT, dpi=dpi
+    )
 
-# Adventure layout (for the Adventure part of the card, the other one uses the standard layout)
-ADVENTURE_LAYOUT = calcLayoutData(
-    layoutType=ADV,
-    bottom=CARD_V,
-    left=0,
-    right=CARD_H // 2,
-)
+    # Flip layout (Only one half is specified here, for the other just flip the card and redraw)
+    res.FLIP_LAYOUT = calcLayoutData(
+        layoutType=FLIP,
+        bottom=res.CARD_V,
+        right=res.CARD_H,
+        rulesBoxSize=scaleToDpi(FLIP_RULES_BOX_SIZE, dpi),
+        dpi=dpi,
+    )
+    res.FLIP_SET_ICON_POSITION = calcIconPosition(layout=res.FLIP_LAYOUT, dpi=dpi)
 
+    # Textless land layout
+    res.LAND_LAYOUT = calcLayoutData(
+        layoutType=LAND, bottom=res.CARD_V, right=res.CARD_H, rulesBoxSize=0, dpi=dpi
+    )
+    res.LAND_SET_ICON_POSITION = calcIconPosition(layout=res.LAND_LAYOUT, dpi=dpi)
+    res.LAND_MANA_SYMBOL_POSITION = calcIllustrationPosition(
+        layout=res.LAND_LAYOUT, dpi=dpi
+    )
 
-# Aftermath layout (for the upper half of aftermath)
-AFTERMATH_LAYOUT = calcLayoutData(
-    layoutType=AFTER,
-    bottom=CARD_V // 2,
-    rulesBoxSize=175,
-)
-AFTERMATH_SET_ICON_POSITION = calcIconPosition(layout=AFTERMATH_LAYOUT)
+    # Vanilla token layout (has one line for color indicator)
+    res.TOKEN_LAYOUT = calcLayoutData(
+        layoutType=TOKEN,
+        bottom=res.CARD_V,
+        right=res.CARD_H,
+        rulesBoxSize=scaleToDpi(TOKEN_RULES_BOX_SIZE, dpi),
+        dpi=dpi,
+    )
+    res.TOKEN_SET_ICON_POSITION = calcIconPosition(layout=res.TOKEN_LAYOUT, dpi=dpi)
+
+    # Emblem and normal token layout (has more rules space)
+    res.EMBLEM_LAYOUT = calcLayoutData(
+        layoutType=EMBLEM,
+        bottom=res.CARD_V,
+        right=res.CARD_H,
+        rulesBoxSize=scaleToDpi(EMBLEM_RULES_BOX_SIZE, dpi),
+        dpi=dpi,
+    )
+    res.EMBLEM_SET_ICON_POSITION = calcIconPosition(layout=res.EMBLEM_LAYOUT, dpi=dpi)
+    res.EMBLEM_SYMBOL_POSITION = calcIllustrationPosition(
+        layout=res.EMBLEM_LAYOUT, dpi=dpi
+    )
 
+    res.LAYOUTS = defaultdict(
+        lambda: [res.STD_LAYOUT],
+        {
+            SPLIT: [res.SPLIT_LAYOUT_LEFT, res.SPLIT_LAYOUT_RIGHT],
+            FUSE: [res.SPLIT_LAYOUT_LEFT, res.SPLIT_LAYOUT_RIGHT],
+            AFTER: [res.AFTERMATH_LAYOUT, res.SPLIT_LAYOUT_RIGHT],
+            FLIP: [res.FLIP_LAYOUT, res.FLIP_LAYOUT],
+            ADV: [res.STD_LAYOUT, res.ADVENTURE_LAYOUT],
+            LAND: [res.LAND_LAYOUT],
+            TOKEN: [res.TOKEN_LAYOUT],
+            EMBLEM: [res.EMBLEM_LAYOUT],
+        },
+    )
 
-# Flip layout (Only one half is specified here, for the other just flip the card and redraw)
-FLIP_LAYOUT = calcLayoutData(
-    layoutType=FLIP,
-    rulesBoxSize=200,
-)
-FLIP_SET_ICON_POSITION = calcIconPosition(layout=FLIP_LAYOUT)
+    res.SET_ICON_POSITIONS = defaultdict(
+        lambda: [res.STD_SET_ICON_POSITION],
+        {
+            SPLIT: res.SPLIT_SET_ICON_POSITION,
+            FUSE: res.SPLIT_SET_ICON_POSITION,
+            AFTER: [res.AFTERMATH_SET_ICON_POSITION, res.SPLIT_SET_ICON_POSITION[1]],
+            FLIP: [res.FLIP_SET_ICON_POSITION, res.FLIP_SET_ICON_POSITION],
+            ADV: [res.STD_SET_ICON_POSITION, res.STD_SET_ICON_POSITION],
+            LAND: [res.LAND_SET_ICON_POSITION],
+            TOKEN: [res.TOKEN_SET_ICON_POSITION],
+            EMBLEM: [res.EMBLEM_SET_ICON_POSITION],
+        },
+    )
 
+    return res
 
-# Textless land layout
-LAND_LAYOUT = calcLayoutData(layoutType=LAND, rulesBoxSize=0)
-LAND_SET_ICON_POSITION = calcIconPosition(layout=LAND_LAYOUT)
-LAND_MANA_SYMBOL_POSITION = calcIllustrationPosition(layout=LAND_LAYOUT)
 
+RESOLUTIONS: Dict[int, Resolution] = {}
 
-# Vanilla token layout (has one line for color indicator)
-TOKEN_LAYOUT = calcLayoutData(layoutType=TOKEN, rulesBoxSize=100)
-TOKEN_SET_ICON_POSITION = calcIconPosition(layout=TOKEN_LAYOUT)
-TOKEN_ARC_WIDTH = 600
 
+def getResolution(dpi: int = DPI) -> Resolution:
+    """
+    Returns (and caches) all the sizes and layouts for the given resolution
+    """
+    if dpi not in RESOLUTIONS:
+        RESOLUTIONS[dpi] = calcResolution(dpi=dpi)
+    return RESOLUTIONS[dpi]
 
-# Emblem and normal token layout (has more rules space)
-EMBLEM_LAYOUT = calcLayoutData(layoutType=EMBLEM, rulesBoxSize=250)
-EMBLEM_SET_ICON_POSITION = calcIconPosition(layout=EMBLEM_LAYOUT)
-EMBLEM_SYMBOL_POSITION = calcIllustrationPosition(layout=EMBLEM_LAYOUT)
-
-LAYOUTS: DefaultDict[str, List[Layout]] = defaultdict(
-    lambda: [STD_LAYOUT],
-    {
-        SPLIT: [SPLIT_LAYOUT_LEFT, SPLIT_LAYOUT_RIGHT],
-        FUSE: [SPLIT_LAYOUT_LEFT, SPLIT_LAYOUT_RIGHT],
-        AFTER: [AFTERMATH_LAYOUT, SPLIT_LAYOUT_RIGHT],
-        FLIP: [FLIP_LAYOUT, FLIP_LAYOUT],
-        ADV: [STD_LAYOUT, ADVENTURE_LAYOUT],
-        LAND: [LAND_LAYOUT],
-        TOKEN: [TOKEN_LAYOUT],
-        EMBLEM: [EMBLEM_LAYOUT],
-    },
-)
 
-SET_ICON_POSITIONS: DefaultDict[str, List[XY]] = defaultdict(
-    lambda: [STD_SET_ICON_POSITION],
-    {
-        SPLIT: SPLIT_SET_ICON_POSITION,
-        FUSE: SPLIT_SET_ICON_POSITION,
-        AFTER: [AFTERMATH_SET_ICON_POSITION, SPLIT_SET_ICON_POSITION[1]],
-        FLIP: [FLIP_SET_ICON_POSITION, FLIP_SET_ICON_POSITION],
-        ADV: [STD_SET_ICON_POSITION, STD_SET_ICON_POSITION],
-        LAND: [LAND_SET_ICON_POSITION],
-        TOKEN: [TOKEN_SET_ICON_POSITION],
-        EMBLEM: [EMBLEM_SET_ICON_POSITION],
-    },
-)
\ No newline at end of file
+# Layouts at the standard resolution
+
+STD_RESOLUTION = getResolution(DPI)
+
+STD_LAYOUT = STD_RESOLUTION.STD_LAYOUT
+STD_SET_ICON_POSITION = STD_RESOLUTION.STD_SET_ICON_POSITION
+
+SPLIT_LAYOUT_LEFT = STD_RESOLUTION.SPLIT_LAYOUT_LEFT
+SPLIT_LAYOUT_RIGHT = STD_RESOLUTION.SPLIT_LAYOUT_RIGHT
+SPLIT_SET_ICON_POSITION: List[XY] = STD_RESOLUTION.SPLIT_SET_ICON_POSITION
+
+ADVENTURE_LAYOUT = STD_RESOLUTION.ADVENTURE_LAYOUT
+
+AFTERMATH_LAYOUT = STD_RESOLUTION.AFTERMATH_LAYOUT
+AFTERMATH_SET_ICON_POSITION = STD_RESOLUTION.AFTERMATH_SET_ICON_POSITION
+
+FLIP_LAYOUT = STD_RESOLUTION.FLIP_LAYOUT
+FLIP_SET_ICON_POSITION = STD_RESOLUTION.FLIP_SET_ICON_POSITION
+
+LAND_LAYOUT = STD_RESOLUTION.LAND_LAYOUT
+LAND_SET_ICON_POSITION = STD_RESOLUTION.LAND_SET_ICON_POSITION
+LAND_MANA_SYMBOL_POSITION = STD_RESOLUTION.LAND_MANA_SYMBOL_POSITION
+
+TOKEN_LAYOUT = STD_RESOLUTION.TOKEN_LAYOUT
+TOKEN_SET_ICON_POSITION = STD_RESOLUTION.TOKEN_SET_ICON_POSITION
+
+EMBLEM_LAYOUT = STD_RESOLUTION.EMBLEM_LAYOUT
+EMBLEM_SET_ICON_POSITION = STD_RESOLUTION.EMBLEM_SET_ICON_POSITION
+EMBLEM_SYMBOL_POSITION = STD_RESOLUTION.EMBLEM_SYMBOL_POSITION
+
+LAYOUTS: DefaultDict[str, List[Layout]] = STD_RESOLUTION.LAYOUTS
+SET_ICON_POSITIONS: DefaultDict[str, List[XY]] = STD_RESOLUTION.SET_ICON_POSITIONS
@@ -0,0 +1,180 @@
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image
+from collections import OrderedDict
+from hashlib import sha256
+import json
+import os
+import threading
+
+from . import projectConstants as C
+from .projectTypes import Card
+
+# Change this whenever the drawing code changes what a card looks like,
+# so that cards drawn by older versions are not reused
+RENDERER_VERSION = f"{C.VERSION}-render-1"
+
+
+def fileHash(path: str) -> str:
+    with open(path, "rb") as f:
+        return sha256(f.read()).hexdigest()
+
+
+class RenderCache:
+    """
+    On disk cache of drawn cards, addressed by the hash of everything
+    that can change the drawing: card data, flavor names, set icon content,
+    drawing options and renderer version.
+    The least recently used cards are deleted when the cache grows over maxBytes.
+    """
+
+    def __init__(
+        self,
+        cacheLoc: str = C.RENDER_CACHE_LOC,
+        maxBytes: int = C.RENDER_CACHE_MAX_BYTES,
+    ):
+        self.cacheLoc = cacheLoc
+        self.maxBytes = maxBytes
+        self._iconHashes: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def iconHash(self, setIconPath: Optional[str]) -> Optional[str]:
+        if setIconPath is None:
+            return None
+        if setIconPath not in self._iconHashes:
+            self._iconHashes[setIconPath] = fileHash(setIconPath)
+        return self._iconHashes[setIconPath]
+
+    def cardKey(
+        self,
+        card: Card,
+        flavorNames: Dict[str, str],
+        setIconPath: Optional[str],
+        options: Dict[str, Any],
+    ) -> str:
+        """
+        flavorNames should only contain the names used by the card,
+        so that changing other flavor names does not change the key
+        """
+        keyData = {
+            "version": RENDERER_VERSION,
+            "card": card.data,
+            "flavorNames": flavorNames,
+            "setIcon": self.iconHash(setIconPath),
+            "options": {k: v for (k, v) in options.items() if k != "flavorNames"},
+        }
+        return sha256(
+            json.dumps(keyData, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def path(self, key: str) -> str:
+        return f"{self.cacheLoc}/{key[:2]}/{key}.png"
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def load(self, key: str) -> Optional[Image.Image]:
+        path = self.path(key)
+        try:
+            with Image.open(path) as cached:
+                image = cached.copy()
+        except (OSError, SyntaxError):
+            self.misses += 1
+            return None
+        # The modification time tracks the last use, for eviction
+        os.utime(path)
+        self.hits += 1
+        return image
+
+    def store(self, key: str, image: Image.Image) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name, so a half written file is never loaded
+        tmpPath = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        image.save(tmpPath, "PNG", compress_level=1)
+        os.replace(tmpPath, path)
+
+    def evict(self) -> int:
+        """
+        Deletes the least recently used cards until the cache fits in maxBytes.
+        Returns the number of deleted cards
+        """
+        entries: List[Tuple[float, int, str]] = []
+        for (dirPath, _, fileNames) in os.walk(self.cacheLoc):
+            for fileName in fileNames:
+                if not fileName.endswith(".png"):
+                    continue
+                path = os.path.join(dirPath, fileName)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    # Evicted by another run at the same time
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        totalBytes = sum(size for (_, size, _) in entries)
+        deleted = 0
+        for (_, size, path) in sorted(entries):
+            if totalBytes <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            totalBytes -= size
+            deleted += 1
+        return deleted
+
+
+class MemoryRenderCache(RenderCache):
+    """
+    Cache of drawn cards kept in memory only, for programs drawing
+    many decks in the same process without using the disk.
+    The least recently used cards are dropped when the cards take more than maxBytes.
+    """
+
+    def __init__(self, maxBytes: int = C.RENDER_CACHE_MAX_BYTES):
+        super().__init__(cacheLoc="", maxBytes=maxBytes)
+        self._images: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def contains(self, key: str) -> bool:
+        return key in self._images
+
+    def load(self, key: str) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+        # Drawn cards can be released to a pool, so every load gets its own copy
+        return image.copy()
+
+    def store(self, key: str, image: Image.Image) -> None:
+        image = image.copy()
+        with self._lock:
+            if key in self._images:
+                self._bytes -= imageBytes(self._images.pop(key))
+            self._images[key] = image
+            self._bytes += imageBytes(image)
+            # Evicted as cards are stored, so that the cache never grows past maxBytes
+            self._evictLocked()
+
+    def evict(self) -> int:
+        with self._lock:
+            return self._evictLocked()
+
+    def _evictLocked(self) -> int:
+        deleted = 0
+        while self._bytes > self.maxBytes and len(self._images) > 0:
+            (_, image) = self._images.popitem(last=False)
+            self._bytes -= imageBytes(image)
+            deleted += 1
+        return deleted
+
+
+def imageBytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
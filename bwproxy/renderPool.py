@@ -0,0 +1,521 @@
+from __future__ import annotations
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from PIL import Image
+from collections import deque
+from concurrent.futures import Future
+import concurrent.futures
+from tqdm import tqdm
+import itertools
+import json
+import math
+import multiprocessing
+import threading
+import time
+
+from . import projectConstants as C
+from . import drawUtil
+from .assetRegistry import ASSETS
+from .canvasPool import CanvasPool
+from .renderCache import RenderCache
+from .projectTypes import Card, Flavor
+
+# Decks smaller than this are drawn serially: starting the workers would take longer
+PARALLEL_MIN_CARDS = 32
+# Cards drawn (or loaded) ahead of the one being returned when streaming,
+# for every worker: enough to keep the workers busy, few enough to bound memory
+STREAM_CARDS_PER_WORKER = 4
+
+# Rendered card, as sent back from the workers: (mode, size, pixels)
+CardBuffer = Tuple[str, Tuple[int, int], bytes]
+# Card to draw, as sent to the workers: (card data, set icon path, drawCard options)
+RenderTask = Tuple[Dict[str, Any], Optional[str], Dict[str, Any]]
+# Drawn card, as sent back from the workers with its drawing time: (seconds, card)
+TimedCardBuffer = Tuple[float, CardBuffer]
+
+# Estimated drawing cost of a card, roughly in milliseconds at 300 dpi:
+# a base cost for every face, plus a cost for every character of rules text.
+# Text costs more in small text boxes, since fitting it takes more attempts.
+FACE_COST = 3.0
+TEXT_COSTS = {
+    C.STD: 0.1,
+    C.SPLIT: 0.15,
+    C.FUSE: 0.2,
+    C.AFTER: 0.12,
+    C.FLIP: 0.6,
+    C.ADV: 0.08,
+}
+DEFAULT_TEXT_COST = 0.1
+COLOR_COST = 1.3
+DRAFT_COST = 0.5
+
+CostKey = Tuple[str, int, bool, bool]
+
+
+class CostModel:
+    """
+    Estimates how long a card takes to draw, from its layout, faces,
+    text length and drawing options. Estimates are corrected with the
+    drawing times measured for cards of the same kind, so later decks
+    drawn by the same process are scheduled better.
+    """
+
+    def __init__(self):
+        # Sums of (estimated, measured) costs for every kind of card
+        self.measures: Dict[CostKey, Tuple[float, float]] = {}
+        # Times can be recorded by many threads (e.g. in the service)
+        self.lock = threading.Lock()
+
+    def costKey(self, card: Card, options: Dict[str, Any]) -> CostKey:
+        try:
+            layoutName = card.layout
+        except KeyError:
+            layoutName = card.face_type
+        return (
+            layoutName,
+            len(drawUtil.getFaces(card)),
+            options.get("isColored", False),
+            options.get("draft", False),
+        )
+
+    def baseEstimate(self, card: Card, options: Dict[str, Any]) -> float:
+        (layoutName, facesCount, isColored, draft) = self.costKey(card, options)
+        textLength = sum(
+            len(face.data.get("oracle_text", "")) for face in drawUtil.getFaces(card)
+        )
+        cost = FACE_COST * facesCount + textLength * TEXT_COSTS.get(
+            layoutName, DEFAULT_TEXT_COST
+        )
+        if isColored:
+            cost *= COLOR_COST
+        if draft:
+            cost *= DRAFT_COST
+        return cost
+
+    def estimate(self, card: Card, options: Dict[str, Any]) -> float:
+        cost = self.baseEstimate(card, options)
+        key = self.costKey(card, options)
+        with self.lock:
+            if key in self.measures:
+                (estimated, measured) = self.measures[key]
+                cost *= measured / estimated
+            elif len(self.measures) > 0:
+                # Measured times are in seconds: all estimates need to be comparable
+                estimated = sum(e for (e, _) in self.measures.values())
+                measured = sum(m for (_, m) in self.measures.values())
+                cost *= measured / estimated
+        return cost
+
+    def record(self, card: Card, options: Dict[str, Any], seconds: float) -> None:
+        key = self.costKey(card, options)
+        baseEstimate = self.baseEstimate(card, options)
+        with self.lock:
+            (estimated, measured) = self.measures.get(key, (0.0, 0.0))
+            self.measures[key] = (estimated + baseEstimate, measured + seconds)
+
+
+COST_MODEL = CostModel()
+
+
+def getStartMethod() -> Optional[str]:
+    """
+    Workers are forked where possible, so that they share the parent caches.
+    Elsewhere they start from scratch and load everything themselves.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return "fork"
+    return None
+
+
+def cardFlavorNames(card: Card, flavorNames: Flavor) -> Flavor:
+    """
+    Returns only the flavor names used by the card, to keep the tasks small
+    """
+    names = [face.name for face in drawUtil.getFaces(card)] + [card.name]
+    return {name: flavorNames[name] for name in names if name in flavorNames}
+
+
+def makeTask(
+    card: Card, setIconPath: Optional[str], options: Dict[str, Any]
+) -> RenderTask:
+    taskOptions = dict(options)
+    taskOptions["flavorNames"] = cardFlavorNames(
+        card, options.get("flavorNames", {})
+    )
+    return (card.data, setIconPath, taskOptions)
+
+
+def getSetIcon(setIconPath: Optional[str], dpi: int = C.DPI) -> Optional[Image.Image]:
+    if setIconPath is None:
+        return None
+    return ASSETS.getSetIcon(setIconPath, dpi=dpi)
+
+
+def drawTask(task: RenderTask) -> CardBuffer:
+    """
+    Draws a card in a worker process, from the card data only
+    """
+    (cardData, setIconPath, options) = task
+    image = drawUtil.drawCard(
+        card=Card(cardData),
+        setIcon=getSetIcon(setIconPath, dpi=options.get("dpi", C.DPI)),
+        **options,
+    )
+    return (image.mode, image.size, image.tobytes())
+
+
+def drawTimedTask(task: RenderTask) -> TimedCardBuffer:
+    start = time.perf_counter()
+    cardBuffer = drawTask(task)
+    return (time.perf_counter() - start, cardBuffer)
+
+
+def loadCardBuffer(
+    cardBuffer: CardBuffer, pool: Optional[CanvasPool] = None
+) -> Image.Image:
+    (mode, size, data) = cardBuffer
+    if pool is None:
+        return Image.frombytes(mode, size, data)
+    image = pool.acquire(mode, size)
+    image.frombytes(data)
+    return image
+
+
+def warmUp(
+    cards: Iterable[Card] = (),
+    setIconPath: Optional[str] = None,
+    options: Dict[str, Any] = {},
+) -> None:
+    """
+    Loads in the current process everything the workers would load:
+    layouts, fonts, illustration symbols, set icon and the frame templates
+    of the given cards. Forked workers then share all of it.
+    """
+    dpi = options.get("dpi", C.DPI)
+    R = C.getResolution(dpi)
+    ASSETS.preload(dpi=dpi)
+    for fontPath in [C.SERIF_FONT, C.MONOSPACE_FONT]:
+        for fontSize in [
+            R.TITLE_FONT_SIZE,
+            R.TYPE_FONT_SIZE,
+            R.TEXT_FONT_SIZE,
+            R.OTHER_FONT_SIZE,
+        ]:
+            drawUtil.getFont(fontPath, fontSize)
+    setIcon = getSetIcon(setIconPath, dpi=dpi)
+    for card in cards:
+        drawUtil.getFrameTemplate(
+            card=card,
+            isColored=options.get("isColored", False),
+            setIcon=setIcon,
+            fullArtLands=options.get("fullArtLands", False),
+            alternativeFrames=options.get("alternativeFrames", False),
+            dpi=dpi,
+        )
+
+
+class WorkerPool:
+    """
+    Pool of worker processes drawing cards.
+    Workers are forked from the current process, so everything loaded
+    by warmUp before creating the pool is already available to them.
+    Tasks carry their own options, so the same pool can draw different decks
+    (for example in a long running service).
+    """
+
+    def __init__(self, jobs: int):
+        self.jobs = jobs
+        context = multiprocessing.get_context(getStartMethod())
+        self.workers = context.Pool(processes=jobs)
+
+    def submitTask(
+        self,
+        task: RenderTask,
+        callback: Callable[[TimedCardBuffer], None],
+        errorCallback: Callable[[BaseException], None],
+    ) -> None:
+        """
+        Starts drawing a task. The callbacks are called with the drawing time
+        and the drawn card (or the error) by a thread of the pool
+        """
+        self.workers.apply_async(
+            drawTimedTask, (task,), callback=callback, error_callback=errorCallback
+        )
+
+    def close(self) -> None:
+        self.workers.close()
+        self.workers.join()
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.workers.terminate()
+        self.workers.join()
+
+
+def cardIdentity(card: Card, flavorNames: Flavor) -> str:
+    """
+    Identifies a card with the flavor names it uses,
+    so that cards shared by many decks are drawn only once
+    """
+    return json.dumps(
+        [card.data, cardFlavorNames(card, flavorNames)], sort_keys=True, default=str
+    )
+
+
+class TaskScheduler:
+    """
+    Gives the tasks of a stream of cards to the workers, at most one
+    per worker at a time: every worker that becomes idle takes the most
+    expensive waiting task, so that the cards taken from the stream
+    are drawn longest first, and no worker is left with a long card at the end.
+    """
+
+    def __init__(self, workers: WorkerPool):
+        self.workers = workers
+        # Estimated cost and task of the tasks not given to the workers yet
+        self.waiting: Dict["Future[TimedCardBuffer]", Tuple[float, RenderTask]] = {}
+        self.running = 0
+        self.lock = threading.Lock()
+
+    def submit(self, task: RenderTask, cost: float) -> "Future[TimedCardBuffer]":
+        future: "Future[TimedCardBuffer]" = Future()
+        with self.lock:
+            self.waiting[future] = (cost, task)
+        self.startTasks()
+        return future
+
+    def hurry(self, future: "Future[TimedCardBuffer]") -> None:
+        """
+        The card is needed now: its task is the next one given to a worker
+        """
+        with self.lock:
+            if future in self.waiting:
+                self.waiting[future] = (math.inf, self.waiting[future][1])
+
+    def startTasks(self) -> None:
+        while True:
+            with self.lock:
+                if self.running >= self.workers.jobs or len(self.waiting) == 0:
+                    return
+                future = max(self.waiting, key=lambda f: self.waiting[f][0])
+                (_, task) = self.waiting.pop(future)
+                self.running += 1
+            self.workers.submitTask(
+                task,
+                callback=lambda result, future=future: self.finished(future, result),
+                errorCallback=lambda error, future=future: self.failed(future, error),
+            )
+
+    def finished(
+        self, future: "Future[TimedCardBuffer]", result: TimedCardBuffer
+    ) -> None:
+        with self.lock:
+            self.running -= 1
+        future.set_result(result)
+        self.startTasks()
+
+    def failed(self, future: "Future[TimedCardBuffer]", error: BaseException) -> None:
+        with self.lock:
+            self.running -= 1
+        future.set_exception(error)
+        self.startTasks()
+
+    def cancel(self) -> None:
+        """
+        Drops the waiting tasks, when the cards are not needed any more
+        """
+        with self.lock:
+            waiting = list(self.waiting)
+            self.waiting.clear()
+        for future in waiting:
+            future.cancel()
+
+
+def streamCards(
+    cards: Iterable[Optional[Tuple[Card, Flavor]]],
+    setIconPath: Optional[str] = None,
+    isColored: bool = False,
+    useTextSymbols: bool = True,
+    fullArtLands: bool = False,
+    alternativeFrames: bool = False,
+    dpi: int = C.DPI,
+    draft: bool = False,
+    vector: bool = False,
+    pool: Optional[CanvasPool] = None,
+    jobs: int = 1,
+    workers: Optional[WorkerPool] = None,
+    cache: Optional[RenderCache] = None,
+    progress: bool = True,
+    deadline: Optional[float] = None,
+    total: Optional[int] = None,
+) -> Iterator[Optional[drawUtil.Canvas]]:
+    """
+    Draws the cards as they arrive, each with its own flavor names,
+    and returns them in order as soon as they are ready.
+    None is returned as it is, for cards that don't need to be drawn.
+    Cards are drawn using up to jobs worker processes, or the given
+    (already running) workers. Small decks and vector cards are drawn
+    in the current process. Cards found in the cache are loaded
+    instead of drawn, and the drawn ones are added to it.
+    Only a few cards per worker are taken from the stream ahead
+    of the one being returned, so the memory used does not depend
+    on the size of the deck; among them, the longest are drawn first.
+    When running in a thread, workers should be started beforehand
+    by the main thread, since forking a process with threads is unsafe.
+    With a deadline (as given by time.monotonic), waiting for the workers
+    after it raises TimeoutError, so that a stuck worker cannot block forever.
+    Total is the expected number of cards, shown by the progress bar
+    when cards is a stream; it is corrected once the stream ends.
+    """
+    options: Dict[str, Any] = dict(
+        isColored=isColored,
+        useTextSymbols=useTextSymbols,
+        fullArtLands=fullArtLands,
+        alternativeFrames=alternativeFrames,
+        dpi=dpi,
+        draft=draft,
+    )
+    if vector:
+        cache = None
+
+    def cacheKey(card: Card, flavorNames: Flavor) -> Optional[str]:
+        if cache is None:
+            return None
+        return cache.cardKey(
+            card,
+            flavorNames=cardFlavorNames(card, flavorNames),
+            setIconPath=setIconPath,
+            options=options,
+        )
+
+    if isinstance(cards, list):
+        total = len(cards)
+
+    parallel = (workers is not None or jobs > 1) and not vector
+    if parallel:
+        # The deck is not known in advance: the cards are read until
+        # there are enough to draw (not found in the cache) to use the workers
+        cardIterator = iter(cards)
+        firstCards: List[Optional[Tuple[Card, Flavor]]] = []
+        toDraw: Set[str] = set()
+        drawCount = 0
+        for item in cardIterator:
+            firstCards.append(item)
+            if item is not None:
+                key = cacheKey(*item)
+                if key is None:
+                    drawCount += 1
+                elif key not in toDraw and not cache.contains(key):  # type: ignore
+                    toDraw.add(key)
+                    drawCount += 1
+            if drawCount >= PARALLEL_MIN_CARDS:
+                break
+        parallel = drawCount >= PARALLEL_MIN_CARDS
+        cards = itertools.chain(firstCards, cardIterator)
+
+    def streamSerial() -> Iterator[Optional[drawUtil.Canvas]]:
+        setIcon = getSetIcon(setIconPath, dpi=dpi)
+        for item in cards:
+            if item is None:
+                yield None
+                continue
+            (card, flavorNames) = item
+            key = cacheKey(card, flavorNames)
+            image = None
+            if cache is not None and key is not None:
+                image = cache.load(key)
+            if image is None:
+                image = drawUtil.drawCard(
+                    card=card,
+                    setIcon=setIcon,
+                    flavorNames=flavorNames,
+                    vector=vector,
+                    pool=pool,
+                    **options,
+                )
+                if cache is not None and key is not None:
+                    cache.store(key, image)  # type: ignore
+            yield image
+
+    # Cards found in the cache (or not to be drawn) never reach the workers
+    def streamPending(workers: WorkerPool) -> Iterator[Optional[drawUtil.Canvas]]:
+        scheduler = TaskScheduler(workers)
+        # (cache key, card, loaded image, drawing task) for every card taken from the stream
+        pending: Deque[
+            Tuple[Optional[str], Optional[Card], Any, Optional["Future[TimedCardBuffer]"]]
+        ] = deque()
+        # Copies of the same card close together are drawn only once
+        drawing: Dict[str, "Future[TimedCardBuffer]"] = {}
+        maxPending = workers.jobs * STREAM_CARDS_PER_WORKER
+
+        def nextImage() -> Optional[drawUtil.Canvas]:
+            (key, card, image, future) = pending.popleft()
+            if future is not None:
+                scheduler.hurry(future)
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    (seconds, cardBuffer) = future.result(timeout=timeout)
+                except concurrent.futures.TimeoutError:
+                    raise TimeoutError("The cards took too long to draw")
+                image = loadCardBuffer(cardBuffer, pool=pool)
+                # Only the first copy of a card records its time and caches it
+                if key is None or drawing.get(key) is future:
+                    COST_MODEL.record(card, options, seconds)  # type: ignore
+                if key is not None and drawing.get(key) is future:
+                    del drawing[key]
+                    cache.store(key, image)  # type: ignore
+            return image
+
+        try:
+            for item in cards:
+                if item is None:
+                    pending.append((None, None, None, None))
+                else:
+                    (card, flavorNames) = item
+                    key = cacheKey(card, flavorNames)
+                    image = None
+                    future = None
+                    if key is not None and key in drawing:
+                        future = drawing[key]
+                    elif cache is not None and key is not None:
+                        image = cache.load(key)
+                    if image is None and future is None:
+                        future = scheduler.submit(
+                            makeTask(card, setIconPath, dict(options, flavorNames=flavorNames)),
+                            cost=COST_MODEL.estimate(card, options),
+                        )
+                        if key is not None:
+                            drawing[key] = future
+                    pending.append((key, card, image, future))
+                if len(pending) >= maxPending:
+                    yield nextImage()
+            while len(pending) > 0:
+                yield nextImage()
+        finally:
+            scheduler.cancel()
+
+    def streamImages() -> Iterator[Optional[drawUtil.Canvas]]:
+        if not parallel:
+            yield from streamSerial()
+        elif workers is not None:
+            yield from streamPending(workers)
+        else:
+            warmUp(setIconPath=setIconPath, options=options)
+            with WorkerPool(jobs=jobs) as newWorkers:
+                yield from streamPending(newWorkers)
+        if cache is not None:
+            cache.evict()
+
+    if not progress:
+        yield from streamImages()
+        return
+    with tqdm(total=total, desc="Card drawing progress: ", unit="card") as progressBar:
+        for image in streamImages():
+            progressBar.update()
+            yield image
+        if progressBar.total != progressBar.n:
+            progressBar.total = progressBar.n
+            progressBar.refresh()
@@ -0,0 +1,413 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import threading
+import time
+import uuid
+
+from . import projectConstants as C
+from . import drawUtil
+from . import renderPool
+from .canvasPool import CanvasPool
+from .decklist import (
+    countCards,
+    loadCardCaches,
+    resolveLines,
+    saveCardCaches,
+    threadEventLoop,
+)
+from .renderCache import RenderCache
+from .projectTypes import Card, Flavor
+
+# Requests drawn at the same time. Others wait for a free slot
+# for up to SERVICE_QUEUE_TIME seconds, and are then refused (503)
+SERVICE_MAX_REQUESTS = 4
+SERVICE_QUEUE_TIME = 5.0
+# Time allowed to every request, from its arrival to its last page, in seconds.
+# Clients can ask for less, with the timeout parameter
+SERVICE_REQUEST_TIMEOUT = 120.0
+SERVICE_MAX_DECKLIST_BYTES = 1024 * 1024
+SERVICE_MAX_CARDS = 1000
+
+BOOLEAN_OPTIONS = {
+    "color": "isColored",
+    "small": "small",
+    "noTextSymbols": "noTextSymbols",
+    "noCardSpace": "noCardSpace",
+    "fullArtLands": "fullArtLands",
+    "ignoreBasicLands": "ignoreBasicLands",
+    "alternativeFrames": "alternativeFrames",
+}
+
+
+class RequestError(Exception):
+    """
+    Error answered to the client with the given HTTP status
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RequestTimeout(RequestError):
+    def __init__(self):
+        super().__init__(504, "The request took too long")
+
+
+def parseOptions(query: str) -> Dict[str, Any]:
+    """
+    Reads the drawing options of a request from its query string,
+    with the names and defaults of the command line options
+    """
+    params = {key: values[-1] for (key, values) in parse_qs(query).items()}
+    options: Dict[str, Any] = {
+        optionName: params.pop(param, "false").lower() in ["1", "true", "yes", ""]
+        for (param, optionName) in BOOLEAN_OPTIONS.items()
+    }
+    options["pageFormat"] = params.pop("pageFormat", C.PAGE_FORMAT[0])
+    if options["pageFormat"] not in C.PAGE_FORMAT:
+        raise RequestError(400, f"Unknown page format {options['pageFormat']}")
+    try:
+        options["dpi"] = int(params.pop("dpi", C.DPI))
+        options["timeout"] = float(params.pop("timeout", SERVICE_REQUEST_TIMEOUT))
+        options["index"] = int(params["index"]) if "index" in params else None
+        params.pop("index", None)
+    except ValueError as err:
+        raise RequestError(400, f"Invalid number: {err}")
+    if not C.MIN_DPI <= options["dpi"] <= C.MAX_DPI:
+        raise RequestError(400, f"dpi should be between {C.MIN_DPI} and {C.MAX_DPI}")
+    if options["index"] is not None and options["index"] < 1:
+        raise RequestError(400, "index starts from 1")
+    options["timeout"] = min(options["timeout"], SERVICE_REQUEST_TIMEOUT)
+    if len(params) > 0:
+        raise RequestError(400, f"Unknown options: {', '.join(sorted(params))}")
+    return options
+
+
+class RenderService:
+    """
+    Draws decklists sent over HTTP, in a single long running process:
+    card caches, fonts, assets and frame templates are loaded once
+    and stay warm between requests. Cards are drawn by a fixed pool
+    of worker processes shared by all the requests, and only
+    maxRequests requests are drawn at a time.
+
+    POST /pages and POST /cards, with the decklist as the request body,
+    stream back the pages (or the cards) as multipart/mixed PNG images,
+    each sent as soon as it is ready. With the index parameter
+    only that page (or card, counted from 1) is drawn and sent as a PNG image.
+    The other query parameters are the drawing options
+    (color, small, pageFormat, dpi, ...). GET /status returns the service load.
+    """
+
+    def __init__(
+        self,
+        setIconPath: Optional[str] = None,
+        jobs: int = 1,
+        maxRequests: int = SERVICE_MAX_REQUESTS,
+        useRenderCache: bool = True,
+    ):
+        self.setIconPath = setIconPath
+        self.maxRequests = maxRequests
+        (self.cardCache, self.tokenCache) = loadCardCaches()
+        # The caches are shared by all the requests
+        self.cacheLock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(maxRequests)
+        self.cache = RenderCache() if useRenderCache else None
+        self.active = 0
+        self.served = 0
+        self.refused = 0
+        self.statsLock = threading.Lock()
+        # Workers are forked before any request thread starts
+        renderPool.warmUp(setIconPath=setIconPath, options=dict(dpi=C.DPI))
+        self.workers = renderPool.WorkerPool(jobs=jobs)
+
+    def resolve(
+        self,
+        decklist: str,
+        deadline: float,
+        ignoreBasicLands: bool = False,
+        alternativeFrames: bool = False,
+    ) -> List[Tuple[Card, Flavor]]:
+        lines = decklist.splitlines()
+        # Checked before searching anything, so that big decklists are refused at once
+        if countCards(lines) > SERVICE_MAX_CARDS:
+            raise RequestError(413, f"Decklists can have at most {SERVICE_MAX_CARDS} cards")
+
+        # Cards are searched in copies of the caches, so that a request
+        # searching cards online does not hold up the others
+        with self.cacheLock:
+            cardCache = dict(self.cardCache)
+            tokenCache = dict(self.tokenCache)
+        try:
+            with threadEventLoop():
+                cards = list(
+                    resolveLines(
+                        lines,
+                        cardCache=cardCache,
+                        tokenCache=tokenCache,
+                        ignoreBasicLands=ignoreBasicLands,
+                        alternativeFrames=alternativeFrames,
+                        deadline=deadline,
+                    )
+                )
+        except TimeoutError:
+            raise RequestTimeout()
+        finally:
+            # Cards found before a timeout are kept too
+            with self.cacheLock:
+                cachedCount = len(self.cardCache) + len(self.tokenCache)
+                for (name, card) in cardCache.items():
+                    self.cardCache.setdefault(name, card)
+                for (name, token) in tokenCache.items():
+                    self.tokenCache.setdefault(name, token)
+                if cachedCount != len(self.cardCache) + len(self.tokenCache):
+                    saveCardCaches(self.cardCache, self.tokenCache)
+        # Double faced cards are drawn one face at a time
+        if len(cards) > SERVICE_MAX_CARDS:
+            raise RequestError(413, f"Decklists can have at most {SERVICE_MAX_CARDS} cards")
+        return cards
+
+    def drawImages(
+        self,
+        decklist: str,
+        options: Dict[str, Any],
+        deadline: float,
+        paginated: bool,
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Draws the decklist, returning the name and PNG data of every page
+        (or card if not paginated) as soon as it is ready
+        """
+        cards = self.resolve(
+            decklist,
+            deadline=deadline,
+            ignoreBasicLands=options["ignoreBasicLands"],
+            alternativeFrames=options["alternativeFrames"],
+        )
+        index = options["index"]
+        first = 0
+        if index is not None:
+            # Only the cards of the requested page (or the requested card) are drawn
+            (batchH, batchV) = drawUtil.getBatchSize(options["small"])
+            perImage = batchH * batchV if paginated else 1
+            first = (index - 1) * perImage
+            cards = cards[first : first + perImage]
+            if len(cards) == 0:
+                kind = "page" if paginated else "card"
+                raise RequestError(404, f"The deck has no {kind} {index}")
+
+        def checkDeadline() -> None:
+            if time.monotonic() > deadline:
+                raise RequestTimeout()
+
+        # Checked both when sending cards to the workers (which take them
+        # as fast as they can) and when using the drawn ones
+        def checkedCards() -> Iterator[Tuple[Card, Flavor]]:
+            for card in cards:
+                checkDeadline()
+                yield card
+
+        cardDpi = drawUtil.getCardDpi(dpi=options["dpi"], small=options["small"])
+        pool = CanvasPool()
+        images = renderPool.streamCards(
+            checkedCards(),
+            setIconPath=self.setIconPath,
+            isColored=options["isColored"],
+            useTextSymbols=not options["noTextSymbols"],
+            fullArtLands=options["fullArtLands"],
+            alternativeFrames=options["alternativeFrames"],
+            dpi=cardDpi if paginated else options["dpi"],
+            pool=pool,
+            workers=self.workers,
+            cache=self.cache,
+            progress=False,
+            deadline=deadline,
+        )
+        try:
+            if not paginated:
+                for (n, image) in enumerate(images):
+                    assert image is not None
+                    checkDeadline()
+                    yield (f"{first + n + 1:03}.png", drawUtil.encodeImage(image, dpi=options["dpi"]))
+                    pool.release(image)
+                return
+
+            firstPage = 1 if index is None else index
+            for (i, page) in drawUtil.paginate(
+                images,
+                small=options["small"],
+                pageFormat=options["pageFormat"],
+                noCardSpace=options["noCardSpace"],
+                dpi=options["dpi"],
+                pool=pool,
+            ):
+                checkDeadline()
+                yield (f"{i + firstPage:02}.png", drawUtil.encodeImage(page, dpi=options["dpi"]))
+        except TimeoutError:
+            # Raised when a worker takes too long (or is stuck)
+            raise RequestTimeout()
+
+    def status(self) -> Dict[str, Any]:
+        with self.statsLock:
+            return {
+                "version": C.VERSION,
+                "active": self.active,
+                "maxRequests": self.maxRequests,
+                "served": self.served,
+                "refused": self.refused,
+                "cachedCards": len(self.cardCache) + len(self.tokenCache),
+                "renderCacheHits": self.cache.hits if self.cache is not None else 0,
+                "renderCacheMisses": self.cache.misses if self.cache is not None else 0,
+            }
+
+    def acquire(self) -> bool:
+        if not self.slots.acquire(timeout=SERVICE_QUEUE_TIME):
+            with self.statsLock:
+                self.refused += 1
+            return False
+        with self.statsLock:
+            self.active += 1
+        return True
+
+    def release(self) -> None:
+        with self.statsLock:
+            self.active -= 1
+            self.served += 1
+        self.slots.release()
+
+    def serve(self, host: str = "localhost", port: int = 8080) -> None:
+        server = ThreadingHTTPServer((host, port), makeHandler(self))
+        server.daemon_threads = True
+        print(f"Serving on http://{host}:{server.server_address[1]}, press Ctrl-C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Service stopped")
+        finally:
+            server.server_close()
+            self.close()
+
+    def close(self) -> None:
+        self.workers.close()
+        if self.cache is not None:
+            self.cache.evict()
+
+
+def makeHandler(service: RenderService) -> Callable[..., BaseHTTPRequestHandler]:
+    class ServiceHandler(BaseHTTPRequestHandler):
+        server_version = f"bwproxy/{C.VERSION}"
+        # Slow clients cannot keep a request thread forever
+        timeout = SERVICE_REQUEST_TIMEOUT
+
+        def sendJson(self, status: int, content: Dict[str, Any], **headers: str) -> None:
+            body = json.dumps(content).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for (name, value) in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if urlparse(self.path).path == "/status":
+                self.sendJson(200, service.status())
+            else:
+                self.sendJson(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self) -> None:
+            url = urlparse(self.path)
+            if url.path not in ["/pages", "/cards"]:
+                self.sendJson(404, {"error": f"Unknown path {url.path}"})
+                return
+            deadline = time.monotonic() + SERVICE_REQUEST_TIMEOUT
+            try:
+                options = parseOptions(url.query)
+                deadline = time.monotonic() + options["timeout"]
+                length = int(self.headers.get("Content-Length", 0))
+                if length > SERVICE_MAX_DECKLIST_BYTES:
+                    raise RequestError(413, "The decklist is too big")
+                decklist = self.rfile.read(length).decode("utf-8")
+            except (RequestError, ValueError) as err:
+                status = err.status if isinstance(err, RequestError) else 400
+                self.sendJson(status, {"error": str(err)})
+                return
+
+            # Backpressure: busy services refuse requests instead of queuing them forever
+            if not service.acquire():
+                self.sendJson(
+                    503,
+                    {"error": "Too many requests, retry later"},
+                    **{"Retry-After": str(int(SERVICE_QUEUE_TIME))},
+                )
+                return
+            try:
+                self.sendImages(
+                    service.drawImages(
+                        decklist,
+                        options=options,
+                        deadline=deadline,
+                        paginated=url.path == "/pages",
+                    ),
+                    single=options["index"] is not None,
+                )
+            finally:
+                service.release()
+
+        def sendImages(self, images: Iterator[Tuple[str, bytes]], single: bool) -> None:
+            # Nothing is sent before the first image, so that errors
+            # found until then get a proper status
+            try:
+                first = next(images, None)
+            except RequestError as err:
+                self.sendJson(err.status, {"error": str(err)})
+                return
+            except Exception as err:
+                self.sendJson(500, {"error": f"{type(err).__name__}: {err}"})
+                return
+
+            if single:
+                assert first is not None
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(first[1])))
+                self.send_header("Content-Disposition", f'inline; filename="{first[0]}"')
+                self.end_headers()
+                self.wfile.write(first[1])
+                return
+
+            # The response ends when the connection is closed, so that
+            # every image is sent as soon as it is ready
+            boundary = uuid.uuid4().hex
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+            self.end_headers()
+            try:
+                if first is not None:
+                    self.sendPart(boundary, *first)
+                    for (name, data) in images:
+                        self.sendPart(boundary, name, data)
+                self.wfile.write(f"--{boundary}--\r\n".encode("ascii"))
+            except Exception as err:
+                # Too late for an error status: the response is left incomplete
+                # (without the closing boundary), so clients know it failed
+                self.log_error("Request failed while streaming: %s", err)
+                self.close_connection = True
+
+        def sendPart(self, boundary: str, name: str, data: bytes) -> None:
+            self.wfile.write(
+                (
+                    f"--{boundary}\r\n"
+                    "Content-Type: image/png\r\n"
+                    f'Content-Disposition: inline; filename="{name}"\r\n'
+                    f"Content-Length: {len(data)}\r\n\r\n"
+                ).encode("ascii")
+            )
+            self.wfile.write(data)
+            self.wfile.write(b"\r\n")
+            self.wfile.flush()
+
+    return ServiceHandler
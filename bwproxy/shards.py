@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Tuple
+from hashlib import sha256
+import glob
+import json
+import os
+
+from . import projectConstants as C
+from .drawUtil import getBatchSize
+from .projectTypes import Card, Flavor
+from .renderCache import fileHash
+from .renderPool import cardIdentity
+
+Shard = Tuple[int, int]
+
+
+def parseShard(text: str) -> Shard:
+    """
+    Parses a shard given as i/n, with 1 <= i <= n
+    """
+    (shard, shards) = (int(part) for part in text.split("/"))
+    if not 1 <= shard <= shards:
+        raise ValueError(f"Shard {text} is not between 1/{shards} and {shards}/{shards}")
+    return (shard, shards)
+
+
+def shardPages(pageCount: int, shard: Shard) -> range:
+    """
+    Pages (numbered from 0) assigned to the shard: every shard gets
+    a contiguous range of pages, and all ranges have about the same length
+    """
+    (index, shards) = shard
+    return range(pageCount * (index - 1) // shards, pageCount * index // shards)
+
+
+def shardCards(
+    cards: List[Tuple[Card, Flavor]], shard: Shard, small: bool = False
+) -> Tuple[int, int, List[Tuple[Card, Flavor]]]:
+    """
+    Returns the total number of pages in the deck, the first page
+    (numbered from 1) of the shard, and the cards on the pages of the shard.
+    The pages are the same that savePages would save for the whole deck.
+    """
+    (batchH, batchV) = getBatchSize(small)
+    batchNum = batchH * batchV
+    pageCount = (len(cards) + batchNum - 1) // batchNum
+    pages = shardPages(pageCount, shard)
+    return (
+        pageCount,
+        pages.start + 1,
+        cards[pages.start * batchNum : pages.stop * batchNum],
+    )
+
+
+def deckHash(cards: List[Tuple[Card, Flavor]], options: Dict[str, Any]) -> str:
+    """
+    Identifies the deck and the options used to make its pages,
+    so that only shards of the same job are merged together
+    """
+    return sha256(
+        json.dumps(
+            [[cardIdentity(card, flavorNames) for (card, flavorNames) in cards], options],
+            sort_keys=True,
+            default=str,
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def writeShardManifest(
+    deckName: str,
+    shard: Shard,
+    deckId: str,
+    pageCount: int,
+    pages: List[Dict[str, Any]],
+    pagePaths: List[str],
+) -> str:
+    """
+    Saves the list of the pages made by the shard, with the hash of every page file.
+    pages are the manifest entries of the pages (see PagePlanner.describePage),
+    which are kept by mergeShards in the manifest of the whole deck
+    """
+    (index, shards) = shard
+    manifest = {
+        "version": C.VERSION,
+        "deck": deckName,
+        "deckHash": deckId,
+        "shard": index,
+        "shards": shards,
+        "pageCount": pageCount,
+        "pages": [
+            dict(page, sha256=fileHash(pagePath))
+            for (page, pagePath) in zip(pages, pagePaths)
+        ],
+    }
+    manifestPath = f"pages/{deckName}/" + C.SHARD_MANIFEST_NAME.format(
+        shard=index, shards=shards
+    )
+    with open(manifestPath, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifestPath
+
+
+def mergeShards(deckName: str) -> str:
+    """
+    Checks that the pages of all the shards of the deck are in pages/<deckName>/
+    (copied there from every host) and unchanged, then replaces
+    the shard manifests with a single manifest for the whole deck.
+    Returns the path of the deck manifest
+    """
+    manifestPaths = sorted(
+        glob.glob(
+            f"pages/{deckName}/"
+            + C.SHARD_MANIFEST_NAME.format(shard="*", shards="*")
+        )
+    )
+    if len(manifestPaths) == 0:
+        raise Exception(f"No shard manifests found in pages/{deckName}/")
+
+    manifests: List[Dict[str, Any]] = []
+    for manifestPath in manifestPaths:
+        with open(manifestPath) as f:
+            manifests.append(json.load(f))
+
+    errors: List[str] = []
+    first = manifests[0]
+    for manifest in manifests:
+        for key in ["deckHash", "shards", "pageCount"]:
+            if manifest[key] != first[key]:
+                errors.append(
+                    f"Shard {manifest['shard']} has a different {key} than shard {first['shard']}"
+                )
+
+    foundShards = {manifest["shard"] for manifest in manifests}
+    for index in range(1, first["shards"] + 1):
+        if index not in foundShards:
+            errors.append(f"Shard {index}/{first['shards']} is missing")
+
+    pages: Dict[int, Dict[str, Any]] = {}
+    for manifest in manifests:
+        for page in manifest["pages"]:
+            if page["page"] in pages:
+                errors.append(f"Page {page['page']} is in more than one shard")
+            pages[page["page"]] = page
+            pagePath = f"pages/{deckName}/{page['file']}"
+            if not os.path.exists(pagePath):
+                errors.append(f"Page {pagePath} is missing")
+            elif fileHash(pagePath) != page["sha256"]:
+                errors.append(f"Page {pagePath} is different from the one made by its shard")
+
+    for pageNumber in range(1, first["pageCount"] + 1):
+        if pageNumber not in pages:
+            errors.append(f"Page {pageNumber} is not in any shard")
+
+    if len(errors) > 0:
+        raise Exception("Cannot merge the shards:\n" + "\n".join(errors))
+
+    deckManifest = {
+        "version": C.VERSION,
+        "deck": deckName,
+        "deckHash": first["deckHash"],
+        "pageCount": first["pageCount"],
+        "pages": [pages[pageNumber] for pageNumber in sorted(pages)],
+    }
+    deckManifestPath = f"pages/{deckName}/{C.DECK_MANIFEST_NAME}"
+    with open(deckManifestPath, "w") as f:
+        json.dump(deckManifest, f, indent=2)
+    for manifestPath in manifestPaths:
+        os.remove(manifestPath)
+    return deckManifestPath
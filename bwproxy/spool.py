@@ -0,0 +1,217 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from PIL import Image
+from hashlib import sha256
+import json
+import os
+import shutil
+import socket
+import time
+
+from . import drawUtil
+from .projectTypes import Card, Flavor
+from .renderCache import RENDERER_VERSION, fileHash
+from .renderPool import cardFlavorNames, getSetIcon
+
+# How often idle workers and the coordinator look for changes, in seconds
+SPOOL_POLL_TIME = 1.0
+# Claimed jobs not finished after this many seconds are considered abandoned
+# (e.g. the worker was stopped) and are queued again
+SPOOL_CLAIM_TIMEOUT = 600.0
+
+JOBS_DIR = "jobs"
+CLAIMED_DIR = "claimed"
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+# Written by the coordinator once all the jobs are queued
+QUEUED_MARKER = "queued"
+
+
+class Spool:
+    """
+    Work queue of card drawing jobs in a shared directory, with no other services.
+    The coordinator queues a job for every distinct card in jobs/,
+    workers (on any computer seeing the directory) claim them by moving them
+    to claimed/, and save the drawn cards in done/. Moving a file is atomic,
+    so every job is drawn by a single worker.
+    """
+
+    def __init__(self, spoolLoc: str):
+        self.spoolLoc = spoolLoc
+        self.owner = f"{socket.gethostname()}-{os.getpid()}"
+        for dirName in [JOBS_DIR, CLAIMED_DIR, DONE_DIR, FAILED_DIR]:
+            os.makedirs(os.path.join(spoolLoc, dirName), exist_ok=True)
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.spoolLoc, *parts)
+
+    def addJobs(
+        self,
+        cards: List[Tuple[Card, Flavor]],
+        setIconPath: Optional[str],
+        options: Dict[str, Any],
+    ) -> List[str]:
+        """
+        Queues the cards not already drawn, and returns the job of every card, in order.
+        options are the drawCard options, and must be serializable as JSON
+        """
+        markerPath = self.path(QUEUED_MARKER)
+        if os.path.exists(markerPath):
+            os.remove(markerPath)
+
+        # The set icon is copied in the spool, since workers may not have it
+        setIconName = None
+        if setIconPath is not None:
+            setIconName = f"icon-{fileHash(setIconPath)}.png"
+            if not os.path.exists(self.path(setIconName)):
+                shutil.copyfile(setIconPath, self.path(setIconName))
+
+        keys: List[str] = []
+        for (card, flavorNames) in cards:
+            job = {
+                "version": RENDERER_VERSION,
+                "card": card.data,
+                "flavorNames": cardFlavorNames(card, flavorNames),
+                "setIcon": setIconName,
+                "options": options,
+            }
+            jobText = json.dumps(job, sort_keys=True, default=str)
+            key = sha256(jobText.encode("utf-8")).hexdigest()
+            keys.append(key)
+            if (
+                os.path.exists(self.path(DONE_DIR, f"{key}.png"))
+                or os.path.exists(self.path(JOBS_DIR, f"{key}.json"))
+                or len(self.claims(key)) > 0
+            ):
+                continue
+            if os.path.exists(self.path(FAILED_DIR, f"{key}.json")):
+                os.remove(self.path(FAILED_DIR, f"{key}.json"))
+            self.writeFile(self.path(JOBS_DIR, f"{key}.json"), jobText.encode("utf-8"))
+
+        with open(markerPath, "w"):
+            pass
+        return keys
+
+    def writeFile(self, path: str, content: bytes) -> None:
+        # Written under a temporary name, so that no one reads a half written file
+        tmpPath = f"{path}.{self.owner}.tmp"
+        with open(tmpPath, "wb") as f:
+            f.write(content)
+        os.replace(tmpPath, path)
+
+    def claims(self, key: str) -> List[str]:
+        return [
+            fileName
+            for fileName in os.listdir(self.path(CLAIMED_DIR))
+            if fileName.startswith(f"{key}.")
+        ]
+
+    def claimJob(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Takes a queued job, if any. Returns the job key, the claimed job path and the job
+        """
+        for fileName in sorted(os.listdir(self.path(JOBS_DIR))):
+            if not fileName.endswith(".json"):
+                continue
+            key = fileName[: -len(".json")]
+            claimedPath = self.path(CLAIMED_DIR, f"{key}.{self.owner}.json")
+            try:
+                os.rename(self.path(JOBS_DIR, fileName), claimedPath)
+                # The claim time is used to find abandoned jobs
+                os.utime(claimedPath)
+                with open(claimedPath) as f:
+                    job = json.load(f)
+            except FileNotFoundError:
+                # Another worker claimed it first, or the coordinator queued it again
+                # (seeing the old modification time before the claim time was set)
+                continue
+            return (key, claimedPath, job)
+        return None
+
+    def drawJob(self, key: str, claimedPath: str, job: Dict[str, Any]) -> None:
+        try:
+            options = job["options"]
+            setIcon = None
+            if job["setIcon"] is not None:
+                setIcon = getSetIcon(self.path(job["setIcon"]), dpi=options["dpi"])
+            image = drawUtil.drawCard(
+                card=Card(job["card"]),
+                setIcon=setIcon,
+                flavorNames=job["flavorNames"],
+                **options,
+            )
+            tmpPath = self.path(DONE_DIR, f"{key}.{self.owner}.tmp")
+            image.save(tmpPath, "PNG", compress_level=1)
+            os.replace(tmpPath, self.path(DONE_DIR, f"{key}.png"))
+        except Exception as err:
+            job["error"] = f"{type(err).__name__}: {err}"
+            self.writeFile(
+                self.path(FAILED_DIR, f"{key}.json"), json.dumps(job).encode("utf-8")
+            )
+            print(f"Job {key} failed. {job['error']}")
+        try:
+            os.remove(claimedPath)
+        except FileNotFoundError:
+            # Taken too long, and queued again by the coordinator
+            pass
+
+    def work(self, wait: bool = False) -> int:
+        """
+        Draws queued jobs until there are none left. If wait is True,
+        also waits for the coordinator to queue all of its jobs.
+        Returns the number of drawn jobs
+        """
+        drawn = 0
+        while True:
+            claimed = self.claimJob()
+            if claimed is not None:
+                self.drawJob(*claimed)
+                drawn += 1
+            elif wait and not os.path.exists(self.path(QUEUED_MARKER)):
+                time.sleep(SPOOL_POLL_TIME)
+            else:
+                return drawn
+
+    def requeueAbandoned(self) -> None:
+        now = time.time()
+        for fileName in os.listdir(self.path(CLAIMED_DIR)):
+            claimedPath = self.path(CLAIMED_DIR, fileName)
+            try:
+                if now - os.path.getmtime(claimedPath) < SPOOL_CLAIM_TIMEOUT:
+                    continue
+                key = fileName.split(".")[0]
+                print(f"Job {key} was abandoned by its worker, queuing it again")
+                os.rename(claimedPath, self.path(JOBS_DIR, f"{key}.json"))
+            except FileNotFoundError:
+                # Finished in the meantime
+                continue
+
+    def waitResults(self, keys: List[str]) -> Iterator[Image.Image]:
+        """
+        Draws jobs until the queue is empty, then waits for the other workers
+        to finish theirs. Returns the drawn cards, in order
+        """
+        waiting = set(keys)
+        while True:
+            self.work()
+            waiting = {
+                key
+                for key in waiting
+                if not os.path.exists(self.path(DONE_DIR, f"{key}.png"))
+            }
+            failed = [
+                key
+                for key in waiting
+                if os.path.exists(self.path(FAILED_DIR, f"{key}.json"))
+            ]
+            if len(failed) > 0:
+                raise Exception(
+                    f"{len(failed)} jobs failed, see {self.path(FAILED_DIR)}"
+                )
+            if len(waiting) == 0:
+                break
+            self.requeueAbandoned()
+            time.sleep(SPOOL_POLL_TIME)
+
+        for key in keys:
+            with Image.open(self.path(DONE_DIR, f"{key}.png")) as image:
+                yield image.copy()
@@ -0,0 +1,458 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+from PIL import Image, ImageFont
+from functools import lru_cache
+from io import BytesIO
+from math import cos, sin, radians
+import base64
+import os
+
+from . import projectConstants as C
+
+# Affine transform (a, b, c, d, e, f), as in the SVG matrix() transform:
+# x' = a * x + c * y + e, y' = b * x + d * y + f
+Matrix = Tuple[float, float, float, float, float, float]
+IDENTITY: Matrix = (1, 0, 0, 1, 0, 0)
+
+RgbColor = Union[Tuple[int, int, int], Tuple[int, int, int, int]]
+# (gradient colors, position, size, rotated) of a colored frame section,
+# as in drawUtil.coloredBlankParts
+ColorPart = Tuple[List[RgbColor], C.XY, C.XY, bool]
+
+Element = Tuple[Any, ...]
+
+
+def multiplyMatrix(m1: Matrix, m2: Matrix) -> Matrix:
+    """
+    Returns the transform that applies m2 first, then m1
+    """
+    (a1, b1, c1, d1, e1, f1) = m1
+    (a2, b2, c2, d2, e2, f2) = m2
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def transposeMatrix(method: int, size: Tuple[int, int]) -> Matrix:
+    """
+    Returns the transform from the coordinates of a transposed image
+    (as in Image.transpose) to the coordinates of the original image
+    """
+    (width, height) = size
+    if method == Image.ROTATE_90:
+        return (0, 1, -1, 0, width, 0)
+    elif method == Image.ROTATE_180:
+        return (-1, 0, 0, -1, width, height)
+    elif method == Image.ROTATE_270:
+        return (0, -1, 1, 0, 0, height)
+    raise Exception(f"Unsupported transpose method: {method}")
+
+
+def fmt(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def transformAttr(matrix: Matrix) -> str:
+    if matrix == IDENTITY:
+        return ""
+    return f' transform="matrix({" ".join(fmt(v) for v in matrix)})"'
+
+
+def colorAttr(color: Union[str, RgbColor, None]) -> str:
+    if color is None:
+        return "none"
+    if isinstance(color, str):
+        return color
+    return "#{:02x}{:02x}{:02x}".format(*color[:3])
+
+
+def fontFamily(fontPath: str) -> str:
+    return os.path.splitext(os.path.basename(fontPath))[0]
+
+
+@lru_cache(maxsize=None)
+def fontFaceCss(fontPath: str) -> str:
+    """
+    Returns the @font-face rule embedding the font file
+    """
+    with open(fontPath, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    return (
+        f'@font-face {{ font-family: "{fontFamily(fontPath)}"; '
+        f'src: url(data:font/ttf;base64,{data}) format("truetype"); }}'
+    )
+
+
+def imageHref(image: Image.Image) -> str:
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def flattenBox(xy: Sequence[Any]) -> Tuple[float, float, float, float]:
+    """
+    Converts ((x0, y0), (x1, y1)) or (x0, y0, x1, y1) to (x0, y0, x1, y1)
+    """
+    if len(xy) == 2:
+        return (xy[0][0], xy[0][1], xy[1][0], xy[1][1])
+    return (xy[0], xy[1], xy[2], xy[3])
+
+
+class SvgCanvas:
+    """
+    Vector replacement for the Image objects used by drawUtil.
+    It supports the few Image methods used while drawing cards
+    (copy, transpose, paste, resize), and getPen returns an SvgPen
+    supporting the ImageDraw methods used (rectangle, arc, text, textlength).
+    Coordinates are pixels at the canvas resolution, as for Images,
+    so layouts and font metrics are shared with the raster renderer.
+
+    Views returned by transpose share the elements with the original canvas.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        dpi: int = C.DPI,
+        mode: str = C.GRAYSCALE_MODE,
+        elements: Optional[List[Element]] = None,
+        matrix: Matrix = IDENTITY,
+    ):
+        self.size = C.XY(size)
+        self.dpi = dpi
+        self.mode = mode
+        self.elements: List[Element] = [] if elements is None else elements
+        self.matrix = matrix
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def copy(self) -> SvgCanvas:
+        return SvgCanvas(
+            self.size,
+            dpi=self.dpi,
+            mode=self.mode,
+            elements=list(self.elements),
+            matrix=self.matrix,
+        )
+
+    def transpose(self, method: int) -> SvgCanvas:
+        if method == Image.ROTATE_180:
+            size = self.size
+        else:
+            size = self.size.transpose()
+        return SvgCanvas(
+            size,
+            dpi=self.dpi,
+            mode=self.mode,
+            elements=self.elements,
+            matrix=multiplyMatrix(self.matrix, transposeMatrix(method, self.size)),
+        )
+
+    def resize(self, size: Tuple[int, int]) -> SvgCanvas:
+        resized = SvgCanvas(size, dpi=self.dpi, mode=self.mode)
+        scale: Matrix = (size[0] / self.width, 0, 0, size[1] / self.height, 0, 0)
+        resized.elements.append(("canvas", scale, self))
+        return resized
+
+    def paste(
+        self,
+        im: Union[Image.Image, SvgCanvas],
+        box: Tuple[int, int] = (0, 0),
+        mask: Optional[Image.Image] = None,
+    ) -> None:
+        """
+        Places another canvas or an image at the given position.
+        Images are embedded with their transparency, so the mask is not needed
+        """
+        position = multiplyMatrix(self.matrix, (1, 0, 0, 1, box[0], box[1]))
+        if isinstance(im, SvgCanvas):
+            self.elements.append(("canvas", position, im))
+        else:
+            self.elements.append(("image", position, im))
+
+    def getPen(self) -> SvgPen:
+        return SvgPen(self)
+
+    def colorBorders(self, borderColor: str, parts: List[ColorPart]) -> None:
+        """
+        Vector version of drawUtil.colorBorders: everything drawn so far
+        with the border color is painted with the given gradients,
+        and with white outside of them
+        """
+        rotatedMatrix = multiplyMatrix(
+            self.matrix, transposeMatrix(Image.ROTATE_90, self.size)
+        )
+        sections = [
+            (colors, position, size, rotatedMatrix if rotated else self.matrix)
+            for (colors, position, size, rotated) in parts
+        ]
+        self.elements.append(
+            ("colorBorders", list(self.elements), borderColor, sections, self.size)
+        )
+
+    def toSvg(self) -> str:
+        """
+        Returns the complete SVG document, with fonts and images embedded once
+        """
+        writer = SvgWriter()
+        body = writer.elements(self.elements)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" xml:space="preserve" '
+            f'width="{fmt(self.width / self.dpi)}in" height="{fmt(self.height / self.dpi)}in" '
+            f'viewBox="0 0 {self.width} {self.height}">\n'
+            f"{writer.defs()}"
+            f'<rect width="{self.width}" height="{self.height}" fill="{C.WHITE}"/>\n'
+            f"{body}"
+            "</svg>\n"
+        )
+
+    def save(self, fp: str, *args: Any, **kwargs: Any) -> None:
+        with open(fp, "w", encoding="utf-8") as f:
+            f.write(self.toSvg())
+
+
+class SvgPen:
+    """
+    Vector replacement for ImageDraw.Draw, drawing on an SvgCanvas
+    """
+
+    def __init__(self, canvas: SvgCanvas):
+        self.canvas = canvas
+
+    def rectangle(
+        self,
+        xy: Sequence[Any],
+        fill: Optional[str] = None,
+        outline: Optional[str] = None,
+        width: int = 1,
+    ) -> None:
+        # Like ImageDraw, both corners are included and the outline is drawn inside
+        (x0, y0, x1, y1) = flattenBox(xy)
+        strokeWidth = width if outline is not None else 0
+        self.canvas.elements.append(
+            (
+                "rect",
+                self.canvas.matrix,
+                (
+                    x0 + strokeWidth / 2,
+                    y0 + strokeWidth / 2,
+                    x1 + 1 - x0 - strokeWidth,
+                    y1 + 1 - y0 - strokeWidth,
+                ),
+                outline,
+                fill,
+                strokeWidth,
+            )
+        )
+
+    def arc(
+        self,
+        xy: Sequence[Any],
+        start: float,
+        end: float,
+        fill: Optional[str] = None,
+        width: int = 1,
+    ) -> None:
+        (x0, y0, x1, y1) = flattenBox(xy)
+        self.canvas.elements.append(
+            ("arc", self.canvas.matrix, (x0, y0, x1 + 1, y1 + 1), start, end, fill, width)
+        )
+
+    def text(
+        self,
+        xy: Tuple[float, float],
+        text: str,
+        fill: Optional[str] = None,
+        font: Optional[ImageFont.FreeTypeFont] = None,
+        anchor: Optional[str] = None,
+    ) -> None:
+        """
+        Text is positioned with the same anchors as ImageDraw.text,
+        converted to a left baseline position using the font metrics
+        """
+        assert font is not None
+        anchor = anchor if anchor is not None else "la"
+        lines = text.split("\n")
+        lineSpacing = font.getsize("A")[1] + 4 if len(lines) > 1 else 0
+        for (n, line) in enumerate(lines):
+            if line.strip() == "":
+                continue
+            (anchorLeft, anchorTop, _, _) = font.getbbox(line, anchor=anchor)
+            (baseLeft, baseTop, _, _) = font.getbbox(line, anchor="ls")
+            self.canvas.elements.append(
+                (
+                    "text",
+                    self.canvas.matrix,
+                    xy[0] + anchorLeft - baseLeft,
+                    xy[1] + anchorTop - baseTop + n * lineSpacing,
+                    line,
+                    font.path,
+                    font.size,
+                    fill,
+                )
+            )
+
+    def textlength(self, text: str, font: ImageFont.FreeTypeFont) -> float:
+        return font.getlength(text)
+
+
+class SvgWriter:
+    """
+    Serializes canvas elements, collecting the fonts, images,
+    gradients and masks that need to be defined only once per document
+    """
+
+    def __init__(self):
+        self.fonts: List[str] = []
+        self.images: Dict[int, Tuple[str, Image.Image]] = {}
+        self.extraDefs: List[str] = []
+        self.nextId = 0
+
+    def newId(self, prefix: str) -> str:
+        self.nextId += 1
+        return f"{prefix}{self.nextId}"
+
+    def defs(self) -> str:
+        style = "\n".join(fontFaceCss(fontPath) for fontPath in self.fonts)
+        images = "\n".join(
+            f'<image id="{imageId}" width="{image.width}" height="{image.height}" '
+            f'xlink:href="{imageHref(image)}"/>'
+            for (imageId, image) in self.images.values()
+        )
+        return (
+            "<defs>\n"
+            f"<style>\n{style}\n</style>\n"
+            f"{images}\n"
+            + "\n".join(self.extraDefs)
+            + "\n</defs>\n"
+        )
+
+    def elements(
+        self, elements: List[Element], colorMap: Optional[Dict[str, str]] = None
+    ) -> str:
+        return "".join(self.element(element, colorMap) for element in elements)
+
+    def color(self, color: Optional[str], colorMap: Optional[Dict[str, str]]) -> str:
+        if colorMap is not None and color is not None:
+            return colorMap.get(color, colorMap[""])
+        return colorAttr(color)
+
+    def element(self, element: Element, colorMap: Optional[Dict[str, str]]) -> str:
+        kind = element[0]
+        if kind == "rect":
+            (_, matrix, (x, y, w, h), outline, fill, strokeWidth) = element
+            return (
+                f'<rect x="{fmt(x)}" y="{fmt(y)}" width="{fmt(w)}" height="{fmt(h)}" '
+                f'fill="{self.color(fill, colorMap)}" stroke="{self.color(outline, colorMap)}" '
+                f'stroke-width="{fmt(strokeWidth)}"{transformAttr(matrix)}/>\n'
+            )
+        elif kind == "arc":
+            (_, matrix, (x0, y0, x1, y1), start, end, fill, width) = element
+            # The stroke is inside the bounding box, like ImageDraw.arc
+            rx = (x1 - x0 - width) / 2
+            ry = (y1 - y0 - width) / 2
+            cx = (x0 + x1) / 2
+            cy = (y0 + y1) / 2
+            points = [
+                (cx + rx * cos(radians(angle)), cy + ry * sin(radians(angle)))
+                for angle in (start, end)
+            ]
+            largeArc = 1 if (end - start) % 360 > 180 else 0
+            return (
+                f'<path d="M {fmt(points[0][0])} {fmt(points[0][1])} '
+                f'A {fmt(rx)} {fmt(ry)} 0 {largeArc} 1 {fmt(points[1][0])} {fmt(points[1][1])}" '
+                f'fill="none" stroke="{self.color(fill, colorMap)}" '
+                f'stroke-width="{fmt(width)}"{transformAttr(matrix)}/>\n'
+            )
+        elif kind == "text":
+            (_, matrix, x, y, text, fontPath, fontSize, fill) = element
+            if fontPath not in self.fonts:
+                self.fonts.append(fontPath)
+            return (
+                f'<text x="{fmt(x)}" y="{fmt(y)}" '
+                f'font-family="{fontFamily(fontPath)}" font-size="{fontSize}" '
+                f'fill="{self.color(fill, colorMap)}"{transformAttr(matrix)}>'
+                f"{escape(text)}</text>\n"
+            )
+        elif kind == "image":
+            (_, matrix, image) = element
+            if colorMap is not None:
+                # Images are never border colored
+                return (
+                    f'<rect width="{image.width}" height="{image.height}" '
+                    f'fill="{colorMap[""]}"{transformAttr(matrix)}/>\n'
+                )
+            if id(image) not in self.images:
+                self.images[id(image)] = (self.newId("image"), image)
+            imageId = self.images[id(image)][0]
+            return f'<use xlink:href="#{imageId}"{transformAttr(matrix)}/>\n'
+        elif kind == "canvas":
+            (_, matrix, canvas) = element
+            return (
+                f"<g{transformAttr(matrix)}>\n"
+                f"{self.elements(canvas.elements, colorMap)}"
+                "</g>\n"
+            )
+        elif kind == "colorBorders":
+            (_, frameElements, borderColor, sections, size) = element
+            return self.colorBorders(frameElements, borderColor, sections, size)
+        raise Exception(f"Unknown SVG element: {kind}")
+
+    def gradient(self, colors: List[RgbColor], position: C.XY, size: C.XY) -> str:
+        if len(colors) == 1:
+            return colorAttr(colors[0])
+        gradientId = self.newId("gradient")
+        stops = "".join(
+            f'<stop offset="{fmt(n / (len(colors) - 1))}" stop-color="{colorAttr(color)}"/>'
+            for (n, color) in enumerate(colors)
+        )
+        self.extraDefs.append(
+            f'<linearGradient id="{gradientId}" gradientUnits="userSpaceOnUse" '
+            f'x1="{position[0]}" y1="0" x2="{position[0] + size[0]}" y2="0">'
+            f"{stops}</linearGradient>"
+        )
+        return f"url(#{gradientId})"
+
+    def colorBorders(
+        self,
+        frameElements: List[Element],
+        borderColor: str,
+        sections: List[Tuple[List[RgbColor], C.XY, C.XY, Matrix]],
+        size: C.XY,
+    ) -> str:
+        # The mask is white where the frame has the border color, black elsewhere
+        maskId = self.newId("mask")
+        maskContent = self.elements(
+            frameElements, colorMap={borderColor: "#ffffff", "": "#000000"}
+        )
+        self.extraDefs.append(
+            f'<mask id="{maskId}" maskUnits="userSpaceOnUse" '
+            f'x="0" y="0" width="{size[0]}" height="{size[1]}">\n{maskContent}</mask>'
+        )
+        # Gradients are placed in the same coordinates as the masked elements
+        sections = "".join(
+            f'<rect x="{position[0]}" y="{position[1]}" '
+            f'width="{sectionSize[0]}" height="{sectionSize[1]}" '
+            f'fill="{self.gradient(colors, position, sectionSize)}"'
+            f"{transformAttr(matrix)}/>\n"
+            for (colors, position, sectionSize, matrix) in sections
+        )
+        return (
+            f'<g mask="url(#{maskId})">\n'
+            f'<rect width="{size[0]}" height="{size[1]}" fill="{C.WHITE}"/>\n'
+            f"{sections}</g>\n"
+        )
@@ -1,259 +1,187 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
-from scrython import Named, Search, ScryfallError
-from PIL import Image
-from tqdm import tqdm
-import pickle
-import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import os
 import argparse
+import sys
+import time
 
 import bwproxy.drawUtil as drawUtil
+import bwproxy.renderPool as renderPool
+from bwproxy.canvasPool import CanvasPool
+from bwproxy.pipeline import runPipeline
+from bwproxy.renderCache import MemoryRenderCache, RenderCache, fileHash
+import bwproxy.shards as shards
+from bwproxy.spool import Spool
+from bwproxy.service import RenderService
+from bwproxy.deckPlan import formatPlan, planDeck
+from bwproxy.pageManifest import PagePlanner
+from bwproxy.journal import Journal
+from bwproxy.assetRegistry import ASSETS
+from bwproxy.decklist import (
+    countCards,
+    loadCardCaches,
+    resolveLines,
+    saveCardCaches,
+    threadEventLoop,
+)
 import bwproxy.projectConstants as C
 from bwproxy.projectTypes import Card, Deck, Flavor
 
 
-def disambiguateTokenResults(query: str, results: List[Card]) -> List[Card]:
-    singleFaced: List[Card] = []
-    disambiguated: Dict[str, Card] = {}
-    for card in results:
-        try:
-            singleFaced.extend(card.card_faces)
-        except:
-            singleFaced.append(card)
-    for card in singleFaced:
-        if (
-            query.lower().replace(",", "") in card.name.lower().replace(",", "")
-            and card.type_line != "Token"
-            and card.type_line != ""
-        ):
-            index = f"{card.name}\n{card.type_line}\n{sorted(card.colors)}\n{card.oracle_text}"
-            if card.hasPT():
-                index += f"\n{card.power}/{card.toughness}"
-            disambiguated[index] = card
-
-    return list(disambiguated.values())
-
-
-def searchToken(tokenName: str, tokenType: str = C.TOKEN) -> List[Card]:
-    if tokenType == C.EMBLEM:
-        exactName = f"{tokenName} Emblem"
+def iterCards(
+    fileLoc: str,
+    ignoreBasicLands: bool = False,
+    alternativeFrames: bool = False,
+    journal: Optional[Journal] = None,
+    cardCaches: Optional[Tuple[Dict[str, Card], Dict[str, Card]]] = None,
+) -> Iterator[Tuple[Card, Flavor]]:
+    """
+    Resolves the decklist one line at a time, returning every card
+    as soon as it is found, with the flavor names known so far for it.
+    The caches are saved when the decklist is finished (or abandoned).
+    With a journal, the cards found by a stopped run are not searched again,
+    and every card found online is recorded as soon as it is found.
+    Caches already loaded (e.g. by an earlier run in the same process)
+    can be given as cardCaches, and are then only saved if new cards are found.
+    """
+    if cardCaches is None:
+        (cardCache, tokenCache) = loadCardCaches()
+        cachedCount = None
     else:
-        exactName = tokenName
+        (cardCache, tokenCache) = cardCaches
+        cachedCount = len(cardCache) + len(tokenCache)
+    if journal is not None:
+        cardCache.update(journal.cards())
+        tokenCache.update(journal.cards(isToken=True))
     try:
-        cardQuery = Search(q=f"type:{tokenType} !'{exactName}")
-        results = [Card(cardData) for cardData in cardQuery.data()]  # type: ignore
-    except ScryfallError:
-        try:
-            cardQuery = Search(q=f"type:{tokenType} {tokenName}")
-            results = [Card(cardData) for cardData in cardQuery.data()]  # type: ignore
-        except ScryfallError:
-            results: List[Card] = []
-    return disambiguateTokenResults(query=tokenName, results=results)
+        with open(fileLoc) as f, threadEventLoop():
+            yield from resolveLines(
+                f,
+                cardCache=cardCache,
+                tokenCache=tokenCache,
+                ignoreBasicLands=ignoreBasicLands,
+                alternativeFrames=alternativeFrames,
+                journal=journal,
+            )
+    finally:
+        if cachedCount != len(cardCache) + len(tokenCache):
+            saveCardCaches(cardCache, tokenCache)
+
+
+def shardArgument(text: str) -> shards.Shard:
+    try:
+        return shards.parseShard(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid shard {text}, it should be i/n with 1 <= i <= n"
+        )
 
 
-def parseToken(text: str, name: Optional[str] = None) -> Card:
-    data = [line.strip() for line in text.split(";")]
+def addressArgument(text: str) -> Tuple[str, int]:
+    (host, _, port) = text.rpartition(":")
+    try:
+        return (host or "localhost", int(port))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid address {text}, it should be port or host:port"
+        )
 
-    if data[0].lower() == "legendary":
-        supertype = "Legendary "
-        data.pop(0)
-    else:
-        supertype = ""
 
-    if "/" in data[0].lower():
-        pt = data[0].split("/")
-        power = pt[0]
-        toughness = pt[1]
-        data.pop(0)
-    else:
-        power = None
-        toughness = None
-
-    colors = [color for color in data.pop(0) if color != "C"]
-    subtypesString = data.pop(0)
-
-    possibleTypes = [word.strip().title() for word in data[0].split()]
-    if set(possibleTypes) <= set(C.CARD_TYPES):
-        # There are subtypes
-        types = f"{supertype}{' '.join(possibleTypes)}"
-        data.pop(0)
-        subtypes = " ".join([t.strip().title() for t in subtypesString.split()])
-        name = name if name else subtypes
-        type_line = f"Token {types} — {subtypes}"
-    else:
-        # No subtypes
-        typesString = subtypesString
-        possibleTypes = [word.strip().title() for word in typesString.split()]
-        type_line = f"Token {supertype}{' '.join(possibleTypes)}"
-
-    if name is None:
-        raise Exception(f"Missing name for token without subtypes: {text}")
-        
-    jsonData = {
-        "type_line": type_line,
-        "name": name,
-        "colors": colors,
-        "layout": C.TOKEN,
-        "mana_cost": "",
-    }
-
-    if "Creature" in jsonData["type_line"] or "Vehicle" in jsonData["type_line"]:
-        try:
-            assert power is not None
-            assert toughness is not None
-            jsonData["power"] = power
-            jsonData["toughness"] = toughness
-        except:
-            raise Exception(f"Power/Toughness missing for token: {name}")
-    
-    text_lines = [line for line in data if line]
-    jsonData["oracle_text"] = "\n".join(text_lines)
-    return Card(jsonData)
+def dpiArgument(text: str) -> int:
+    try:
+        dpi = int(text)
+    except ValueError:
+        dpi = 0
+    if not C.MIN_DPI <= dpi <= C.MAX_DPI:
+        raise argparse.ArgumentTypeError(
+            f"invalid dpi {text}, it should be between {C.MIN_DPI} and {C.MAX_DPI}"
+        )
+    return dpi
+
+
+def getDeckName(decklistPath: str) -> str:
+    return decklistPath.split("/")[-1].split("\\")[-1].split(".")[0]
+
+
+def getDecklistPaths(paths: List[str]) -> List[str]:
+    """
+    Returns the given decklists, replacing every directory with the decklists inside it
+    """
+    decklistPaths: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            decklistPaths.extend(
+                os.path.join(path, fileName)
+                for fileName in sorted(os.listdir(path))
+                if fileName.endswith(".txt")
+            )
+        else:
+            decklistPaths.append(path)
+    return decklistPaths
+
+
+def countDeckCards(decklistPaths: List[str]) -> int:
+    cardCount = 0
+    for decklistPath in decklistPaths:
+        with open(decklistPath) as f:
+            cardCount += countCards(f)
+    return cardCount
+
+
+def loadDecks(
+    decklistPaths: List[str],
+    ignoreBasicLands: bool = False,
+    alternativeFrames: bool = False,
+) -> Dict[str, List[Tuple[Card, Flavor]]]:
+    """
+    Resolves many decklists, loading and saving the caches only once:
+    cards shared by many decks are searched only once.
+    Returns the cards of every deck, by deck name
+    """
+    decks: Dict[str, List[Tuple[Card, Flavor]]] = {}
+    (cardCache, tokenCache) = loadCardCaches()
+    try:
+        for decklistPath in decklistPaths:
+            deckName = getDeckName(decklistPath)
+            if deckName in decks:
+                raise Exception(f"Two decklists are named {deckName}")
+            with open(decklistPath) as f:
+                decks[deckName] = list(
+                    resolveLines(
+                        f,
+                        cardCache=cardCache,
+                        tokenCache=tokenCache,
+                        ignoreBasicLands=ignoreBasicLands,
+                        alternativeFrames=alternativeFrames,
+                    )
+                )
+    finally:
+        saveCardCaches(cardCache, tokenCache)
+    return decks
 
 
 def loadCards(
     fileLoc: str, ignoreBasicLands: bool = False, alternativeFrames: bool = False
 ) -> tuple[Deck, Flavor]:
-
-    cardCache: Dict[str, Card]
-    tokenCache: Dict[str, Card]
-
-    if os.path.exists(C.CACHE_LOC):
-        with open(C.CACHE_LOC, "rb") as p:
-            cardCache = pickle.load(p)
-    else:
-        cardCache = {}
-
-    if os.path.exists(C.TOKEN_CACHE_LOC):
-        with open(C.TOKEN_CACHE_LOC, "rb") as p:
-            tokenCache = pickle.load(p)
-    else:
-        tokenCache = {}
-
-    with open(fileLoc) as f:
-        cardsInDeck: Deck = []
-        flavorNames: Flavor = {}
-
-        tokenEmblemRegex = re.compile(r"^(?:\d+x )?\((token|emblem)\)", flags=re.I)
-        if tokenEmblemRegex:
-            pass
-        doubleSpacesRegex = re.compile(r" {2,}")
-        removeCommentsRegex = re.compile(r"^//.*$|#.*$")
-        cardCountRegex = re.compile(r"^([0-9]+)x?")
-        flavorNameRegex = re.compile(r"\[(.*?)\]")
-        cardNameRegex = re.compile(
-            r"^(?:\d+x? )?(?:\((?:token|emblem)\) )?(.*?)(?: \[.*?\])?$", flags=re.I
-        )
-
-        for line in f:
-            line = removeCommentsRegex.sub("", line)
-            line = doubleSpacesRegex.sub(" ", line.strip())
-
-            if line == "":
-                continue
-
-            cardCountMatch = cardCountRegex.search(line)
-            cardCount = int(cardCountMatch.groups()[0]) if cardCountMatch else 1
-
-            flavorNameMatch = flavorNameRegex.search(line)
-            cardNameMatch = cardNameRegex.search(line)
-            tokenMatch = tokenEmblemRegex.search(line)
-
-            if cardNameMatch:
-                cardName = cardNameMatch.groups()[0]
-            else:
-                raise Exception(f"No card name found in line {line}")
-
-            if ignoreBasicLands and cardName in C.BASIC_LANDS:
-                print(
-                    f"You have requested to ignore basic lands. {cardName} will not be printed."
-                )
-                continue
-
-            if tokenMatch:
-                tokenType = tokenMatch.groups()[0].lower()
-                if ";" in cardName:
-                    if flavorNameMatch:
-                        tokenName = flavorNameMatch.groups()[0]
-                    else:
-                        tokenName = None
-                    tokenData = parseToken(text=cardName, name=tokenName)
-                elif cardName in tokenCache:
-                    tokenData = tokenCache[cardName]
-                else:
-                    print(f"{cardName} not in cache. searching...")
-                    tokenList = searchToken(tokenName=cardName, tokenType=tokenType)
-
-                    if len(tokenList) == 0:
-                        print(f"Skipping {cardName}. No corresponding tokens found")
-                        continue
-                    if len(tokenList) > 1:
-                        print(
-                            f"Skipping {cardName}. Too many tokens found. Consider specifying the token info in the input file"
-                        )
-                        continue
-                    tokenData = tokenList[0]
-
-                tokenCache[cardName] = tokenData
-                for _ in range(cardCount):
-                    cardsInDeck.append(tokenData)
-                continue
-
-            if cardName in cardCache:
-                cardData = cardCache[cardName]
-            else:
-                print(f"{cardName} not in cache. searching...")
-                try:
-                    cardData: Card = Card(Named(fuzzy=cardName))
-                except ScryfallError as err:
-                    print(f"Skipping {cardName}. {err}")
-                    continue
-
-                print(f"Card found! {cardData.name}")
-                cardCache[cardName] = cardData
-
-            if ignoreBasicLands and cardData.name in C.BASIC_LANDS:
-                print(
-                    f"You have requested to ignore basic lands. {cardName} will not be printed."
-                )
-                continue
-
-            if cardData.hasFlavorName():
-                flavorNames[cardData.name] = cardData.flavor_name
-
-            if flavorNameMatch:
-                flavorName = flavorNameMatch.groups()[0]
-                flavorNames[cardData.name] = flavorName
-
-            if cardData.layout in C.DFC_LAYOUTS or (
-                cardData.layout == C.FLIP and alternativeFrames
-            ):
-                facesData = cardData.card_faces
-                for _ in range(cardCount):
-                    cardsInDeck.append(facesData[0])
-                    cardsInDeck.append(facesData[1])
-            else:
-                for _ in range(cardCount):
-                    cardsInDeck.append(cardData)
-
-    os.makedirs(os.path.dirname(C.CACHE_LOC), exist_ok=True)
-    with open(C.CACHE_LOC, "wb") as p:
-        pickle.dump(cardCache, p)
-
-    os.makedirs(os.path.dirname(C.TOKEN_CACHE_LOC), exist_ok=True)
-    with open(C.TOKEN_CACHE_LOC, "wb") as p:
-        pickle.dump(tokenCache, p)
-
+    cardsInDeck: Deck = []
+    flavorNames: Flavor = {}
+    for (card, cardFlavorNames) in iterCards(
+        fileLoc,
+        ignoreBasicLands=ignoreBasicLands,
+        alternativeFrames=alternativeFrames,
+    ):
+        cardsInDeck.append(card)
+        flavorNames.update(cardFlavorNames)
     return (cardsInDeck, flavorNames)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate printable MTG proxies")
     parser.add_argument(
-        "decklistPath",
+        "decklistPaths",
         metavar="decklist_path",
-        help="location of decklist file",
+        nargs="*",
+        help="location of decklist files, or of directories of decklist files",
     )
     parser.add_argument(
         "--icon-path",
@@ -288,6 +216,80 @@ if __name__ == "__main__":
         action="store_true",
         help="print cards at 75%% in size, allowing to fit more in one page",
     )
+    parser.add_argument(
+        "--dpi",
+        type=dpiArgument,
+        default=C.DPI,
+        help="resolution of the generated pages, in dots per inch (default is %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="number of processes drawing the cards (default is %(default)s)",
+    )
+    parser.add_argument(
+        "--svg",
+        action="store_true",
+        dest="vector",
+        help="generate vector SVG pages with embedded fonts instead of PNG images",
+    )
+    parser.add_argument(
+        "--draft",
+        action="store_true",
+        help="quickly draw low resolution cards on a single contact sheet, for previews",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="only check the decklists and show how many cards and pages they have and how long they would take, without drawing or searching anything",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the last run on the same deck, if it was stopped before finishing",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running, and update the pages every time the decklist or the set icon is saved",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shardArgument,
+        metavar="i/n",
+        help="make only the i-th of n parts of the pages, to split a deck between many computers",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        dest="mergeShards",
+        help="check that the pages of all the shards are in the deck folder, and merge their manifests",
+    )
+    parser.add_argument(
+        "--spool",
+        metavar="spool_dir",
+        help="queue the cards in a shared directory, to be drawn by any number of --spool-worker processes, then make the pages",
+    )
+    parser.add_argument(
+        "--spool-worker",
+        metavar="spool_dir",
+        dest="spoolWorker",
+        help="draw the cards queued in a shared directory, without a decklist",
+    )
+    parser.add_argument(
+        "--serve",
+        type=addressArgument,
+        metavar="[host:]port",
+        help="run a local HTTP service drawing the decklists it receives, without a decklist",
+    )
+    parser.add_argument(
+        "--no-render-cache",
+        action="store_false",
+        dest="useRenderCache",
+        help="draw every card again instead of reusing the ones drawn by previous runs",
+    )
     parser.add_argument(
         "--no-card-space",
         action="store_true",
@@ -316,39 +318,368 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    decklistPath: str = args.decklistPath
-
-    deckName = decklistPath.split("/")[-1].split("\\")[-1].split(".")[0]
-    if args.setIconPath:
-        setIcon = drawUtil.resizeSetIcon(Image.open(args.setIconPath).convert("RGBA"))
+    if args.spoolWorker is not None:
+        drawn = Spool(args.spoolWorker).work(wait=True)
+        print(f"No jobs left, {drawn} cards drawn")
+        sys.exit()
+    if args.serve is not None:
+        (host, port) = args.serve
+        RenderService(
+            setIconPath=args.setIconPath,
+            jobs=args.jobs,
+            useRenderCache=args.useRenderCache,
+        ).serve(host=host, port=port)
+        sys.exit()
+    if len(args.decklistPaths) == 0:
+        parser.error("the following arguments are required: decklist_path")
+
+    decklistPaths = getDecklistPaths(args.decklistPaths)
+    if args.spool is not None and (len(decklistPaths) != 1 or args.vector):
+        parser.error("spools work with a single decklist, and only for PNG pages")
+    if (args.shard is not None or args.mergeShards) and len(decklistPaths) != 1:
+        parser.error("shards can only be made from a single decklist")
+    if args.shard is not None and args.draft:
+        parser.error("drafts cannot be split in shards")
+    if args.resume and (
+        len(decklistPaths) != 1 or args.draft or args.shard is not None or args.spool is not None
+    ):
+        parser.error("only single decklist runs making the whole deck can be resumed")
+    if args.watch and (
+        len(decklistPaths) != 1 or args.shard is not None or args.spool is not None
+    ):
+        parser.error("only single decklist runs making the whole deck can be watched")
+    if args.resume and not args.useRenderCache:
+        parser.error("resumed runs need the render cache, to reuse the drawn cards")
+
+    if args.mergeShards:
+        manifestPath = shards.mergeShards(getDeckName(decklistPaths[0]))
+        print(f"All the pages are present, manifest saved in {manifestPath}")
+        sys.exit()
+
+    if args.plan:
+        (cardCache, tokenCache) = loadCardCaches()
+        valid = True
+        for decklistPath in decklistPaths:
+            with open(decklistPath) as f:
+                plan = planDeck(
+                    f,
+                    cardCache=cardCache,
+                    tokenCache=tokenCache,
+                    setIconPath=args.setIconPath,
+                    isColored=args.color,
+                    useTextSymbols=args.useTextSymbols,
+                    fullArtLands=args.fullArtLands,
+                    alternativeFrames=args.alternativeFrames,
+                    ignoreBasicLands=args.ignoreBasicLands,
+                    small=args.small,
+                    dpi=args.dpi,
+                    draft=args.draft,
+                    vector=args.vector,
+                    jobs=args.jobs,
+                    cache=RenderCache() if args.useRenderCache else None,
+                )
+            print(formatPlan(getDeckName(decklistPath), plan))
+            valid = valid and len(plan["errors"]) == 0
+        # Decklists with errors fail, so that the plan can be used to check them
+        sys.exit(0 if valid else 1)
+
+    # Cards are drawn directly at their final size, so that they don't need to be resized
+    if args.draft:
+        cardDpi = C.DRAFT_DPI
     else:
-        setIcon = None
+        cardDpi = drawUtil.getCardDpi(dpi=args.dpi, small=args.small)
+    # Card and page images are reused once the cards are paginated
+    pool = CanvasPool()
+
+    vector = args.vector and not args.draft
 
-    allCards, flavorNames = loadCards(
-        decklistPath,
-        ignoreBasicLands=args.ignoreBasicLands,
+    def startWorkers(cardCount: int) -> Optional[renderPool.WorkerPool]:
+        # Small decks are drawn serially: starting the workers would take longer
+        if (
+            args.jobs <= 1
+            or vector
+            or args.spool is not None
+            or cardCount < renderPool.PARALLEL_MIN_CARDS
+        ):
+            return None
+        # Workers are started before the pipeline threads, and share the loaded assets
+        renderPool.warmUp(setIconPath=args.setIconPath, options=dict(dpi=cardDpi))
+        return renderPool.WorkerPool(jobs=args.jobs)
+
+    if args.watch:
+        # Fonts and assets are loaded once, not at the first change
+        renderPool.warmUp(setIconPath=args.setIconPath, options=dict(dpi=cardDpi))
+
+    drawOptions: Dict[str, Any] = dict(
+        setIconPath=args.setIconPath,
+        isColored=args.color,
+        useTextSymbols=args.useTextSymbols,
+        fullArtLands=args.fullArtLands,
         alternativeFrames=args.alternativeFrames,
+        dpi=cardDpi,
+        draft=args.draft,
+        vector=vector,
+        workers=startWorkers(countDeckCards(decklistPaths)),
+        cache=RenderCache() if args.useRenderCache else None,
     )
-    images = [
-        drawUtil.drawCard(
-            card=card,
-            setIcon=setIcon,
-            flavorNames=flavorNames,
-            isColored=args.color,
-            useTextSymbols=args.useTextSymbols,
-            fullArtLands=args.fullArtLands,
-            alternativeFrames=args.alternativeFrames,
-        )
-        for card in tqdm(
-            allCards,
-            desc="Card drawing progress: ",
-            unit="card",
-        )
-    ]
-    drawUtil.savePages(
-        images=images,
-        deckName=deckName,
+
+    # Everything apart from the cards that changes the content of the pages
+    pageOptions: Dict[str, Any] = dict(
+        setIcon=fileHash(args.setIconPath) if args.setIconPath is not None else None,
+        isColored=args.color,
+        useTextSymbols=args.useTextSymbols,
+        fullArtLands=args.fullArtLands,
+        alternativeFrames=args.alternativeFrames,
         small=args.small,
         pageFormat=args.pageFormat,
         noCardSpace=args.noCardSpace,
+        dpi=args.dpi,
+        vector=vector,
     )
+
+    def getPlanner(deckName: str, journal: Optional[Journal] = None) -> PagePlanner:
+        return PagePlanner(
+            deckName,
+            options=pageOptions,
+            small=args.small,
+            vector=vector,
+            journal=journal,
+        )
+
+    def saveDeck(
+        images: Iterable[Optional[drawUtil.Canvas]],
+        deckName: str,
+        pool: Optional[CanvasPool] = None,
+        pageSaved: Optional[Callable[[int, str], None]] = None,
+        pageCount: Optional[int] = None,
+    ) -> None:
+        if args.draft:
+            sheetPath = drawUtil.saveContactSheet(images=list(images), deckName=deckName)
+            print(f"Draft saved in {sheetPath}")
+        else:
+            drawUtil.savePages(
+                images=images,
+                deckName=deckName,
+                small=args.small,
+                pageFormat=args.pageFormat,
+                noCardSpace=args.noCardSpace,
+                dpi=args.dpi,
+                pool=pool,
+                pageSaved=pageSaved,
+                pageCount=pageCount,
+            )
+
+    def makeDeck(
+        decklistPath: str,
+        journal: Optional[Journal] = None,
+        cardCaches: Optional[Tuple[Dict[str, Card], Dict[str, Card]]] = None,
+    ) -> None:
+        # Cards are drawn as soon as they are resolved,
+        # and pages are saved as soon as their cards are drawn
+        deckName = getDeckName(decklistPath)
+        # The cards are a stream, so the progress bars get their totals from the decklist
+        cardCount = countDeckCards([decklistPath])
+        cards = iterCards(
+            decklistPath,
+            ignoreBasicLands=args.ignoreBasicLands,
+            alternativeFrames=args.alternativeFrames,
+            journal=journal,
+            cardCaches=cardCaches,
+        )
+        if args.draft:
+            images = runPipeline(
+                cards,
+                lambda cards: renderPool.streamCards(
+                    cards, pool=pool, total=cardCount, **drawOptions
+                ),
+            )
+            saveDeck(images, deckName=deckName)
+        else:
+            # Only the cards of the pages changed since the last run are drawn and paginated
+            planner = getPlanner(deckName, journal=journal)
+            images = runPipeline(
+                planner.plan(cards),
+                lambda cards: renderPool.streamCards(
+                    cards, pool=pool, total=cardCount, **drawOptions
+                ),
+            )
+            saveDeck(
+                images,
+                deckName=deckName,
+                pool=pool,
+                pageSaved=planner.pageSaved,
+                pageCount=(cardCount + planner.batchNum - 1) // planner.batchNum,
+            )
+            planner.save()
+            print(f"{planner.kept} of {len(planner.pages)} pages were already up to date")
+
+    if args.shard is not None:
+        # The whole deck is needed to know which cards are on the pages of the shard
+        deckName = getDeckName(decklistPaths[0])
+        allCards = list(
+            iterCards(
+                decklistPaths[0],
+                ignoreBasicLands=args.ignoreBasicLands,
+                alternativeFrames=args.alternativeFrames,
+            )
+        )
+        (pageCount, firstPage, cards) = shards.shardCards(
+            allCards, shard=args.shard, small=args.small
+        )
+        planner = getPlanner(deckName)
+        pagePaths = drawUtil.savePages(
+            images=renderPool.streamCards(cards, pool=pool, **drawOptions),
+            deckName=deckName,
+            small=args.small,
+            pageFormat=args.pageFormat,
+            noCardSpace=args.noCardSpace,
+            dpi=args.dpi,
+            pool=pool,
+            firstPage=firstPage,
+            pageCount=(len(cards) + planner.batchNum - 1) // planner.batchNum,
+        )
+        # Pages are described like the ones of a normal run, so that
+        # the merged manifest can be used to rebuild the deck incrementally
+        manifestPath = shards.writeShardManifest(
+            deckName,
+            shard=args.shard,
+            deckId=shards.deckHash(allCards, pageOptions),
+            pageCount=pageCount,
+            pages=[
+                planner.describePage(
+                    cards[n * planner.batchNum : (n + 1) * planner.batchNum],
+                    pageNumber=firstPage + n,
+                )
+                for n in range(len(pagePaths))
+            ],
+            pagePaths=pagePaths,
+        )
+        print(f"Shard saved, manifest in {manifestPath}")
+    elif args.spool is not None:
+        # This process draws cards too, while waiting for the other workers
+        spool = Spool(args.spool)
+        keys = spool.addJobs(
+            list(
+                iterCards(
+                    decklistPaths[0],
+                    ignoreBasicLands=args.ignoreBasicLands,
+                    alternativeFrames=args.alternativeFrames,
+                )
+            ),
+            setIconPath=args.setIconPath,
+            options=dict(
+                isColored=args.color,
+                useTextSymbols=args.useTextSymbols,
+                fullArtLands=args.fullArtLands,
+                alternativeFrames=args.alternativeFrames,
+                dpi=cardDpi,
+                draft=args.draft,
+            ),
+        )
+        saveDeck(spool.waitResults(keys), deckName=getDeckName(decklistPaths[0]))
+    elif args.watch:
+        # Everything stays loaded between the updates: caches, fonts, assets,
+        # frame templates and workers. Only the changed pages are saved again
+        decklistPath = decklistPaths[0]
+        cardCaches = loadCardCaches()
+
+        def watchedFiles() -> Dict[str, Optional[Tuple[int, int]]]:
+            # Modification time and size, or None while the file is missing
+            # (e.g. some editors delete the file before saving it again)
+            states: Dict[str, Optional[Tuple[int, int]]] = {}
+            for path in [decklistPath, args.setIconPath]:
+                if path is None:
+                    continue
+                try:
+                    stat = os.stat(path)
+                    states[path] = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    states[path] = None
+            return states
+
+        def update() -> None:
+            start = time.perf_counter()
+            try:
+                if drawOptions["workers"] is None:
+                    # The deck may have grown enough to be drawn by the workers
+                    drawOptions["workers"] = startWorkers(countDeckCards([decklistPath]))
+                makeDeck(decklistPath, cardCaches=cardCaches)
+            except Exception as err:
+                # A mistake in the decklist should not stop the watch
+                print(f"Update failed. {type(err).__name__}: {err}")
+                return
+            print(f"Pages updated in {time.perf_counter() - start:.2f} seconds")
+
+        states = watchedFiles()
+        update()
+        print(f"Watching {decklistPath} for changes, press Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(C.WATCH_POLL_TIME)
+                newStates = watchedFiles()
+                if newStates == states or None in newStates.values():
+                    continue
+                if (
+                    args.setIconPath is not None
+                    and newStates[args.setIconPath] != states[args.setIconPath]
+                ):
+                    # Everything keeping the old set icon is loaded again
+                    print(f"{args.setIconPath} changed")
+                    ASSETS.forget(args.setIconPath)
+                    pageOptions["setIcon"] = fileHash(args.setIconPath)
+                    if drawOptions["cache"] is not None:
+                        drawOptions["cache"] = RenderCache()
+                    if drawOptions["workers"] is not None:
+                        drawOptions["workers"].close()
+                        drawOptions["workers"] = None
+                else:
+                    print(f"{decklistPath} changed")
+                states = newStates
+                update()
+        except KeyboardInterrupt:
+            print("Stopped watching")
+    elif len(decklistPaths) == 1 and args.draft:
+        makeDeck(decklistPaths[0])
+    elif len(decklistPaths) == 1:
+        # Progress is recorded as it happens, so that a stopped run can be resumed
+        journal = Journal(getDeckName(decklistPaths[0]), resume=args.resume)
+        try:
+            makeDeck(decklistPaths[0], journal=journal)
+        except BaseException:
+            journal.close()
+            print("Run stopped: use --resume to continue it")
+            raise
+        journal.close(finished=True)
+    else:
+        # All the decks are resolved first, so that every card
+        # shared by many decks is searched only once
+        decks = loadDecks(
+            decklistPaths,
+            ignoreBasicLands=args.ignoreBasicLands,
+            alternativeFrames=args.alternativeFrames,
+        )
+        # Cards shared by many decks are drawn only once, and then loaded from the cache
+        if drawOptions["cache"] is None:
+            drawOptions["cache"] = MemoryRenderCache()
+        for (deckName, deckCards) in decks.items():
+            print(f"Saving {deckName}")
+            if args.draft:
+                saveDeck(
+                    renderPool.streamCards(deckCards, pool=pool, **drawOptions),
+                    deckName=deckName,
+                )
+                continue
+            # Only the cards of the pages changed since the last run are drawn and paginated
+            planner = getPlanner(deckName)
+            saveDeck(
+                renderPool.streamCards(
+                    planner.plan(deckCards), pool=pool, total=len(deckCards), **drawOptions
+                ),
+                deckName=deckName,
+                pool=pool,
+                pageCount=(len(deckCards) + planner.batchNum - 1) // planner.batchNum,
+            )
+            planner.save()
+
+    if drawOptions["workers"] is not None:
+        drawOptions["workers"].close()